@@ -0,0 +1,194 @@
+import random
+import threading
+import time
+
+from typing import Callable, Dict, Optional, Union
+
+from autonet_cumulus.vlan_set import VLANSet
+
+
+def lowest_free(free: VLANSet) -> int:
+    """
+    Allocation strategy that picks the lowest free VLAN ID.
+
+    :param free: The free VLAN IDs.
+    :return:
+    """
+    return free.lowest()
+
+
+def highest_free(free: VLANSet) -> int:
+    """
+    Allocation strategy that picks the highest free VLAN ID.
+
+    :param free: The free VLAN IDs.
+    :return:
+    """
+    return max(free.ranges())[1]
+
+
+def random_free(free: VLANSet) -> int:
+    """
+    Allocation strategy that picks a random free VLAN ID.
+
+    :param free: The free VLAN IDs.
+    :return:
+    """
+    return random.choice(free.to_list())
+
+
+ALLOCATION_STRATEGIES = {
+    'lowest': lowest_free,
+    'highest': highest_free,
+    'random': random_free,
+}
+
+
+class DynamicVLANAllocator(object):
+    """
+    Allocates VLAN IDs from the pool of VLANs reserved for dynamic
+    allocation on a single device.  The allocator keeps a map of the
+    VLAN IDs that are in use, which is updated locally as VLANs are
+    committed and freed so that the device only needs to be consulted
+    when :py:meth:`needs_sync` indicates the map is out of date.
+
+    VLAN IDs handed out by :py:meth:`allocate` are reserved until they
+    are committed or released, or until the reservation expires, so
+    that concurrent operations never receive the same VLAN ID.
+    """
+
+    def __init__(self, pool: VLANSet,
+                 strategy: Callable[[VLANSet], int] = random_free,
+                 reservation_ttl: float = 300,
+                 sync_interval: float = 300):
+        """
+        :param pool: The VLAN IDs reserved for dynamic allocation.
+        :param strategy: A callable that picks a VLAN ID from a
+            non-empty :py:class:`VLANSet` of free VLAN IDs.
+        :param reservation_ttl: Seconds before an uncommitted
+            reservation expires.
+        :param sync_interval: Seconds before the used VLAN map is
+            considered out of date.
+        """
+        self.pool = pool
+        self.strategy = strategy
+        self.reservation_ttl = reservation_ttl
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._used = VLANSet()
+        self._reservations: Dict[int, float] = {}
+        self._synced: Optional[float] = None
+
+    def _expire_reservations(self) -> None:
+        now = time.monotonic()
+        for vid, expires in list(self._reservations.items()):
+            if expires <= now:
+                del self._reservations[vid]
+
+    @property
+    def free(self) -> VLANSet:
+        """
+        The VLAN IDs that are neither in use nor reserved.
+
+        :return:
+        """
+        with self._lock:
+            self._expire_reservations()
+            return self.pool - self._used - self._reservations.keys()
+
+    def needs_sync(self) -> bool:
+        """
+        Indicates that the used VLAN map has never been synchronized
+        with the device, has been invalidated, or is older than
+        :py:attr:`sync_interval`.
+
+        :return:
+        """
+        return (self._synced is None
+                or time.monotonic() - self._synced > self.sync_interval)
+
+    def sync(self, used: VLANSet) -> None:
+        """
+        Replaces the used VLAN map with the VLAN IDs found on the
+        device.  Outstanding reservations are kept.
+
+        :param used: The VLAN IDs in use on the device.
+        :return:
+        """
+        with self._lock:
+            self._used = VLANSet(used) & self.pool
+            self._synced = time.monotonic()
+
+    def invalidate(self) -> None:
+        """
+        Marks the used VLAN map as out of date, e.g. after a conflict,
+        so that it will be synchronized before the next allocation.
+
+        :return:
+        """
+        self._synced = None
+
+    def allocate(self) -> int:
+        """
+        Picks a free VLAN ID using the allocation strategy and reserves
+        it.  An exception is raised if the pool is exhausted.
+
+        :return:
+        """
+        with self._lock:
+            self._expire_reservations()
+            free = self.pool - self._used - self._reservations.keys()
+            if not free:
+                raise Exception("No dynamic VLANs are available.")
+            vid = self.strategy(free)
+            self._reservations[vid] = time.monotonic() + self.reservation_ttl
+        return vid
+
+    def commit(self, vid: int) -> None:
+        """
+        Marks a reserved VLAN ID as in use once the configuration using
+        it has been committed.
+
+        :param vid: The VLAN ID.
+        :return:
+        """
+        with self._lock:
+            self._reservations.pop(vid, None)
+            self._used |= [vid]
+
+    def release(self, vid: int) -> None:
+        """
+        Returns a VLAN ID to the free pool, either because the
+        operation it was reserved for failed or because the
+        configuration using it has been deleted.
+
+        :param vid: The VLAN ID.
+        :return:
+        """
+        with self._lock:
+            self._reservations.pop(vid, None)
+            self._used -= [vid]
+
+
+_allocators: Dict[Union[str, int], DynamicVLANAllocator] = {}
+_allocators_lock = threading.Lock()
+
+
+def get_allocator(device_id: Union[str, int],
+                  pool: VLANSet) -> DynamicVLANAllocator:
+    """
+    Returns the process wide :py:class:`DynamicVLANAllocator` for a
+    device, creating it if needed.  If the dynamic VLAN pool has
+    changed, the allocator is updated to use the new pool.
+
+    :param device_id: The device ID.
+    :param pool: The VLAN IDs reserved for dynamic allocation.
+    :return:
+    """
+    with _allocators_lock:
+        if (allocator := _allocators.get(device_id)) is None:
+            allocator = _allocators[device_id] = DynamicVLANAllocator(pool)
+        elif allocator.pool != pool:
+            allocator.pool = pool
+            allocator.invalidate()
+    return allocator
@@ -1,5 +1,56 @@
+import importlib
+import json
+import logging
+import re
+import threading
+
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from typing import Optional, Union
+from functools import lru_cache
+from typing import (Any, Callable, Iterable, List, Optional, Set,
+                    Tuple, Union)
+from uuid import uuid4
+
+
+# Maps the object type of an NCLU configuration command, the word that
+# follows `add` or `del`, to the show commands whose output may change
+# once a command for that object type has been committed.  Cached
+# results for show commands starting with any of these prefixes are
+# stale after a commit.
+CONFIG_DEPENDENCIES = {
+    'interface': ['show interface', 'show bridge vlan'],
+    'loopback': ['show interface'],
+    'bond': ['show interface', 'show bridge vlan', 'show evpn es'],
+    'bridge': ['show interface', 'show bridge vlan'],
+    'vlan': ['show interface', 'show bridge vlan', 'show evpn vni'],
+    'vxlan': ['show interface', 'show bridge vlan', 'show evpn vni',
+              'show bgp evpn vni'],
+    'vrf': ['show interface', 'show evpn vni', 'show bgp evpn vni'],
+    'bgp': ['show bgp', 'show evpn vni'],
+}
+
+
+# Maps the object types whose configuration is reflected in the device
+# facts to the keywords of the commands that change them: the global
+# BGP ASN and router ID, the loopback addresses and the creation of the
+# bridge, which happens when ports are added to it.  Deleting one of
+# these objects outright also changes the facts.
+FACTS_DEPENDENCIES = {
+    'bgp': ['autonomous-system', 'router-id'],
+    'loopback': ['ip', 'ipv6'],
+    'bridge': ['ports'],
+}
+
+
+# The output size assumed for a command that has not been executed
+# before when splitting commands into batches.
+DEFAULT_OUTPUT_SIZE = 64 * 1024
+
+
+# JSON decoders that may be used to parse command output, in place of
+# :py:func:`json.loads`.  Each must raise a :py:class:`ValueError` when
+# the output is not valid JSON.
+JSON_DECODERS = ['json', 'orjson', 'ujson']
 
 
 @dataclass
@@ -9,6 +60,7 @@ class CommandResult(object):
     stdout: str = field(default="")
     stderr: str = field(default="")
     json: Optional[Union[dict, list]] = field(default=None)
+    exit_status: Optional[int] = field(default=None)
 
 
 class CommandResultSet(list):
@@ -30,3 +82,409 @@ class CommandResultSet(list):
             if result.command == command or result.original_command == command:
                 return result
         return None
+
+
+class CommandResultCache(object):
+    """
+    A least recently used cache of :py:class:`CommandResult` objects
+    indexed by both the command issued and the original command.  The
+    cache is bounded by an approximate memory budget in bytes.  The
+    cost of a result is the length of its stdout and stderr, which
+    also stands in for the size of the JSON parsed from it.  Results
+    larger than the whole budget are not cached.
+
+    Cache hits, misses and evictions are counted in :py:attr:`hits`,
+    :py:attr:`misses` and :py:attr:`evictions`.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param max_bytes: The memory budget for cached results.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Results are keyed by the command issued, and the index maps
+        # original commands back to the command issued.
+        self._results = OrderedDict()
+        self._index = {}
+
+    def __len__(self):
+        return len(self._results)
+
+    def __contains__(self, command: str):
+        return self._resolve(command) is not None
+
+    @staticmethod
+    def _cost(result: CommandResult) -> int:
+        """
+        Returns the approximate cost of a result.
+
+        :param result: A :py:class:`CommandResult` object.
+        :return:
+        """
+        return len(result.stdout) + len(result.stderr)
+
+    def _resolve(self, command: str) -> Optional[str]:
+        """
+        Returns the key of the cached result for the given command, or
+        None if it is not cached.
+
+        :param command: The command issued or original command.
+        :return:
+        """
+        if command in self._results:
+            return command
+        return self._index.get(command)
+
+    def get(self, command: str) -> Optional[CommandResult]:
+        """
+        Returns the cached result for the given command and marks it as
+        recently used.  Returns :code:`None` if there is no cached
+        result.
+
+        :param command: The command issued or original command.
+        :return:
+        """
+        if (key := self._resolve(command)) is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._results.move_to_end(key)
+        return self._results[key]
+
+    def add(self, result: CommandResult) -> None:
+        """
+        Adds a result to the cache, replacing any result previously
+        cached for the same command, and evicts the least recently used
+        results until the cache is within its memory budget.
+
+        :param result: A :py:class:`CommandResult` object.
+        :return:
+        """
+        self.invalidate(result.command)
+        if self._cost(result) > self.max_bytes:
+            return
+        self._results[result.command] = result
+        self._index[result.original_command] = result.command
+        self.size += self._cost(result)
+        while self.size > self.max_bytes:
+            _, evicted = self._results.popitem(last=False)
+            self._remove_index(evicted)
+            self.evictions += 1
+
+    def _remove_index(self, result: CommandResult) -> None:
+        """
+        Removes the index entry for a result that has been removed and
+        updates the cache size.
+
+        :param result: The removed :py:class:`CommandResult` object.
+        :return:
+        """
+        if self._index.get(result.original_command) == result.command:
+            del self._index[result.original_command]
+        self.size -= self._cost(result)
+
+    def invalidate(self, command: str) -> None:
+        """
+        Removes the result cached for the given command, if any.
+
+        :param command: The command issued or original command.
+        :return:
+        """
+        if (key := self._resolve(command)) is not None:
+            self._remove_index(self._results.pop(key))
+
+    def invalidate_prefixes(self, prefixes: Iterable[str]) -> None:
+        """
+        Removes all cached results whose original command starts with
+        any of the given prefixes.
+
+        :param prefixes: A list of command prefixes, e.g.
+            :code:`show interface`.
+        :return:
+        """
+        prefixes = tuple(prefixes)
+        for key, result in list(self._results.items()):
+            if result.original_command.startswith(prefixes):
+                self.invalidate(key)
+
+    def clear(self) -> None:
+        """
+        Removes all cached results.
+
+        :return:
+        """
+        self._results.clear()
+        self._index.clear()
+        self.size = 0
+
+
+def _split_config_command(command: str) -> Optional[List[str]]:
+    """
+    Splits an NCLU configuration command into words, without the
+    leading `net`.  None is returned for commands such as `commit` and
+    `abort` that do not change anything on their own.
+
+    :param command: An NCLU configuration command.
+    :return:
+    """
+    words = command.split()
+    if words and words[0] == 'net':
+        words = words[1:]
+    if not words or words[0] not in ['add', 'del']:
+        return None
+    return words
+
+
+def get_config_object_types(config_commands: [str]) -> Optional[Set[str]]:
+    """
+    Returns the set of object types, the word that follows `add` or
+    `del`, configured by the given configuration commands.  If a
+    command configures an object type that is not found in
+    :py:data:`CONFIG_DEPENDENCIES` then :code:`None` is returned to
+    indicate that its effects are unknown.
+
+    :param config_commands: A list of NCLU configuration commands.
+    :return:
+    """
+    object_types = set()
+    for command in config_commands:
+        if not (words := _split_config_command(command)):
+            continue
+        if len(words) < 2 or words[1] not in CONFIG_DEPENDENCIES:
+            return None
+        object_types.add(words[1])
+    return object_types
+
+
+def get_stale_commands(config_commands: [str]) -> Optional[Set[str]]:
+    """
+    Returns the set of show command prefixes whose cached results are
+    made stale by committing the given configuration commands.  If a
+    command configures an object type that is not found in
+    :py:data:`CONFIG_DEPENDENCIES` then :code:`None` is returned to
+    indicate that all cached results are stale.
+
+    :param config_commands: A list of NCLU configuration commands.
+    :return:
+    """
+    if (object_types := get_config_object_types(config_commands)) is None:
+        return None
+    stale_commands = set()
+    for object_type in object_types:
+        stale_commands.update(CONFIG_DEPENDENCIES[object_type])
+    return stale_commands
+
+
+def facts_are_stale(config_commands: [str]) -> bool:
+    """
+    Indicates that committing the given configuration commands may
+    change the device facts, so that cached facts must be gathered
+    again.  Only the commands found in :py:data:`FACTS_DEPENDENCIES`
+    and commands of unknown effect do so, while commands such as the
+    VLAN changes made to the bridge or the BGP configuration of a VRF
+    leave the facts intact.
+
+    :param config_commands: A list of NCLU configuration commands.
+    :return:
+    """
+    if get_config_object_types(config_commands) is None:
+        return True
+    for command in config_commands:
+        if not (words := _split_config_command(command)):
+            continue
+        if (keywords := FACTS_DEPENDENCIES.get(words[1])) is None:
+            continue
+        # The keyword follows the object name, if the object has one.
+        if len(words) <= 3 or set(words[2:4]) & set(keywords):
+            return True
+    return False
+
+
+def is_config_error(result: CommandResult) -> bool:
+    """
+    Indicates that NCLU rejected a configuration command or commit.
+    When a PTY is used stderr is merged into stdout, so NCLU errors
+    are found at the start of stdout.  Without a PTY the same errors
+    arrive on stderr, so both streams are checked in the same way and
+    other output on stderr, such as warnings, is not treated as a
+    failure by either transport.
+
+    :param result: The :py:class:`CommandResult` of the command.
+    :return:
+    """
+    return any(output.lstrip().startswith('ERROR:')
+               for output in (result.stdout, result.stderr))
+
+
+class OutputSizes(object):
+    """
+    A process wide record of the size of the most recent output of each
+    command, used to estimate the output of a command before it is
+    executed.  Commands that have not been seen are assumed to produce
+    :py:attr:`default` bytes of output.  At most :py:attr:`max_size`
+    commands are remembered, least recently used first to be dropped.
+    """
+
+    def __init__(self, default: int = DEFAULT_OUTPUT_SIZE,
+                 max_size: int = 1024):
+        """
+        :param default: The estimated output size of commands that
+            have not been seen.
+        :param max_size: The maximum number of commands remembered.
+        """
+        self.default = default
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._sizes = OrderedDict()
+
+    def __len__(self):
+        return len(self._sizes)
+
+    def record(self, result: CommandResult) -> None:
+        """
+        Records the output size of an executed command.
+
+        :param result: The executed :py:class:`CommandResult`.
+        :return:
+        """
+        with self._lock:
+            self._sizes[result.original_command] = \
+                len(result.stdout) + len(result.stderr)
+            self._sizes.move_to_end(result.original_command)
+            while len(self._sizes) > self.max_size:
+                self._sizes.popitem(last=False)
+
+    def estimate(self, result: CommandResult) -> int:
+        """
+        Returns the expected output size of a command.
+
+        :param result: The :py:class:`CommandResult` to be executed.
+        :return:
+        """
+        with self._lock:
+            if (size := self._sizes.get(result.original_command)) is None:
+                return self.default
+            self._sizes.move_to_end(result.original_command)
+            return size
+
+
+output_sizes = OutputSizes()
+
+
+def split_batches(results: [CommandResult], max_bytes: int,
+                  sizes: OutputSizes = output_sizes) -> List[List[CommandResult]]:
+    """
+    Splits prepared results into batches whose total expected output
+    stays within :py:attr:`max_bytes`, so that a few commands with
+    large output, such as :code:`show interface`, are not combined
+    into one oversized batch.  Commands keep their order, and a command
+    expected to exceed the budget on its own is given a batch of its
+    own.  A budget of 0 places every command in a single batch.
+
+    :param results: A list of :py:class:`CommandResult` objects that
+        have yet to be executed.
+    :param max_bytes: The expected output budget of each batch.
+    :param sizes: The :py:class:`OutputSizes` used for estimates.
+    :return:
+    """
+    if not max_bytes:
+        return [list(results)] if results else []
+    batches = []
+    batch = []
+    batch_size = 0
+    for result in results:
+        size = sizes.estimate(result)
+        if batch and batch_size + size > max_bytes:
+            batches.append(batch)
+            batch = []
+            batch_size = 0
+        batch.append(result)
+        batch_size += size
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def generate_batch_delimiter() -> str:
+    """
+    Generates a delimiter that is unique enough that it will not be
+    found in the output of any command included in a batch.
+
+    :return:
+    """
+    return f'__AUTONET_BATCH_{uuid4().hex}__'
+
+
+def generate_batch_command(commands: [str], delimiter: str) -> str:
+    """
+    Joins a list of commands into a single shell command line.  Each
+    command is followed by a marker line that contains the delimiter,
+    the index of the command and its exit status so that the combined
+    output can be split by :py:func:`parse_batch_output`.
+
+    :param commands: A list of commands to be executed.
+    :param delimiter: The delimiter returned by
+        :py:func:`generate_batch_delimiter`.
+    :return:
+    """
+    return '; '.join(f"{command}; printf '{delimiter}:{index}:%s\\n' \"$?\""
+                     for index, command in enumerate(commands))
+
+
+def parse_batch_output(stdout: str, delimiter: str,
+                       count: int) -> [Tuple[str, Optional[int]]]:
+    """
+    Splits the output of a command generated by
+    :py:func:`generate_batch_command` into a list of stdout and exit
+    status tuples, one per command, in the order the commands were
+    issued.  Commands for which no marker could be found, e.g. because
+    the session was interrupted, will have empty output and an exit
+    status of :code:`None`.
+
+    :param stdout: The combined output of the batch.
+    :param delimiter: The delimiter used to generate the batch.
+    :param count: The number of commands in the batch.
+    :return:
+    """
+    regex = re.compile(rf'^(?P<output>.*){re.escape(delimiter)}'
+                       rf':(?P<index>\d+):(?P<status>\d+)$')
+    outputs = [('', None)] * count
+    lines = []
+    for line in stdout.split('\n'):
+        if not (match := regex.match(line)):
+            lines.append(line)
+            continue
+        # Output that did not end in a new line will be prepended to
+        # the marker.
+        if match.group('output'):
+            lines.append(match.group('output'))
+        index = int(match.group('index'))
+        if index < count:
+            outputs[index] = ("\n".join(lines), int(match.group('status')))
+        lines = []
+
+    return outputs
+
+
+@lru_cache(maxsize=None)
+def get_json_decoder(name: str) -> Callable[[Union[str, bytes]], Any]:
+    """
+    Returns the :code:`loads` function of the named JSON module.  The
+    faster third party decoders are optional, so if the module cannot
+    be imported :py:func:`json.loads` is returned instead.
+
+    :param name: One of :py:data:`JSON_DECODERS`.
+    :return:
+    """
+    if name not in JSON_DECODERS:
+        raise ValueError(f"Unknown JSON decoder '{name}'.")
+    try:
+        return importlib.import_module(name).loads
+    except ImportError:
+        logging.warning(f"JSON decoder '{name}' is not installed, "
+                        f"falling back to 'json'.")
+        return json.loads
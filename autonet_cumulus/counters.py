@@ -0,0 +1,135 @@
+import threading
+
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Union
+
+
+# The counters collected for each interface.  Counter values, deltas
+# and rates are stored in arrays in this order.
+COUNTER_FIELDS = ('rx_bytes', 'rx_packets', 'rx_errors', 'rx_dropped',
+                  'tx_bytes', 'tx_packets', 'tx_errors', 'tx_dropped')
+COUNTER_INDEX = {name: i for i, name in enumerate(COUNTER_FIELDS)}
+
+# The array typecodes of samples of the 32 bit and 64 bit statistics.
+# Some drivers only report 32 bit statistics.  A 32 bit counter that
+# decreases from the upper half of its range is taken to have wrapped
+# rather than restarted.
+COUNTER_TYPECODE_32 = 'I'
+COUNTER_TYPECODE_64 = 'Q'
+COUNTER_WRAP = 2 ** 32
+COUNTER_WRAP_THRESHOLD = 2 ** 31
+
+
+@dataclass
+class InterfaceCounters(object):
+    """
+    The counters of an interface at one sample, along with the change
+    since the previous sample and the resulting per second rates.
+    Deltas and rates are None for the first sample of an interface.
+    Values are held in compact arrays ordered as
+    :py:data:`COUNTER_FIELDS`, and can be looked up by field name with
+    :py:meth:`counter`, :py:meth:`delta` and :py:meth:`rate`.
+    """
+    name: str
+    counters: array
+    deltas: Optional[array] = field(default=None)
+    rates: Optional[array] = field(default=None)
+    interval: Optional[float] = field(default=None)
+
+    def counter(self, name: str) -> int:
+        return self.counters[COUNTER_INDEX[name]]
+
+    def delta(self, name: str) -> Optional[int]:
+        return self.deltas[COUNTER_INDEX[name]] if self.deltas else None
+
+    def rate(self, name: str) -> Optional[float]:
+        return self.rates[COUNTER_INDEX[name]] if self.rates else None
+
+
+def get_delta(value: int, previous: int, wraps: bool = False) -> int:
+    """
+    Returns the change in a counter between two samples, allowing for
+    a 32 bit counter wrapping around or the counter restarting from
+    zero.
+
+    :param value: The current counter value.
+    :param previous: The previous counter value.
+    :param wraps: The counter is a 32 bit counter that may wrap.
+    :return:
+    """
+    if value >= previous:
+        return value - previous
+    if wraps and COUNTER_WRAP_THRESHOLD <= previous < COUNTER_WRAP:
+        return (value - previous) % COUNTER_WRAP
+    return value
+
+
+class CounterTracker(object):
+    """
+    Keeps the previous counter sample of every interface on a device so
+    that deltas and rates can be computed locally from successive
+    samples.  A 32 bit counter that decreases between samples from
+    near the top of its range is treated as having wrapped.  Any other
+    counter that decreases, because the interface was reset or
+    recreated, is treated as having restarted from zero.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timestamp: Optional[float] = None
+        self._previous: Dict[str, array] = {}
+
+    def update(self, timestamp: float,
+               samples: Dict[str, array]) -> Dict[str, InterfaceCounters]:
+        """
+        Records a new sample of every interface and returns the
+        counters, deltas and rates for each.  Interfaces missing from
+        the sample are forgotten.
+
+        :param timestamp: The monotonic time at which the sample was
+            taken, in seconds.
+        :param samples: A map of interface name to an array of counter
+            values ordered as :py:data:`COUNTER_FIELDS`, whose typecode
+            is :py:data:`COUNTER_TYPECODE_32` for samples of 32 bit
+            statistics.
+        :return:
+        """
+        with self._lock:
+            interval = None
+            if self._timestamp is not None and timestamp > self._timestamp:
+                interval = timestamp - self._timestamp
+            results = {}
+            for int_name, values in samples.items():
+                previous = self._previous.get(int_name)
+                if previous is None or interval is None:
+                    results[int_name] = InterfaceCounters(int_name, values)
+                    continue
+                wraps = values.typecode == COUNTER_TYPECODE_32
+                deltas = array('Q', [
+                    get_delta(value, prev, wraps)
+                    for value, prev in zip(values, previous)])
+                rates = array('d', [delta / interval for delta in deltas])
+                results[int_name] = InterfaceCounters(
+                    int_name, values, deltas, rates, interval)
+            self._timestamp = timestamp
+            self._previous = dict(samples)
+        return results
+
+
+_trackers: Dict[Union[str, int], CounterTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_counter_tracker(device_id: Union[str, int]) -> CounterTracker:
+    """
+    Returns the process wide :py:class:`CounterTracker` for a device,
+    creating it if needed.
+
+    :param device_id: The device ID.
+    :return:
+    """
+    with _trackers_lock:
+        if (tracker := _trackers.get(device_id)) is None:
+            tracker = _trackers[device_id] = CounterTracker()
+    return tracker
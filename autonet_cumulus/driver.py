@@ -1,6 +1,5 @@
 import logging
-import random
-import re
+import time
 
 from autonet.config import config
 from autonet.core.device import AutonetDevice
@@ -11,59 +10,385 @@ from autonet.core.objects import vlan as an_vlan
 from autonet.core.objects import vrf as an_vrf
 from autonet.core.objects import vxlan as an_vxlan
 from autonet.drivers.device.driver import DeviceDriver
-from autonet.util.config_string import glob_to_vlan_list
 from autonet.util.evpn import parse_esi
-from conf_engine.options import StringOption
-from json import loads as json_loads
-from json.decoder import JSONDecodeError
-from ipaddress import ip_interface
+from conf_engine.core.exceptions import ConfigError
+from conf_engine.core.types import String
+from conf_engine.options import (BooleanOption, NumberOption, Option,
+                                 StringOption)
+from functools import lru_cache
 from pssh.clients import SSHClient
-from typing import List, Optional, Tuple, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-from autonet_cumulus.commands import CommandResult, CommandResultSet
+from autonet_cumulus.allocator import (ALLOCATION_STRATEGIES,
+                                       DynamicVLANAllocator, get_allocator)
+from autonet_cumulus.commands import (JSON_DECODERS, CommandResult,
+                                      CommandResultCache, CommandResultSet,
+                                      facts_are_stale, generate_batch_command,
+                                      generate_batch_delimiter,
+                                      get_json_decoder, get_stale_commands,
+                                      is_config_error, output_sizes,
+                                      parse_batch_output, split_batches)
+from autonet_cumulus.counters import InterfaceCounters, get_counter_tracker
+from autonet_cumulus.facts import DeviceFacts, FactsStore, facts_cache
+from autonet_cumulus.interface_types import interface_type_cache
+from autonet_cumulus.inventory import get_inventory
+from autonet_cumulus.pool import connection_pool
+from autonet_cumulus.shell import ShellSession
+from autonet_cumulus.tasks import counters as counters_task
+from autonet_cumulus.tasks import facts as facts_task
 from autonet_cumulus.tasks import interface as if_task
+from autonet_cumulus.tasks import interface_fast as if_fast_task
 from autonet_cumulus.tasks import lag as lag_task
 from autonet_cumulus.tasks import vlan as vlan_task
 from autonet_cumulus.tasks import vrf as vrf_task
 from autonet_cumulus.tasks import vxlan as vxlan_task
+from autonet_cumulus.vlan_membership import VLANMembership
+from autonet_cumulus.vlan_set import VLANSet
+
+
+@lru_cache(maxsize=32)
+def _parse_vlan_glob(vlan_glob: str) -> VLANSet:
+    """
+    Memoized conversion of a VLAN glob into a :py:class:`VLANSet`.
+    A :py:class:`ConfigError` is raised if the glob is invalid, e.g.
+    it includes a VLAN ID above 4095.
+
+    :param vlan_glob: The VLAN glob.
+    :return:
+    """
+    try:
+        return VLANSet.from_glob(vlan_glob)
+    except ValueError as e:
+        raise ConfigError(f"Invalid VLAN glob {vlan_glob!r}: {e}")
+
+
+class VLANGlob(String):
+    """
+    An option type accepting a VLAN glob, e.g. :code:`4000-4094`, whose
+    VLAN IDs are all valid, so that an invalid glob is rejected when
+    the option is loaded rather than by every VLAN operation.
+    """
+
+    def __init__(self):
+        super().__init__(type_name='VLAN glob')
+
+    def __call__(self, value):
+        value = super().__call__(value)
+        _parse_vlan_glob(value)
+        return value
+
 
 cl_opts = [
-    StringOption('dynamic_vlans', default='4000-4094'),
-    StringOption('bridge_name', default='')
+    Option('dynamic_vlans', option_type=VLANGlob(), default='4000-4094'),
+    StringOption('bridge_name', default=''),
+    BooleanOption('batch_commands', default=True),
+    NumberOption('batch_max_bytes', default=8 * 1024 * 1024, minimum=0),
+    StringOption('transport', default='exec', choices=['exec', 'shell']),
+    NumberOption('shell_read_timeout', default=300, minimum=0),
+    BooleanOption('connection_pool', default=False),
+    NumberOption('pool_max_size', default=32, minimum=0),
+    NumberOption('pool_idle_timeout', default=300, minimum=0),
+    NumberOption('pool_health_timeout', default=5, minimum=0),
+    NumberOption('keepalive_seconds', default=60, minimum=0),
+    NumberOption('result_cache_bytes', default=64 * 1024 * 1024, minimum=0),
+    NumberOption('facts_ttl', default=3600, minimum=0),
+    NumberOption('facts_validate_interval', default=60, minimum=0),
+    NumberOption('interface_type_ttl', default=300, minimum=0),
+    StringOption('facts_store_path', default=''),
+    StringOption('dynamic_vlan_strategy', default='random',
+                 choices=list(ALLOCATION_STRATEGIES)),
+    NumberOption('dynamic_vlan_sync_interval', default=300, minimum=0),
+    StringOption('json_decoder', default='json', choices=JSON_DECODERS)
 ]
 config.register_options(cl_opts, 'cumulus_linux')
 
 
+# The commands from which the device facts are gathered, in the order
+# their output is passed to :py:func:`facts_task.get_device_facts`.
+FACTS_NET_COMMANDS = ['show version', 'show system', 'show interface lo',
+                      'show bgp evpn summary']
+FACTS_RAW_COMMANDS = ['ip -o link show type bridge',
+                      facts_task.get_facts_token_command()]
+
+# The bridge name used when it is neither configured nor discovered.
+DEFAULT_BRIDGE_NAME = 'bridge'
+
+
 class CumulusDriver(DeviceDriver):
     def __init__(self, device: AutonetDevice):
-        self._connection = SSHClient(
-            str(device.address),
-            user=device.credentials.username,
-            password=device.credentials.password
-        )
-        self._result_cache = CommandResultSet()
+        self._connection = None
+        self._shell = None
         self._device = device
-        self._version_data = None
+        self.connect_time = None
+        self._result_cache = CommandResultCache(
+            int(config.cumulus_linux.result_cache_bytes))
+        self._vlan_membership = None
         super().__init__(device)
 
+    def execute(self, capability: str, action: str,
+                request_data: object = None, **kwargs):
+        """
+        Executes the requested action and then hands the device
+        connection back to the connection pool so that it can be reused
+        by subsequent requests.
+        """
+        try:
+            return super().execute(capability, action, request_data, **kwargs)
+        finally:
+            self._disconnect()
+
+    def _connect(self) -> None:
+        """
+        Establishes the connection to the device, leasing it from the
+        connection pool when pooling is enabled, and opens the shell
+        session if the shell transport is in use.  The connection is
+        not made until the first command must be executed so that
+        requests that can be answered without the device perform no
+        network I/O.  The time taken is recorded in
+        :py:attr:`connect_time`.
+
+        :return:
+        """
+        start = time.monotonic()
+        credentials = self._device.credentials
+        if config.cumulus_linux.connection_pool:
+            connection_pool.configure(
+                int(config.cumulus_linux.pool_max_size),
+                config.cumulus_linux.pool_idle_timeout,
+                int(config.cumulus_linux.keepalive_seconds),
+                config.cumulus_linux.pool_health_timeout)
+            self._connection = connection_pool.acquire(
+                str(self._device.address),
+                credentials.username,
+                credentials.password)
+        else:
+            self._connection = SSHClient(
+                str(self._device.address),
+                user=credentials.username,
+                password=credentials.password,
+                keepalive_seconds=int(config.cumulus_linux.keepalive_seconds)
+            )
+        if config.cumulus_linux.transport == 'shell':
+            self._shell = ShellSession(
+                self._connection,
+                read_timeout=config.cumulus_linux.shell_read_timeout or None)
+        self.connect_time = time.monotonic() - start
+        logging.debug(f"Connection setup for {self._device} took "
+                      f"{self.connect_time:.3f}s")
+
+    def _disconnect(self) -> None:
+        """
+        Closes the shell session, if any, and releases the connection
+        back to the connection pool.
+
+        :return:
+        """
+        if self._shell:
+            self._shell.close()
+            self._shell = None
+        if self._connection:
+            connection_pool.release(self._connection)
+            self._connection = None
+
     @property
-    def dynamic_vlans(self) -> [int]:
+    def dynamic_vlans(self) -> VLANSet:
         """
-        A list of integers that represent VLAN IDs that have been
-        reserved for dynamic allocation.
+        A :py:class:`VLANSet` of VLAN IDs that have been reserved for
+        dynamic allocation.  The glob is parsed once and the result is
+        memoized.  A :py:class:`ConfigError` is raised if a glob set in
+        the device metadata is invalid.
 
         :return:
         """
         vlan_glob = self.device.metadata.get(
             'dynamic_vlans', config.cumulus_linux.dynamic_vlans)
-        return glob_to_vlan_list(vlan_glob)
+        return _parse_vlan_glob(vlan_glob)
+
+    @property
+    def facts(self) -> DeviceFacts:
+        """
+        The :py:class:`DeviceFacts` for the device.  Facts are gathered
+        from the device the first time they are needed and then cached
+        for all drivers in the process until they expire or are
+        refreshed with :py:meth:`refresh_facts`.  Cached facts are
+        validated against the device's validation token once they are
+        older than the `facts_validate_interval` configuration option,
+        so that changes made by other processes are noticed.  When a
+        facts store is configured, stored facts are used instead of
+        gathering them, provided the validation token still matches.
+
+        :return:
+        """
+        facts_cache.ttl = config.cumulus_linux.facts_ttl
+        if facts := facts_cache.get(self.device.device_id):
+            if not facts_cache.needs_validation(
+                    self.device.device_id,
+                    config.cumulus_linux.facts_validate_interval):
+                return facts
+            if self._validate_facts(facts):
+                facts_cache.set_validated(self.device.device_id)
+                return facts
+            logging.debug(f"Cached facts for {self._device} are stale.")
+            facts_cache.invalidate(self.device.device_id)
+            return self._refresh_facts()
+        if facts := self._load_stored_facts():
+            facts_cache.set(self.device.device_id, facts)
+            return facts
+        return self._refresh_facts()
+
+    @property
+    def _facts_store(self) -> Optional[FactsStore]:
+        """
+        The configured :py:class:`FactsStore`, or None if facts are
+        not persisted.
+
+        :return:
+        """
+        if path := config.cumulus_linux.facts_store_path:
+            return FactsStore(path)
+        return None
+
+    def _load_stored_facts(self) -> Optional[DeviceFacts]:
+        """
+        Loads the device facts from the facts store and validates them
+        against the device by comparing validation tokens.  Returns
+        None if there are no stored facts or they are no longer valid.
+
+        :return:
+        """
+        if not (store := self._facts_store):
+            return None
+        if not (facts := store.load(self.device.device_id)):
+            return None
+        if not self._validate_facts(facts):
+            logging.debug(f"Stored facts for {self._device} are stale.")
+            return None
+        facts.gathered = time.time()
+        return facts
+
+    def _validate_facts(self, facts: DeviceFacts) -> bool:
+        """
+        Compares the validation token of the facts with the device's
+        current validation token.
+
+        :param facts: The :py:class:`DeviceFacts` to validate.
+        :return:
+        """
+        token_data, _ = self._exec_raw_command(
+            facts_task.get_facts_token_command())
+        return facts.token == facts_task.parse_facts_token(token_data)
+
+    def refresh_facts(self) -> DeviceFacts:
+        """
+        Gathers the device facts in a single batch of commands and
+        stores them in the facts cache, and the facts store if one is
+        configured.
+
+        :return:
+        """
+        try:
+            return self._refresh_facts()
+        finally:
+            self._disconnect()
+
+    def _refresh_facts(self) -> DeviceFacts:
+        """
+        Gathers the device facts as :py:meth:`refresh_facts` does, but
+        leaves the connection open for the operation that needs them.
+
+        :return:
+        """
+        results = self._get_facts_results()
+        self._exec_results(results)
+        return self._set_facts(results)
+
+    def _get_facts_results(self) -> [CommandResult]:
+        """
+        Prepares the results of the commands from which the device
+        facts are gathered, so that they can be executed alone or as
+        part of a larger batch.
+
+        :return:
+        """
+        results = [CommandResult(self._format_net_command(command, True),
+                                 command)
+                   for command in FACTS_NET_COMMANDS]
+        results += [CommandResult(command, command)
+                    for command in FACTS_RAW_COMMANDS]
+        return results
+
+    def _set_facts(self, results: [CommandResult]) -> DeviceFacts:
+        """
+        Parses the device facts from executed results prepared by
+        :py:meth:`_get_facts_results` and stores them in the facts
+        cache, and the facts store if one is configured.
+
+        :param results: The executed results.
+        :return:
+        """
+        for result in results[:len(FACTS_NET_COMMANDS)]:
+            try:
+                result.json = self._json_loads(result.stdout)
+            except ValueError:
+                pass
+        results = CommandResultSet(results)
+        facts = facts_task.get_device_facts(
+            *[results.get(command).json for command in FACTS_NET_COMMANDS],
+            *[results.get(command).stdout for command in FACTS_RAW_COMMANDS]
+        )
+        facts_cache.set(self.device.device_id, facts)
+        if store := self._facts_store:
+            store.save(self.device.device_id, facts)
+        return facts
+
+    def _prefetch(self, net_commands: [str], facts: bool = False) -> None:
+        """
+        Executes the commands an operation depends on in a single
+        batch, skipping those whose results are already cached, and
+        places the results in the command result cache.  The commands
+        are executed one at a time if batching has been disabled via
+        the `batch_commands` configuration option.  When
+        :py:attr:`facts` is True the device facts are gathered in the
+        same batch if they are not already cached.  Subsequent
+        lookups made by the operation are then answered from the
+        caches without further round trips to the device.
+
+        :param net_commands: The NETd commands the operation depends
+            on.
+        :param facts: The operation depends on the device facts.
+        :return:
+        """
+        pending = [CommandResult(self._format_net_command(command, True),
+                                 command)
+                   for command in net_commands
+                   if command not in self._result_cache]
+        facts_results = []
+        facts_cache.ttl = config.cumulus_linux.facts_ttl
+        # Stored facts are validated with a command of their own, so
+        # they are left to the facts property.
+        if facts and not facts_cache.get(self.device.device_id) \
+                and not self._facts_store:
+            facts_results = self._get_facts_results()
+        if not pending and not facts_results:
+            return
+        self._exec_results(pending + facts_results)
+        for result in pending:
+            try:
+                result.json = self._json_loads(result.stdout)
+            except ValueError:
+                pass
+            self._result_cache.add(result)
+        if facts_results:
+            self._set_facts(facts_results)
 
     @property
     def bridge(self) -> str:
         """
         Return the name of the bridge device.  If the bridge name is
         explicitly configured, that will be used.  Otherwise, the
-        bridge name will be inferred from the first bridge defined.
+        bridge name will be inferred from the first bridge defined,
+        falling back to :py:data:`DEFAULT_BRIDGE_NAME` if the device
+        has no bridge.
 
         :return:
         """
@@ -72,11 +397,12 @@ class CumulusDriver(DeviceDriver):
         if bridge := self.device.metadata.get(
                 'bridge_name', config.cumulus_linux.bridge_name):
             return bridge
-        # Otherwise, attempt to figure it out.
-        stdout, _ = self._exec_raw_command('ip -o link show type bridge')
-        regex = r'^(?P<ifidx>[\d]*): (?P<ifname>[\S]*):'
-        matches = re.search(regex, stdout)
-        return matches.group('ifname')
+        # Otherwise, use the bridge discovered on the device.
+        if bridge := self.facts.bridge:
+            return bridge
+        logging.debug(f"No bridge found on {self._device}, using "
+                      f"'{DEFAULT_BRIDGE_NAME}'.")
+        return DEFAULT_BRIDGE_NAME
 
     @property
     def loopback_address(self):
@@ -87,13 +413,8 @@ class CumulusDriver(DeviceDriver):
 
         :return:
         """
-        show_int_command = 'show interface lo'
-        show_int_result = self._exec_net_commands([show_int_command])
-        show_int_data = show_int_result.get(show_int_command).json
-        for address in show_int_data['iface_obj']['ip_address']['allentries']:
-            ip_int = ip_interface(address)
-            if ip_int.version == 4 and not ip_int.is_loopback:
-                return str(ip_int.ip)
+        if loopback_address := self.facts.loopback_address:
+            return loopback_address
         raise Exception("Could not find loopback address.")
 
     @property
@@ -103,9 +424,7 @@ class CumulusDriver(DeviceDriver):
 
         :return:
         """
-        version_command = 'show version'
-        version_result = self._exec_net_commands([version_command])
-        return version_result.get(version_command).json['os']
+        return self.facts.version
 
     @property
     def major_version(self) -> int:
@@ -113,7 +432,7 @@ class CumulusDriver(DeviceDriver):
         The OS major version number.
         :return:
         """
-        return int(self.version.split('.')[0])
+        return self.facts.major_version
 
     @property
     def minor_version(self) -> int:
@@ -122,7 +441,7 @@ class CumulusDriver(DeviceDriver):
         :return:
         """
 
-        return int(self.version.split('.')[1])
+        return self.facts.minor_version
 
     @property
     def evpn_mh_supported(self) -> bool:
@@ -131,18 +450,17 @@ class CumulusDriver(DeviceDriver):
 
         :return:
         """
-        supported_version = self.major_version >= 4 and self.minor_version >= 2
-        show_system_commands = 'show system'
-        show_system_result = self._exec_net_commands([show_system_commands])
-        system_data = show_system_result.get(show_system_commands).json
-        supported_platform = False
-        if 'info' in system_data['platform']:
-            soc_data = system_data['platform']['info']['soc']
-            supported_platform = soc_data['vendor'] == "Mellanox"
-        else:
-            supported_platform = system_data['platform']['model'] == 'VX'
+        return self.facts.evpn_mh_supported
 
-        return supported_platform and supported_version
+    @property
+    def _json_loads(self):
+        """
+        The function used to parse JSON command output, selected by the
+        `json_decoder` configuration option.
+
+        :return:
+        """
+        return get_json_decoder(config.cumulus_linux.json_decoder)
 
     @staticmethod
     def _format_net_command(command: str, json: bool) -> str:
@@ -161,6 +479,31 @@ class CumulusDriver(DeviceDriver):
             command = f"{command} json"
         return command
 
+    def _exec_raw_command_status(
+            self, command: str) -> Tuple[str, str, Optional[int]]:
+        """
+        Execute a raw command on the device and returns the raw output
+        along with the command's exit status.  Returns a tuple of
+        stdout and stderr strings, and the exit status.  The exit
+        status may be None if it could not be determined.
+
+        :param command: The command to execute.
+        :return:
+        """
+        if not self._connection:
+            self._connect()
+        start = time.monotonic()
+        if self._shell:
+            stdout, stderr, exit_status = self._shell.run(command)
+        else:
+            result = self._connection.run_command(command, use_pty=True)
+            stdout = "\n".join(list(result.stdout))
+            stderr = "\n".join(list(result.stderr))
+            exit_status = result.exit_code
+        logging.debug(f"Command '{command}' on {self._device} took "
+                      f"{time.monotonic() - start:.3f}s")
+        return stdout, stderr, exit_status
+
     def _exec_raw_command(self, command: str) -> Tuple[str, str]:
         """
         Execute a raw command on the device and returns the raw output.
@@ -169,12 +512,66 @@ class CumulusDriver(DeviceDriver):
         :param command: The command to execute.
         :return:
         """
-        # return self._connection.run(command)
-        result = self._connection.run_command(command, use_pty=True)
-        return "\n".join(list(result.stdout)), "\n".join(list(result.stderr))
+        stdout, stderr, _ = self._exec_raw_command_status(command)
+        return stdout, stderr
+
+    def _exec_batch_commands(self, results: [CommandResult]) -> None:
+        """
+        Executes the commands of several prepared results in a single
+        remote invocation and populates each result with its share of
+        the output.  Output written to stderr cannot be attributed to
+        an individual command and is therefore set on every result.
+
+        :param results: A list of :py:class:`CommandResult` objects
+            that have yet to be executed.
+        :return:
+        """
+        delimiter = generate_batch_delimiter()
+        batch_command = generate_batch_command(
+            [result.command for result in results], delimiter)
+        stdout, stderr = self._exec_raw_command(batch_command)
+        outputs = parse_batch_output(stdout, delimiter, len(results))
+        for result, (output, exit_status) in zip(results, outputs):
+            result.stdout = output
+            result.stderr = stderr
+            result.exit_status = exit_status
+
+    def _exec_results(self, results: [CommandResult],
+                      batch: bool = True) -> None:
+        """
+        Executes the commands of several prepared results and populates
+        each result with its output.  The commands are executed in as
+        few remote invocations as the `batch_max_bytes` budget for the
+        expected output of a batch allows, unless :py:attr:`batch` is
+        False or batching has been disabled via the `batch_commands`
+        configuration option.
+
+        :param results: A list of :py:class:`CommandResult` objects
+            that have yet to be executed.
+        :param batch: Allow the commands to be executed as a batch.
+        :return:
+        """
+        if batch and config.cumulus_linux.batch_commands:
+            batches = split_batches(
+                results, int(config.cumulus_linux.batch_max_bytes))
+        else:
+            batches = [[result] for result in results]
+        for batch_results in batches:
+            if len(batch_results) > 1:
+                self._exec_batch_commands(batch_results)
+            else:
+                result = batch_results[0]
+                stdout, stderr, exit_status = self._exec_raw_command_status(
+                    result.command)
+                result.stdout = stdout
+                result.stderr = stderr
+                result.exit_status = exit_status
+            for result in batch_results:
+                output_sizes.record(result)
 
     def _exec_net_commands(self, commands: [str], json: bool = True,
-                           cache: bool = True) -> CommandResultSet:
+                           cache: bool = True,
+                           batch: bool = True) -> CommandResultSet:
         """
         Executes a list of NETd commands on the device and returns a
         list of results.  Attempt will be made to send the command
@@ -182,14 +579,21 @@ class CumulusDriver(DeviceDriver):
         set to False.  JSON results will be returned already parsed by
         :py:meth:`json.loads()`.
 
+        When more than one command must be sent to the device they will
+        be executed in a single remote invocation unless
+        :py:attr:`batch` is False or batching has been disabled via
+        the `batch_commands` configuration option.
+
         :param commands: A list of commands to be executed.
         :param json: Attempt to get the command's JSON output and parse
             it accordingly.
         :param cache: Search the command result cache for previously
             cached results for the same command.
+        :param batch: Allow the commands to be executed as a batch.
         :return:
         """
         results = CommandResultSet()
+        pending = []
         for command in commands:
             # If we already issued the command, then we'll look in our
             # cache for it unless dictated otherwise.
@@ -197,24 +601,22 @@ class CumulusDriver(DeviceDriver):
                 if cached_result := self._result_cache.get(command):
                     results.append(cached_result)
                     continue
-            # Otherwise, try and fetch the result ourselves.
-            original_command = command
-            command = self._format_net_command(command, json)
-
-            # Prep result class
-            result = CommandResult(command, original_command)
-            stdout, stderr = self._exec_raw_command(result.command)
-            result.stdout = stdout
-            result.stderr = stderr
+            # Otherwise, prep a result class to be filled in below.
+            pending.append(CommandResult(
+                self._format_net_command(command, json), command))
+
+        self._exec_results(pending, batch)
+
+        for result in pending:
             if json:
                 try:
-                    result.json = json_loads(stdout)
-                except JSONDecodeError:
+                    result.json = self._json_loads(result.stdout)
+                except ValueError:
                     pass
             # Append the result to our return value, as well as to
             # our cache.
             results.append(result)
-            self._result_cache.append(result)
+            self._result_cache.add(result)
 
         return results
 
@@ -225,7 +627,28 @@ class CumulusDriver(DeviceDriver):
 
         :return:
         """
-        return self._exec_net_commands(['abort'], False, False)
+        return self._exec_net_commands(['abort'], False, False, batch=False)
+
+    def _invalidate_cache(self, commands: [str]) -> None:
+        """
+        Removes cached results made stale by the given configuration
+        commands.  Results for unrelated object types are kept.  The
+        cached device facts and interface type index are dropped if the
+        commands may have changed them.
+
+        :param commands: A list of configuration commands that have
+            been committed.
+        :return:
+        """
+        stale_commands = get_stale_commands(commands)
+        if stale_commands is None:
+            self._result_cache.clear()
+        else:
+            self._result_cache.invalidate_prefixes(stale_commands)
+        if stale_commands is None or 'show interface' in stale_commands:
+            interface_type_cache.invalidate(self.device.device_id)
+        if facts_are_stale(commands):
+            facts_cache.invalidate(self.device.device_id)
 
     def _exec_config_commands(self, commands: [str]) -> CommandResultSet:
         """
@@ -237,10 +660,13 @@ class CumulusDriver(DeviceDriver):
         :param commands:
         :return:
         """
-        config_results = self._exec_net_commands(commands, False, False)
-        commit_results = self._exec_net_commands(['commit'], False, False)
+        config_results = self._exec_net_commands(commands, False, False,
+                                                 batch=False)
+        commit_results = self._exec_net_commands(['commit'], False, False,
+                                                 batch=False)
         commit_result = commit_results.get('commit')
-        if commit_result.stderr or commit_result.stdout.startswith('ERROR:'):
+        self._invalidate_cache(commands)
+        if is_config_error(commit_result):
             self._exec_config_abort()
             logging.error("An error was encountered with the following "
                           f"config set: {commands}"
@@ -254,6 +680,56 @@ class CumulusDriver(DeviceDriver):
 
         return config_results
 
+    def _get_interface_type_index(self) -> Dict[str, Optional[str]]:
+        """
+        Returns an index of interface name to interface type built from
+        a single :code:`show interface` command.  The index is kept in
+        the process wide :py:data:`interface_type_cache` so that it
+        outlives the request, until it expires or a commit invalidates
+        :code:`show interface`.
+
+        :return:
+        """
+        interface_type_cache.ttl = config.cumulus_linux.interface_type_ttl
+        device_id = self.device.device_id
+        if (type_index := interface_type_cache.get(device_id)) is None:
+            show_int_command = 'show interface'
+            results = self._exec_net_commands([show_int_command])
+            type_index = if_task.get_interface_type_index(
+                results.get(show_int_command).json)
+            interface_type_cache.set(device_id, type_index)
+        return type_index
+
+    def _get_interface_types(self, int_names: [str]) -> Dict[str, Optional[str]]:
+        """
+        Gets the type of several interfaces at once.  The device is
+        only consulted if the type of an interface cannot be determined
+        from its name, using the cached :code:`show interface` index.
+        Interfaces missing from the index may have been created since it
+        was built, so are looked up with the per interface command.
+
+        :param int_names: The names of the interfaces.
+        :return:
+        """
+        int_types = {int_name: if_task.get_interface_type_by_name(int_name)
+                     for int_name in int_names}
+        if all(int_types.values()):
+            return int_types
+        type_index = self._get_interface_type_index()
+        for int_name, int_type in int_types.items():
+            if not int_type and int_name in type_index:
+                int_types[int_name] = type_index[int_name]
+        show_int_commands = {int_name: f'show interface {int_name}'
+                             for int_name, int_type in int_types.items()
+                             if not int_type and int_name not in type_index}
+        if not show_int_commands:
+            return int_types
+        results = self._exec_net_commands(list(show_int_commands.values()))
+        for int_name, show_int_command in show_int_commands.items():
+            int_types[int_name] = if_task.get_interface_type(
+                int_name, results.get(show_int_command).json)
+        return int_types
+
     def _get_interface_type(self, int_name) -> str:
         """
         Gets the type of interface, vlan, bond, vrf, etc.
@@ -261,10 +737,7 @@ class CumulusDriver(DeviceDriver):
         :param int_name: The name of the interface
         :return:
         """
-        show_int_command = f'show interface {int_name}'
-        results = self._exec_net_commands([show_int_command])
-        int_data = results.get(show_int_command)
-        return if_task.get_interface_type(int_name, int_data.json)
+        return self._get_interface_types([int_name])[int_name]
 
     def _get_vxlan_data(self) -> dict:
         """
@@ -285,17 +758,119 @@ class CumulusDriver(DeviceDriver):
             results.get(vlan_data_command).json
         )
 
+    def _get_single_vxlan_data(self, vni: Union[str, int]) -> dict:
+        """
+        Collect data about the configuration of a single VNI using VNI
+        scoped commands, so that the cost does not grow with the
+        number of VNIs on the device.  The VXLAN interface is assumed
+        to be named as the driver names it, allowing the VLAN lookup
+        to be sent in the same batch.  If the device reports another
+        name, the lookup is repeated for that interface.  The result
+        has the same form as :py:meth:`_get_vxlan_data`.
+
+        :param vni: The VNI.
+        :return:
+        """
+        evpn_vni_command = f'show evpn vni {int(vni)}'
+        bgp_evpn_command = f'show bgp evpn vni {int(vni)}'
+        bridge_command = vxlan_task.get_vxlan_bridge_command(f'vxlan{int(vni)}')
+        results = [CommandResult(self._format_net_command(command, True),
+                                 command)
+                   for command in [evpn_vni_command, bgp_evpn_command]]
+        results.append(CommandResult(bridge_command, bridge_command))
+        self._exec_results(results)
+        for result in results:
+            try:
+                result.json = self._json_loads(result.stdout)
+            except ValueError:
+                pass
+        evpn_vni_datum, bgp_vni_datum, bridge_data = \
+            [result.json for result in results]
+        if not isinstance(evpn_vni_datum, dict):
+            return {}
+        vxlan_if = vxlan_task.get_vxlan_interface_name(evpn_vni_datum)
+        if vxlan_if and vxlan_if != f'vxlan{int(vni)}':
+            stdout, _ = self._exec_raw_command(
+                vxlan_task.get_vxlan_bridge_command(vxlan_if))
+            try:
+                bridge_data = self._json_loads(stdout)
+            except ValueError:
+                bridge_data = None
+        return vxlan_task.parse_single_vxlan_data(
+            vni, evpn_vni_datum, bgp_vni_datum,
+            vxlan_task.parse_bridge_vlan_dev(bridge_data))
+
+    def _get_bridge_vlan_set(self) -> VLANSet:
+        """
+        Returns a :py:class:`VLANSet` of the VLAN IDs present on the
+        bridge.
+
+        :return:
+        """
+        vlan_data_command = 'show bridge vlan'
+        vlan_data_results = self._exec_net_commands([vlan_data_command])
+        vlan_data = vlan_data_results.get(vlan_data_command).json
+        return vlan_task.get_vlan_set(vlan_data, self.bridge)
+
+    def get_vlan_membership(self) -> VLANMembership:
+        """
+        Returns a :py:class:`VLANMembership` index of the VLANs carried
+        by each port of the bridge, which answers questions such as
+        which ports carry a VLAN, or whether a VLAN is bound to a VNI,
+        without further commands.  The index is rebuilt only when the
+        cached :code:`show bridge vlan` result changes.
+
+        :return:
+        """
+        try:
+            return self._get_vlan_membership()
+        finally:
+            self._disconnect()
+
+    def _get_vlan_membership(self) -> VLANMembership:
+        """
+        Returns the :py:class:`VLANMembership` index as
+        :py:meth:`get_vlan_membership` does, but leaves the connection
+        open for the operation that needs it.
+
+        :return:
+        """
+        vlan_data_command = 'show bridge vlan'
+        vlan_data_results = self._exec_net_commands([vlan_data_command])
+        result = vlan_data_results.get(vlan_data_command)
+        if self._vlan_membership is None \
+                or self._vlan_membership[0] is not result:
+            self._vlan_membership = (
+                result, vlan_task.get_vlan_membership(result.json, self.bridge))
+        return self._vlan_membership[1]
+
+    def _get_dynamic_vlan_allocator(self, sync: bool = True
+                                    ) -> DynamicVLANAllocator:
+        """
+        Returns the dynamic VLAN allocator for the device.  The
+        allocator's map of used VLANs is synchronized with the device
+        only when it is out of date.
+
+        :param sync: Synchronize the allocator if it is out of date.
+        :return:
+        """
+        allocator = get_allocator(self.device.device_id, self.dynamic_vlans)
+        allocator.strategy = ALLOCATION_STRATEGIES[
+            config.cumulus_linux.dynamic_vlan_strategy]
+        allocator.sync_interval = config.cumulus_linux.dynamic_vlan_sync_interval
+        if sync and allocator.needs_sync():
+            allocator.sync(self._get_bridge_vlan_set())
+        return allocator
+
     def _get_dynamic_vlan(self) -> int:
         """
-        Get a vlan from the configured dynamic vlan pool.
+        Get a vlan from the configured dynamic vlan pool.  The VLAN is
+        reserved until it is committed or released with the dynamic
+        VLAN allocator.
 
         :return:
         """
-        vlan_objects = self._bridge_vlan_read(show_dynamic=True)
-        used_vlans = [vlan.id for vlan in vlan_objects]
-        unused_dynamic_vlans = [vlan for vlan in self.dynamic_vlans
-                                if vlan not in used_vlans]
-        return random.choice(unused_dynamic_vlans)
+        return self._get_dynamic_vlan_allocator().allocate()
 
     def _get_bgp_evpn_data(self) -> dict:
         """
@@ -304,24 +879,54 @@ class CumulusDriver(DeviceDriver):
 
         :return:
         """
-        show_bgp_command = 'show bgp evpn summary'
-        show_bgp_result = self._exec_net_commands([show_bgp_command])
-        evpn_data = show_bgp_result.get(show_bgp_command).json
+        facts = self.facts
+        if facts.bgp_asn is None:
+            raise Exception("Could not find BGP EVPN configuration.")
         return {
-            'asn': evpn_data['as'],
-            'rid': evpn_data['routerId']
+            'asn': facts.bgp_asn,
+            'rid': facts.bgp_router_id
         }
 
     def _interface_read(self, request_data: str = None, cache=True) -> [an_if.Interface]:
+        if request_data:
+            return self._interface_read_single(request_data, cache)
         show_int_command = 'show interface'
         results = self._exec_net_commands([show_int_command], cache=cache)
-        interfaces = if_task.get_interfaces(
-            results.get(show_int_command).json,
-            int_name=request_data)
-        if len(interfaces) == 1 and request_data:
-            return interfaces[0]
-        else:
-            return interfaces
+        inventory = get_inventory(self.device.device_id)
+        if changes := inventory.refresh(results.get(show_int_command).json):
+            logging.debug(f"Interface inventory for {self._device} changed: "
+                          f"{len(changes.added)} added, "
+                          f"{len(changes.removed)} removed, "
+                          f"{len(changes.changed)} changed")
+        return inventory.interfaces
+
+    def _interface_read_single(self, int_name: str,
+                               cache=True) -> Union[an_if.Interface, list]:
+        """
+        Reads a single interface without fetching the full interface
+        table.  The `-v0` subinterface used for EVPN anycast gateways
+        is fetched in the same batch for SVIs.  An empty list is
+        returned if the interface is not found.
+
+        :param int_name: The interface name.
+        :param cache: Use cached command results.
+        :return:
+        """
+        show_int_command = f'show interface {int_name}'
+        show_subint_command = f'show interface {int_name}-v0'
+        commands = [show_int_command]
+        if int_name.startswith('vlan'):
+            commands.append(show_subint_command)
+        results = self._exec_net_commands(commands, cache=cache)
+        int_data = results.get(show_int_command).json
+        if not isinstance(int_data, dict):
+            return []
+        subint_result = results.get(show_subint_command)
+        subint_data = subint_result.json if subint_result else None
+        interface = if_task.get_single_interface(
+            int_name, int_data,
+            subint_data if isinstance(subint_data, dict) else None)
+        return interface if interface else []
 
     def _interface_create(self, request_data: an_if.Interface) -> an_if.Interface:
         # CL doesn't allow creation of loopbacks, and we're not going to support
@@ -335,7 +940,7 @@ class CumulusDriver(DeviceDriver):
 
         commands = if_task.generate_create_commands(request_data, int_type)
         self._exec_config_commands(commands)
-        return self._interface_read(request_data.name, cache=False)
+        return self._interface_read(request_data.name)
 
     def _interface_update(self, request_data: an_if.Interface,
                           update) -> an_if.Interface:
@@ -343,22 +948,119 @@ class CumulusDriver(DeviceDriver):
         # Cumulus has a hard time switching interface modes. To
         # work around this, the interface is deleted and recreated
         # using a merge of the existing configuration and the
-        # configuration provided.  If the mode isn't changed then
-        # those steps are skipped.
+        # configuration provided.  Both steps are applied with a
+        # single commit.  If the mode isn't changed then those steps
+        # are skipped.
         current_config = self._interface_read(request_data.name)
         if update and request_data.mode and request_data.mode != current_config.mode:
             request_data = current_config.merge(request_data)
-            self._interface_delete(request_data.name)
-        # Pass to the command generator, and exec config.
-        commands = if_task.generate_update_commands(request_data, int_type, update)
-        self._exec_config_commands(commands)
-        return self._interface_read(request_data.name, cache=False)
+            commands = if_task.generate_mode_change_commands(
+                request_data, int_type)
+        elif (isinstance(current_config, an_if.Interface)
+              and int_type in ['vlan', 'interface', 'bond']
+              and request_data.mode in [current_config.mode, None]
+              and (update or request_data.mode)):
+            # The mode is unchanged, so only the differences between
+            # the current and requested configuration are applied.
+            commands = if_task.generate_diff_commands(
+                request_data, current_config, int_type, update)
+        else:
+            commands = if_task.generate_update_commands(
+                request_data, int_type, update)
+        if commands:
+            self._exec_config_commands(commands)
+        return self._interface_read(request_data.name)
 
     def _interface_delete(self, request_data: str):
         int_type = self._get_interface_type(request_data)
         commands = if_task.generate_delete_commands(request_data, int_type)
         self._exec_config_commands(commands)
 
+    def interface_views(self) -> List[if_fast_task.InterfaceView]:
+        """
+        Lists the interfaces as lightweight read only
+        :py:class:`InterfaceView` objects, which are much cheaper than
+        :py:class:`Interface` objects when only a few properties of
+        each interface are needed.
+
+        :return:
+        """
+        try:
+            show_int_command = 'show interface'
+            results = self._exec_net_commands([show_int_command])
+            return if_fast_task.get_interface_views(
+                results.get(show_int_command).json)
+        finally:
+            self._disconnect()
+
+    def interface_bulk_update(self, int_names: Union[str, List[str]],
+                              template: an_if.Interface,
+                              update: bool = True,
+                              description_prefix: Optional[str] = None
+                              ) -> List[an_if.Interface]:
+        """
+        Applies the same configuration template to many interfaces with
+        a single commit.  Interfaces may be given as a list of names or
+        as a range such as :code:`swp1-48`.  Commands shared by several
+        interfaces are collapsed using the NCLU range syntax.  Unlike
+        :py:meth:`_interface_update` the interface mode is not
+        inspected, so the template should not change it.
+
+        :param int_names: A list of interface names or an interface
+            range.
+        :param template: An :py:class:`Interface` object holding the
+            configuration to apply.  Its name is ignored.
+        :param update: When True, unset interface properties will be
+            ignored instead of overwritten with default values.
+        :param description_prefix: When set, each interface is given the
+            description :code:`<prefix> <name>` in place of the
+            template's description.
+        :return:
+        """
+        try:
+            if isinstance(int_names, str):
+                int_names = if_task.expand_interface_range(int_names)
+            int_types = self._get_interface_types(int_names)
+            names_by_type = {}
+            for int_name, int_type in int_types.items():
+                if int_type not in ['vlan', 'interface', 'bond']:
+                    raise exc.ObjectNotFound()
+                names_by_type.setdefault(int_type, []).append(int_name)
+            commands = []
+            for int_type, names in names_by_type.items():
+                commands += if_task.generate_bulk_commands(
+                    names, template, int_type, update, description_prefix)
+            if commands:
+                self._exec_config_commands(commands)
+            return [interface for interface in self._interface_read()
+                    if interface.name in int_types]
+        finally:
+            self._disconnect()
+
+    def poll_counters(self) -> Dict[str, InterfaceCounters]:
+        """
+        Samples the counters of every interface on the device with a
+        single command execution, and returns the counters along with
+        the deltas and per second rates since the previous poll of the
+        same device in this process.  The statistics are read from the
+        kernel rather than NETd, so this is cheap enough to call every
+        few seconds.
+
+        :return:
+        """
+        try:
+            start = time.monotonic()
+            stdout, _ = self._exec_raw_command(
+                counters_task.get_counters_command())
+            # The midpoint of the execution is the best estimate of
+            # when the sample was taken on the device.
+            timestamp = (start + time.monotonic()) / 2
+            samples = counters_task.parse_link_stats(self._json_loads(stdout))
+            tracker = get_counter_tracker(self.device.device_id)
+            return tracker.update(timestamp, samples)
+        finally:
+            self._disconnect()
+
     def _bridge_vlan_read(self, request_data: Optional[Union[str, int]] = None,
                           show_dynamic: bool = False) -> Union[List[an_vlan.VLAN], an_vlan.VLAN]:
         vlan_data_command = 'show bridge vlan'
@@ -371,6 +1073,32 @@ class CumulusDriver(DeviceDriver):
         else:
             return vlans
 
+    def bridge_vlan_iter(self, offset: int = 0, limit: Optional[int] = None,
+                         vid_range: Optional[Tuple[int, int]] = None,
+                         show_dynamic: bool = False) -> Iterator[an_vlan.VLAN]:
+        """
+        Returns an iterator over a page of the VLANs on the bridge.  The
+        VLAN IDs are filtered and paged as compressed ranges, so only
+        the :py:class:`VLAN` objects for the requested page are built,
+        as they are consumed.
+
+        :param offset: The number of VLANs to skip.
+        :param limit: The maximum number of VLANs to return.
+        :param vid_range: A tuple of the first and last VLAN ID to
+            include.
+        :param show_dynamic: Include dynamic VLANs in the response.
+        :return:
+        """
+        try:
+            vlan_data_command = 'show bridge vlan'
+            vlan_data_results = self._exec_net_commands([vlan_data_command])
+            vlan_data = vlan_data_results.get(vlan_data_command).json
+            return vlan_task.iter_vlans(vlan_data, self.bridge,
+                                        self.dynamic_vlans, show_dynamic,
+                                        offset, limit, vid_range)
+        finally:
+            self._disconnect()
+
     def _bridge_vlan_create(self, request_data: an_vlan.VLAN) -> an_vlan.VLAN:
         if request_data.id in self.dynamic_vlans:
             raise exc.DriverOperationUnsupported(
@@ -389,6 +1117,66 @@ class CumulusDriver(DeviceDriver):
 
         self._exec_config_commands(commands)
 
+    def bridge_vlan_bulk_create(
+            self, vlan_ids: Union[str, Iterable[Union[str, int]]]
+    ) -> List[an_vlan.VLAN]:
+        """
+        Creates many VLANs with a single range command and commit.
+        VLANs may be given as IDs, VLAN globs such as
+        :code:`100-199,300`, or a mix of both.  No VLANs are created if
+        any of them are reserved for dynamic allocation.
+
+        :param vlan_ids: A VLAN glob or an iterable of VLAN IDs and
+            globs.
+        :return:
+        """
+        try:
+            vids = self._check_bulk_vlan_ids(vlan_ids)
+            commands = vlan_task.generate_bulk_create_vlan_commands(
+                vids, self.bridge)
+            if commands:
+                self._exec_config_commands(commands)
+            return [an_vlan.VLAN(id=vid, admin_enabled=True) for vid in vids]
+        finally:
+            self._disconnect()
+
+    def bridge_vlan_bulk_delete(
+            self, vlan_ids: Union[str, Iterable[Union[str, int]]]) -> None:
+        """
+        Deletes many VLANs with a single range command and commit.
+        VLANs may be given as IDs, VLAN globs such as
+        :code:`100-199,300`, or a mix of both.  No VLANs are deleted if
+        any of them are reserved for dynamic allocation.
+
+        :param vlan_ids: A VLAN glob or an iterable of VLAN IDs and
+            globs.
+        :return:
+        """
+        try:
+            vids = self._check_bulk_vlan_ids(vlan_ids)
+            commands = vlan_task.generate_bulk_delete_vlan_commands(
+                vids, self.bridge)
+            if commands:
+                self._exec_config_commands(commands)
+        finally:
+            self._disconnect()
+
+    def _check_bulk_vlan_ids(
+            self, vlan_ids: Union[str, Iterable[Union[str, int]]]) -> VLANSet:
+        """
+        Parses the VLAN IDs of a bulk operation and verifies that none
+        of them are reserved for dynamic allocation.
+
+        :param vlan_ids: A VLAN glob or an iterable of VLAN IDs and
+            globs.
+        :return:
+        """
+        vids = vlan_task.parse_vlan_ids(vlan_ids)
+        if reserved := vids & self.dynamic_vlans:
+            raise exc.DriverOperationUnsupported(
+                self, f"Requested VLAN IDs {reserved.to_glob()} are reserved.")
+        return vids
+
     def _vrf_read(self, request_data: str = None) -> Union[List[an_vrf.VRF], an_vrf.VRF]:
         ip_vrf_data, _ = self._exec_raw_command('ip -o link show type vrf')
         vrfs = vrf_task.get_vrfs(ip_vrf_data, request_data)
@@ -406,30 +1194,69 @@ class CumulusDriver(DeviceDriver):
         self._exec_config_commands(commands)
 
     def _tunnels_vxlan_read(self, request_data: str = None) -> Union[List[an_vxlan.VXLAN], an_vxlan.VXLAN]:
-        vxlan_data = self._get_vxlan_data()
+        if request_data:
+            vxlan_data = self._get_single_vxlan_data(request_data)
+        else:
+            vxlan_data = self._get_vxlan_data()
         vxlans = vxlan_task.get_vxlans(vxlan_data, request_data)
         if request_data and len(vxlans) == 1:
             return vxlans[0]
         return vxlans
 
+    def _get_vxlan_create_dependencies(
+            self, request_data: an_vxlan.VXLAN) -> [str]:
+        """
+        Declares the NETd commands that creating a VXLAN depends on.
+        The bridge VLANs are needed to check the VLAN bound by an L2
+        VNI, or to synchronize the dynamic VLAN allocator before
+        binding an L3 VNI.  The BGP EVPN data and loopback address
+        come from the device facts.
+
+        :param request_data: The :py:class:`VXLAN` to be created.
+        :return:
+        """
+        if request_data.layer == 2 \
+                or self._get_dynamic_vlan_allocator(sync=False).needs_sync():
+            return ['show bridge vlan']
+        return []
+
     def _tunnels_vxlan_create(self, request_data: an_vxlan.VXLAN) -> an_vxlan.VXLAN:
+        # Fetch everything the operation depends on in a single round.
+        self._prefetch(self._get_vxlan_create_dependencies(request_data),
+                       facts=True)
         dynamic_vlan = self._get_dynamic_vlan() if request_data.layer == 3 else None
-        bgp_data = self._get_bgp_evpn_data()
+        try:
+            bgp_data = self._get_bgp_evpn_data()
 
-        # We default to no ip forwarding and enable it only if the VLAN exists.
-        ip_forward = False
-        if request_data.layer == 2 and self._bridge_vlan_read(request_data.bound_object_id):
-            ip_forward = True
+            # We default to no ip forwarding and enable it only if the VLAN exists.
+            ip_forward = False
+            if request_data.layer == 2 and self._bridge_vlan_read(request_data.bound_object_id):
+                ip_forward = True
 
-        commands = vxlan_task.generate_create_vxlan_commands(
-            request_data, self.loopback_address, bgp_data, dynamic_vlan, ip_forward)
-        self._exec_config_commands(commands)
+            commands = vxlan_task.generate_create_vxlan_commands(
+                request_data, self.loopback_address, bgp_data, dynamic_vlan, ip_forward)
+            self._exec_config_commands(commands)
+        except Exception:
+            # Hand the VLAN back and resync with the device before the
+            # next allocation in case the failure was due to a conflict.
+            # The allocator is not synchronized here, which could raise
+            # another error and hide the original one.
+            if dynamic_vlan:
+                allocator = self._get_dynamic_vlan_allocator(sync=False)
+                allocator.release(dynamic_vlan)
+                allocator.invalidate()
+            raise
+        if dynamic_vlan:
+            self._get_dynamic_vlan_allocator(sync=False).commit(dynamic_vlan)
         return self._tunnels_vxlan_read(str(request_data.id))
 
     def _tunnels_vxlan_delete(self, request_data: str) -> None:
-        vxlan_data = self._get_vxlan_data()
+        vxlan_data = self._get_single_vxlan_data(request_data)
         commands = vxlan_task.generate_delete_vxlan_commands(request_data, vxlan_data)
         self._exec_config_commands(commands)
+        if l3_vxlan_vlan := vxlan_data[int(request_data)]['l3_vxlan_vlan']:
+            get_allocator(self.device.device_id,
+                          self.dynamic_vlans).release(l3_vxlan_vlan)
 
     def _interface_lag_read(self, request_data: str, cache=True) -> Union[List[an_lag.LAG], an_lag.LAG]:
         show_bonds_command = 'show interface bonds'
@@ -453,14 +1280,14 @@ class CumulusDriver(DeviceDriver):
                     self, 'EVPN ESI must be Type 3.')
         commands = lag_task.generate_create_lag_commands(request_data)
         self._exec_config_commands(commands)
-        return self._interface_lag_read(request_data.name, cache=False)
+        return self._interface_lag_read(request_data.name)
 
     def _interface_lag_update(self, request_data: an_lag.LAG, update: bool) -> an_lag.LAG:
         original_lag = self._interface_lag_read(request_data.name)
         commands = lag_task.generate_update_lag_commands(
             request_data, original_lag, update)
         self._exec_config_commands(commands)
-        return self._interface_lag_read(request_data.name, cache=False)
+        return self._interface_lag_read(request_data.name)
 
     def _interface_lag_delete(self, request_data: str) -> None:
         commands = lag_task.generate_delete_lag_commands(request_data)
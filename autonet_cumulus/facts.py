@@ -0,0 +1,244 @@
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from dataclasses import asdict, dataclass, field, fields
+from typing import Optional, Union
+from urllib.parse import quote
+
+
+@dataclass
+class DeviceFacts(object):
+    """
+    Facts about a device that rarely change and are expensive to
+    discover, such as the OS version and platform.  Facts are gathered
+    in a single round trip and cached by :py:class:`FactsCache`.
+    """
+    version: Optional[str]
+    soc_vendor: Optional[str] = field(default=None)
+    platform_model: Optional[str] = field(default=None)
+    bridge: Optional[str] = field(default=None)
+    loopback_address: Optional[str] = field(default=None)
+    bgp_asn: Optional[int] = field(default=None)
+    bgp_router_id: Optional[str] = field(default=None)
+    token: Optional[str] = field(default=None)
+    gathered: float = field(default_factory=time.time)
+
+    def _version_part(self, index: int) -> Optional[int]:
+        """
+        Returns one number of the OS version, or None if the version is
+        unknown or does not have that many parts.
+
+        :param index: The index of the number in the version.
+        :return:
+        """
+        try:
+            return int(self.version.split('.')[index])
+        except (AttributeError, IndexError, ValueError):
+            return None
+
+    @property
+    def major_version(self) -> Optional[int]:
+        """
+        The OS major version number, or None if it is unknown.
+
+        :return:
+        """
+        return self._version_part(0)
+
+    @property
+    def minor_version(self) -> Optional[int]:
+        """
+        The OS minor version number, or None if it is unknown.
+
+        :return:
+        """
+        return self._version_part(1)
+
+    @property
+    def evpn_mh_supported(self) -> bool:
+        """
+        Indicate that the device OS and platform support EVPN MH.
+
+        :return:
+        """
+        if self.major_version is None or self.minor_version is None:
+            return False
+        supported_version = self.major_version >= 4 and self.minor_version >= 2
+        if self.soc_vendor:
+            supported_platform = self.soc_vendor == 'Mellanox'
+        else:
+            supported_platform = self.platform_model == 'VX'
+        return supported_platform and supported_version
+
+
+class FactsCache(object):
+    """
+    A process wide cache of :py:class:`DeviceFacts` indexed by device
+    ID.  Facts older than :py:attr:`ttl` seconds are treated as
+    missing so that they will be gathered again.  The time the facts
+    of each device were last validated against the device is also
+    recorded, so that changes made by other processes are noticed
+    before the facts expire.
+    """
+
+    def __init__(self, ttl: float = 3600):
+        """
+        :param ttl: Seconds facts are considered valid.
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._facts = {}
+        self._validated = {}
+
+    def get(self, device_id: Union[str, int]) -> Optional[DeviceFacts]:
+        """
+        Returns the cached facts for a device, or None if there are no
+        valid facts cached.
+
+        :param device_id: The device ID.
+        :return:
+        """
+        with self._lock:
+            facts = self._facts.get(device_id)
+            if facts and time.time() - facts.gathered > self.ttl:
+                del self._facts[device_id]
+                self._validated.pop(device_id, None)
+                facts = None
+        return facts
+
+    def set(self, device_id: Union[str, int], facts: DeviceFacts) -> None:
+        """
+        Caches the facts for a device.
+
+        :param device_id: The device ID.
+        :param facts: A :py:class:`DeviceFacts` object.
+        :return:
+        """
+        with self._lock:
+            self._facts[device_id] = facts
+            self._validated[device_id] = time.monotonic()
+
+    def needs_validation(self, device_id: Union[str, int],
+                         interval: float) -> bool:
+        """
+        Indicates that the cached facts for a device were last gathered
+        or validated more than :py:attr:`interval` seconds ago.
+
+        :param device_id: The device ID.
+        :param interval: Seconds between validations.
+        :return:
+        """
+        with self._lock:
+            validated = self._validated.get(device_id)
+        return validated is None or time.monotonic() - validated >= interval
+
+    def set_validated(self, device_id: Union[str, int]) -> None:
+        """
+        Records that the cached facts for a device have been validated
+        against the device.
+
+        :param device_id: The device ID.
+        :return:
+        """
+        with self._lock:
+            if device_id in self._facts:
+                self._validated[device_id] = time.monotonic()
+
+    def invalidate(self, device_id: Union[str, int]) -> None:
+        """
+        Removes the cached facts for a device.
+
+        :param device_id: The device ID.
+        :return:
+        """
+        with self._lock:
+            self._facts.pop(device_id, None)
+            self._validated.pop(device_id, None)
+
+
+class FactsStore(object):
+    """
+    Persists :py:class:`DeviceFacts` to disk so that they survive
+    process restarts.  Each device's facts are stored as a compact JSON
+    document in its own file within :py:attr:`path`, named after the
+    device ID.  Stored facts carry the validation token gathered with
+    them, which the caller compares against the device before trusting
+    them.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: The directory in which facts are stored.
+        """
+        self.path = path
+
+    def _file_name(self, device_id: Union[str, int]) -> str:
+        """
+        Returns the file name used to store a device's facts.
+
+        :param device_id: The device ID.
+        :return:
+        """
+        return os.path.join(self.path,
+                            f"{quote(str(device_id), safe='')}.json")
+
+    def load(self, device_id: Union[str, int]) -> Optional[DeviceFacts]:
+        """
+        Loads the stored facts for a device.  Returns None if there are
+        no stored facts or they cannot be read.
+
+        :param device_id: The device ID.
+        :return:
+        """
+        try:
+            with open(self._file_name(device_id), 'r') as fh:
+                data = json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not load stored facts for {device_id}: {e}")
+            return None
+        field_names = {f.name for f in fields(DeviceFacts)}
+        try:
+            return DeviceFacts(**{k: v for k, v in data.items()
+                                  if k in field_names})
+        except TypeError as e:
+            logging.warning(f"Stored facts for {device_id} are invalid: {e}")
+            return None
+
+    def save(self, device_id: Union[str, int], facts: DeviceFacts) -> None:
+        """
+        Stores the facts for a device.  The file is replaced atomically
+        so that concurrent readers never see a partial document.
+
+        :param device_id: The device ID.
+        :param facts: A :py:class:`DeviceFacts` object.
+        :return:
+        """
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            with os.fdopen(fd, 'w') as fh:
+                json.dump(asdict(facts), fh, separators=(',', ':'))
+            os.replace(tmp_name, self._file_name(device_id))
+        except OSError as e:
+            logging.warning(f"Could not store facts for {device_id}: {e}")
+
+    def delete(self, device_id: Union[str, int]) -> None:
+        """
+        Removes the stored facts for a device.
+
+        :param device_id: The device ID.
+        :return:
+        """
+        try:
+            os.remove(self._file_name(device_id))
+        except FileNotFoundError:
+            pass
+
+
+facts_cache = FactsCache()
@@ -0,0 +1,65 @@
+import threading
+import time
+
+from typing import Dict, Optional, Union
+
+
+class InterfaceTypeCache(object):
+    """
+    A process wide cache of interface type indexes, as built by
+    :py:func:`autonet_cumulus.tasks.interface.get_interface_type_index`,
+    indexed by device ID.  Indexes older than :py:attr:`ttl` seconds are
+    treated as missing so that they will be built again, which bounds
+    how long changes made by other processes go unnoticed.
+    """
+
+    def __init__(self, ttl: float = 300):
+        """
+        :param ttl: Seconds an index is considered valid.
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._indexes = {}
+
+    def get(self, device_id: Union[str, int]
+            ) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Returns the cached interface type index for a device, or None
+        if there is no valid index cached.
+
+        :param device_id: The device ID.
+        :return:
+        """
+        with self._lock:
+            if (entry := self._indexes.get(device_id)) is None:
+                return None
+            built, type_index = entry
+            if time.monotonic() - built > self.ttl:
+                del self._indexes[device_id]
+                return None
+        return type_index
+
+    def set(self, device_id: Union[str, int],
+            type_index: Dict[str, Optional[str]]) -> None:
+        """
+        Caches the interface type index for a device.
+
+        :param device_id: The device ID.
+        :param type_index: A map of interface name to interface type.
+        :return:
+        """
+        with self._lock:
+            self._indexes[device_id] = (time.monotonic(), type_index)
+
+    def invalidate(self, device_id: Union[str, int]) -> None:
+        """
+        Removes the cached interface type index for a device.
+
+        :param device_id: The device ID.
+        :return:
+        """
+        with self._lock:
+            self._indexes.pop(device_id, None)
+
+
+interface_type_cache = InterfaceTypeCache()
@@ -0,0 +1,114 @@
+import threading
+
+from autonet.core.objects import interfaces as an_if
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Union
+
+from autonet_cumulus.tasks import interface_fast as if_fast_task
+
+
+@dataclass
+class InventoryChanges(object):
+    """
+    The names of the interfaces that were added, removed or changed by
+    a :py:meth:`InterfaceInventory.refresh`.
+    """
+    added: Set[str] = field(default_factory=set)
+    removed: Set[str] = field(default_factory=set)
+    changed: Set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+class InterfaceInventory(object):
+    """
+    Keeps the :py:class:`Interface` objects built from the last
+    :code:`show interface` output seen for a device, along with the
+    raw data each was built from.  When the inventory is refreshed,
+    only interfaces whose raw data changed are converted again, so the
+    cost of a refresh is proportional to the churn rather than to the
+    size of the inventory.
+
+    The :py:class:`Interface` objects kept by the inventory are shared
+    between refreshes, so callers are only ever handed copies of them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._show_int_data = None
+        self._raw: Dict[str, dict] = {}
+        self._interfaces: Dict[str, an_if.Interface] = {}
+        self._vrf_set: Set[str] = set()
+
+    @property
+    def interfaces(self) -> List[an_if.Interface]:
+        """
+        Copies of the interfaces in the order they were reported by the
+        device, which the caller is free to modify.
+
+        :return:
+        """
+        with self._lock:
+            interfaces = list(self._interfaces.values())
+        return [if_fast_task.copy_object(interface)
+                for interface in interfaces]
+
+    def refresh(self, show_int_data: dict) -> InventoryChanges:
+        """
+        Updates the inventory from the output of the
+        :code:`show interface` command and reports which interfaces
+        were added, removed or changed.  If the set of VRFs has
+        changed, every routed interface is converted again since its
+        VRF may have changed too.
+
+        :param show_int_data: Data from the :code:`show interface`
+            command.
+        :return:
+        """
+        changes = InventoryChanges()
+        with self._lock:
+            if show_int_data is self._show_int_data:
+                return changes
+            vrf_set, selected = if_fast_task.select_interfaces(show_int_data)
+            vrfs_changed = vrf_set != self._vrf_set
+            raw = {}
+            interfaces = {}
+            for int_name, int_data, _ in selected:
+                raw[int_name] = int_data
+                previous = self._interfaces.get(int_name)
+                if previous is not None and self._raw[int_name] == int_data:
+                    if not vrfs_changed or previous.mode != 'routed':
+                        interfaces[int_name] = previous
+                        continue
+                interface = if_fast_task.get_interface(
+                    int_name, int_data, None, vrf_set)
+                interfaces[int_name] = interface
+                if previous is None:
+                    changes.added.add(int_name)
+                elif interface != previous:
+                    changes.changed.add(int_name)
+            changes.removed = self._interfaces.keys() - interfaces.keys()
+            self._show_int_data = show_int_data
+            self._raw = raw
+            self._interfaces = interfaces
+            self._vrf_set = vrf_set
+        return changes
+
+
+_inventories: Dict[Union[str, int], InterfaceInventory] = {}
+_inventories_lock = threading.Lock()
+
+
+def get_inventory(device_id: Union[str, int]) -> InterfaceInventory:
+    """
+    Returns the process wide :py:class:`InterfaceInventory` for a
+    device, creating it if needed.
+
+    :param device_id: The device ID.
+    :return:
+    """
+    with _inventories_lock:
+        if (inventory := _inventories.get(device_id)) is None:
+            inventory = _inventories[device_id] = InterfaceInventory()
+    return inventory
@@ -0,0 +1,283 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import weakref
+
+from collections import OrderedDict
+from gevent.timeout import Timeout as GTimeout
+from pssh.clients import SSHClient
+from pssh.exceptions import Timeout
+from typing import Callable, Optional, Tuple
+
+
+PoolKey = Tuple[str, str, str]
+
+
+def get_pool_key(address: str, username: str,
+                 password: Optional[str] = None) -> PoolKey:
+    """
+    Generates the key used to index connections in the pool.  The
+    password is hashed so that it is not held in the key itself.
+
+    :param address: The device address.
+    :param username: The username used to authenticate.
+    :param password: The password used to authenticate.
+    :return:
+    """
+    password_hash = hashlib.sha256((password or '').encode()).hexdigest()
+    return str(address), username, password_hash
+
+
+class ConnectionPool(object):
+    """
+    A process wide pool of authenticated :py:class:`SSHClient` objects
+    indexed by device address and credentials.  Connections are leased
+    with :py:meth:`acquire` and handed back with :py:meth:`release`.
+    Idle connections are discarded once they exceed the idle timeout,
+    or when the pool grows beyond its maximum size, oldest first.  A
+    connection is checked for health before it is handed out by
+    running a no-op command over it.
+
+    The clients run on the gevent hub of the thread that created them
+    and cannot be used from any other thread, so an idle connection is
+    only handed out to the thread that created it.  Discarded
+    connections are likewise only disconnected by the thread that
+    created them, the next time that thread acquires or releases a
+    connection.  The connections of threads that have exited are
+    abandoned without disconnecting.
+
+    Connections are never shared with a forked child process.  The
+    pool is emptied in the child after a fork without disconnecting
+    the sessions that still belong to the parent.
+    """
+
+    def __init__(self, max_size: int = 32, idle_timeout: float = 300,
+                 keepalive_seconds: int = 60, health_timeout: float = 5,
+                 client_factory: Callable[..., SSHClient] = SSHClient):
+        """
+        :param max_size: The maximum number of idle connections kept.
+        :param idle_timeout: Seconds an idle connection is kept before
+            being discarded.
+        :param keepalive_seconds: The keepalive interval configured on
+            new connections.
+        :param health_timeout: Seconds to wait for the health check of
+            an idle connection to complete.
+        :param client_factory: Callable used to create new clients.
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.keepalive_seconds = keepalive_seconds
+        self.health_timeout = health_timeout
+        self._client_factory = client_factory
+        self._lock = threading.RLock()
+        # Maps id(client) to a tuple of key, owning thread, client and
+        # release time in the order the connections were released.
+        self._idle = OrderedDict()
+        self._keys = weakref.WeakKeyDictionary()
+        # Maps the owning thread to the discarded connections waiting
+        # to be disconnected by that thread.
+        self._expired = weakref.WeakKeyDictionary()
+
+    def configure(self, max_size: int, idle_timeout: float,
+                  keepalive_seconds: int,
+                  health_timeout: Optional[float] = None) -> None:
+        """
+        Update the pool settings.  Settings are applied to idle
+        connections the next time the pool is accessed, and the
+        keepalive interval to connections created afterwards.
+
+        :param max_size: The maximum number of idle connections kept.
+        :param idle_timeout: Seconds an idle connection is kept before
+            being discarded.
+        :param keepalive_seconds: The keepalive interval configured on
+            new connections.
+        :param health_timeout: Seconds to wait for the health check of
+            an idle connection to complete.  Unchanged if not given.
+        :return:
+        """
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.keepalive_seconds = keepalive_seconds
+        if health_timeout is not None:
+            self.health_timeout = health_timeout
+
+    def __len__(self):
+        return len(self._idle)
+
+    def _is_healthy(self, client: SSHClient) -> bool:
+        """
+        Determine if a connection can still be used by running a no-op
+        command over it.  A keepalive is not enough as it does not wait
+        for a reply, so a half-open connection would still pass.
+
+        :param client: The client to check.
+        :return:
+        """
+        if client.session is None or client.sock is None or client.sock.closed:
+            return False
+        try:
+            with GTimeout(seconds=self.health_timeout or None,
+                          exception=Timeout):
+                output = client.run_command('true')
+                client.wait_finished(output)
+        except Exception as e:
+            logging.debug(f"Pooled connection failed health check: {e}")
+            return False
+        return output.exit_code == 0
+
+    def _discard(self, owner: threading.Thread, client: SSHClient) -> None:
+        """
+        Queue a connection to be disconnected by the thread that created
+        it.  The connection of a thread that has exited is abandoned;
+        its socket is closed first so that de-allocating the client on
+        another thread does not try to use the exited thread's hub.
+
+        :param owner: The thread that created the connection.
+        :param client: The client to discard.
+        :return:
+        """
+        if owner.is_alive():
+            self._expired.setdefault(owner, []).append(client)
+            return
+        try:
+            client.sock.close()
+        except Exception:
+            pass
+
+    def _close_expired(self) -> None:
+        """
+        Disconnect the discarded connections created by the calling
+        thread.
+
+        :return:
+        """
+        with self._lock:
+            clients = self._expired.pop(threading.current_thread(), [])
+        for client in clients:
+            # SSHClient.disconnect() is a deprecated no-op, the session
+            # is otherwise only closed when the client is de-allocated.
+            client._disconnect()
+
+    def _expire(self) -> None:
+        """
+        Discard idle connections that have exceeded the idle timeout,
+        that belong to a thread that has exited or that do not fit
+        within the maximum pool size.
+
+        :return:
+        """
+        now = time.monotonic()
+        for client_id, (_, owner, client, released) in list(
+                self._idle.items()):
+            if now - released > self.idle_timeout or not owner.is_alive():
+                del self._idle[client_id]
+                self._discard(owner, client)
+        while len(self._idle) > self.max_size:
+            _, (_, owner, client, _) = self._idle.popitem(last=False)
+            self._discard(owner, client)
+
+    def acquire(self, address: str, username: str,
+                password: Optional[str] = None) -> SSHClient:
+        """
+        Lease a connection to the given device.  An idle connection
+        created by the calling thread will be used if a healthy one is
+        available, otherwise a new connection is established.
+
+        :param address: The device address.
+        :param username: The username used to authenticate.
+        :param password: The password used to authenticate.
+        :return:
+        """
+        key = get_pool_key(address, username, password)
+        thread = threading.current_thread()
+        with self._lock:
+            self._expire()
+            candidates = [(client_id, client)
+                          for client_id, (idle_key, owner, client, _)
+                          in reversed(self._idle.items())
+                          if idle_key == key and owner is thread]
+        self._close_expired()
+        # The health checks wait on the network, so are run without
+        # holding the lock.
+        for client_id, client in candidates:
+            with self._lock:
+                if self._idle.pop(client_id, None) is None:
+                    continue
+            if self._is_healthy(client):
+                logging.debug(f"Reusing pooled connection to {address}")
+                return client
+            client._disconnect()
+        client = self._client_factory(
+            str(address), user=username, password=password,
+            keepalive_seconds=self.keepalive_seconds)
+        with self._lock:
+            self._keys[client] = (key, thread)
+        return client
+
+    def release(self, client: SSHClient) -> None:
+        """
+        Return a leased connection to the pool.  Connections that were
+        not created by the pool are ignored.
+
+        :param client: The client to return.
+        :return:
+        """
+        with self._lock:
+            if (owner := self._keys.get(client)) is None:
+                return
+            key, thread = owner
+            self._idle[id(client)] = (key, thread, client, time.monotonic())
+            self._expire()
+        self._close_expired()
+
+    def discard(self, client: SSHClient) -> None:
+        """
+        Remove a connection from the pool entirely, e.g. because it is
+        known to be broken.
+
+        :param client: The client to discard.
+        :return:
+        """
+        with self._lock:
+            self._idle.pop(id(client), None)
+            self._keys.pop(client, None)
+
+    def clear(self) -> None:
+        """
+        Discard all idle connections.
+
+        :return:
+        """
+        with self._lock:
+            for _, owner, client, _ in self._idle.values():
+                self._discard(owner, client)
+            self._idle.clear()
+        self._close_expired()
+
+    def _reset_after_fork(self) -> None:
+        """
+        Abandon all connections inherited from the parent process.  The
+        child's copies of the sockets are closed first so that
+        de-allocating the clients does not disconnect the parent's
+        sessions.
+
+        :return:
+        """
+        self._lock = threading.RLock()
+        clients = [client for _, _, client, _ in self._idle.values()]
+        for expired in self._expired.values():
+            clients.extend(expired)
+        for client in clients:
+            try:
+                client.sock.close()
+            except Exception:
+                pass
+        self._idle.clear()
+        self._keys.clear()
+        self._expired.clear()
+
+
+connection_pool = ConnectionPool()
+os.register_at_fork(after_in_child=connection_pool._reset_after_fork)
@@ -0,0 +1,199 @@
+import logging
+import re
+
+from gevent.timeout import Timeout as GTimeout
+from pssh.clients import SSHClient
+from pssh.exceptions import SessionError, Timeout
+from ssh2.error_codes import LIBSSH2_ERROR_EAGAIN
+from typing import Optional, Tuple
+from uuid import uuid4
+
+
+def generate_shell_input(command: str, marker: str) -> str:
+    """
+    Generates the text written to the shell in order to execute a
+    command.  The command is followed by a marker on stdout that
+    carries the command's exit status and a second marker on stderr,
+    so that the end of both streams can be detected.
+
+    :param command: The command to execute.
+    :param marker: The marker that terminates the command's output.
+    :return:
+    """
+    return (f"{command}\n"
+            f"printf '\\n{marker}:%s\\n' \"$?\"; "
+            f"printf '\\n{marker}\\n' 1>&2\n")
+
+
+def _strip_output(output: bytes) -> bytes:
+    """
+    Removes the line terminator from the end of the output so that it
+    matches output collected by :py:meth:`SSHClient.run_command`.
+
+    :param output: Output collected ahead of a marker.
+    :return:
+    """
+    return output[:-1] if output.endswith(b'\n') else output
+
+
+def parse_stdout_marker(buffer: bytes,
+                        marker: str) -> Optional[Tuple[bytes, int, bytes]]:
+    """
+    Searches the stdout buffer for the marker written by
+    :py:func:`generate_shell_input`.  If it is found a tuple of the
+    command output, exit status and any data remaining in the buffer
+    after the marker is returned, otherwise :code:`None` is returned.
+
+    :param buffer: The data read from stdout.
+    :param marker: The marker used to generate the shell input.
+    :return:
+    """
+    regex = rb'\n' + re.escape(marker.encode()) + rb':(?P<status>\d+)\r?\n'
+    if match := re.search(regex, buffer):
+        return (_strip_output(buffer[:match.start()]),
+                int(match.group('status')),
+                buffer[match.end():])
+    return None
+
+
+def parse_stderr_marker(buffer: bytes,
+                        marker: str) -> Optional[Tuple[bytes, bytes]]:
+    """
+    Searches the stderr buffer for the marker written by
+    :py:func:`generate_shell_input`.  If it is found a tuple of the
+    command's stderr output and any data remaining in the buffer after
+    the marker is returned, otherwise :code:`None` is returned.
+
+    :param buffer: The data read from stderr.
+    :param marker: The marker used to generate the shell input.
+    :return:
+    """
+    regex = rb'\n' + re.escape(marker.encode()) + rb'\r?\n'
+    if match := re.search(regex, buffer):
+        return _strip_output(buffer[:match.start()]), buffer[match.end():]
+    return None
+
+
+class ShellSession(object):
+    """
+    A shell running on a single SSH channel.  Commands are written to
+    the shell one at a time and their output is read back until a
+    marker is found on both stdout and stderr.  This avoids the cost
+    of opening a new channel, PTY and login shell for every command
+    executed.  The driver opens a session when an operation first
+    needs the device and closes it when the operation completes, so a
+    session serves every command of one operation.
+
+    No PTY is requested for the channel so that stdout and stderr
+    remain separate and the shell does not echo input or print
+    prompts.
+    """
+
+    def __init__(self, client: SSHClient, encoding: str = 'utf-8',
+                 read_timeout: Optional[float] = None):
+        """
+        :param client: A connected :py:class:`SSHClient`.
+        :param encoding: The encoding used for commands and output.
+        :param read_timeout: Timeout in seconds to wait for a command
+            to complete.  The session is closed if it is exceeded.
+            Wait indefinitely if None.
+        """
+        self._client = client
+        self._encoding = encoding
+        self._read_timeout = read_timeout
+        self._marker = f'__AUTONET_SHELL_{uuid4().hex}__'
+        self._stdout = b''
+        self._stderr = b''
+        self._channel = client.open_session()
+        client.eagain(self._channel.shell)
+        # Flush anything emitted by login scripts before the first
+        # real command is run.
+        self.run(':')
+
+    @property
+    def closed(self) -> bool:
+        """
+        Indicates that the remote shell has exited.
+
+        :return:
+        """
+        return self._channel is None or self._channel.eof()
+
+    def _read(self) -> bool:
+        """
+        Reads any data that is available from stdout and stderr into
+        the session buffers.  Returns True if any data was read.
+
+        :return:
+        """
+        progress = False
+        for read_func, attr in ((self._channel.read, '_stdout'),
+                                (self._channel.read_stderr, '_stderr')):
+            size, data = read_func()
+            if size == LIBSSH2_ERROR_EAGAIN or size == 0:
+                continue
+            if size < 0:
+                raise SessionError(f"Error {size} reading from shell.")
+            setattr(self, attr, getattr(self, attr) + data)
+            progress = True
+        return progress
+
+    def run(self, command: str) -> Tuple[str, str, int]:
+        """
+        Executes a command in the shell and returns a tuple of stdout,
+        stderr and the exit status of the command.
+
+        :param command: The command to execute.
+        :return:
+        """
+        if self.closed:
+            raise SessionError("Shell session has been closed.")
+        logging.debug(f"Executing command in shell: '{command}'")
+        self._client.eagain_write(
+            self._channel.write,
+            generate_shell_input(command, self._marker).encode(self._encoding))
+
+        stdout_result = stderr_result = None
+        try:
+            with GTimeout(seconds=self._read_timeout, exception=Timeout):
+                while stdout_result is None or stderr_result is None:
+                    if not self._read():
+                        if self._channel.eof():
+                            raise SessionError("Shell exited unexpectedly.")
+                        self._client.poll()
+                    if stdout_result is None:
+                        if stdout_result := parse_stdout_marker(
+                                self._stdout, self._marker):
+                            self._stdout = stdout_result[2]
+                    if stderr_result is None:
+                        if stderr_result := parse_stderr_marker(
+                                self._stderr, self._marker):
+                            self._stderr = stderr_result[1]
+        except Timeout:
+            # The command may still be running, and its output would
+            # be read as that of the next command, so the shell can
+            # not be used again.
+            self.close()
+            raise
+
+        stdout, exit_status, _ = stdout_result
+        stderr, _ = stderr_result
+        return (stdout.decode(self._encoding, errors='replace'),
+                stderr.decode(self._encoding, errors='replace'),
+                exit_status)
+
+    def close(self) -> None:
+        """
+        Exits the remote shell and closes the channel.
+
+        :return:
+        """
+        if self._channel is None:
+            return
+        try:
+            if not self._channel.eof():
+                self._client.eagain_write(self._channel.write, b'exit\n')
+            self._client.close_channel(self._channel)
+        except Exception as e:
+            logging.debug(f"Error encountered closing shell session: {e}")
+        self._channel = None
@@ -0,0 +1,45 @@
+from array import array
+from typing import Dict
+
+from autonet_cumulus.counters import (COUNTER_FIELDS, COUNTER_TYPECODE_32,
+                                      COUNTER_TYPECODE_64)
+
+
+def get_counters_command() -> str:
+    """
+    Returns the shell command used to collect the statistics of every
+    interface on the device in a single invocation.  It is far cheaper
+    than NETd, so it is suitable for frequent polling.
+
+    :return:
+    """
+    return 'ip -s -j link show'
+
+
+def parse_link_stats(ip_link_data: list) -> Dict[str, array]:
+    """
+    Parses the output of the :code:`ip -s -j link show` command and
+    returns a map of interface name to an array of counter values,
+    ordered as :py:data:`COUNTER_FIELDS`.  The 64 bit statistics are
+    used where the kernel provides them.  Samples of the 32 bit
+    statistics are held in arrays of typecode
+    :py:data:`COUNTER_TYPECODE_32`, so that they are known to wrap.
+    Interfaces without statistics are omitted.
+
+    :param ip_link_data: The parsed JSON output of
+        :code:`ip -s -j link show`.
+    :return:
+    """
+    counters = {}
+    for link in ip_link_data:
+        if stats := link.get('stats64'):
+            values = array(COUNTER_TYPECODE_64)
+        elif stats := link.get('stats'):
+            values = array(COUNTER_TYPECODE_32)
+        else:
+            continue
+        for field in COUNTER_FIELDS:
+            direction, _, name = field.partition('_')
+            values.append(int(stats[direction].get(name, 0)))
+        counters[link['ifname']] = values
+    return counters
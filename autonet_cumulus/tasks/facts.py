@@ -0,0 +1,174 @@
+import re
+
+from ipaddress import ip_interface
+from typing import Optional, Tuple
+
+from autonet_cumulus.facts import DeviceFacts
+
+
+def get_facts_token_command() -> str:
+    """
+    Returns a shell command whose output changes whenever the device
+    facts may have changed.  The output includes the kernel boot ID,
+    which changes on every reboot or upgrade, the OS version, and a
+    hash of the bridge names, the loopback addresses and the BGP ASN
+    and router ID configuration.  Commits that change anything else,
+    such as VLANs or interfaces, leave the output unchanged.
+
+    :return:
+    """
+    return ('cat /proc/sys/kernel/random/boot_id; '
+            "grep -s '^VERSION_ID=' /etc/os-release; "
+            '{ ip -o link show type bridge | cut -d: -f2; '
+            "ip -o addr show dev lo | awk '{print $4}'; "
+            "grep -sE '^ *(router bgp|bgp router-id)' /etc/frr/frr.conf; "
+            "} | md5sum | cut -d' ' -f1")
+
+
+def parse_facts_token(token_data: str) -> str:
+    """
+    Normalizes the output of the command from
+    :py:func:`get_facts_token_command` into a single token.
+
+    :param token_data: Output from the token command.
+    :return:
+    """
+    return ','.join(line.strip() for line in token_data.splitlines()
+                    if line.strip())
+
+
+def parse_bridge_name(ip_bridge_data: Optional[str]) -> Optional[str]:
+    """
+    Parses the output of the :code:`ip -o link show type bridge`
+    command and returns the name of the first bridge, or None if there
+    are no bridges.
+
+    :param ip_bridge_data: Output from the
+        :code:`ip -o link show type bridge` command.
+    :return:
+    """
+    regex = r'^(?P<ifidx>[\d]*): (?P<ifname>[\S]*):'
+    if not isinstance(ip_bridge_data, str):
+        return None
+    if matches := re.search(regex, ip_bridge_data, re.MULTILINE):
+        return matches.group('ifname')
+    return None
+
+
+def parse_loopback_address(show_int_lo_data: Optional[dict]) -> Optional[str]:
+    """
+    Returns the first IPv4 address on the loopback interface that is
+    not itself a loopback address, or None if there is no such
+    address or the output could not be parsed.
+
+    :param show_int_lo_data: Output from the :code:`show interface lo`
+        command.
+    :return:
+    """
+    try:
+        addresses = show_int_lo_data['iface_obj']['ip_address']['allentries']
+    except (KeyError, TypeError):
+        return None
+    for address in addresses or []:
+        try:
+            ip_int = ip_interface(address)
+        except ValueError:
+            continue
+        if ip_int.version == 4 and not ip_int.is_loopback:
+            return str(ip_int.ip)
+    return None
+
+
+def parse_platform(
+        show_system_data: Optional[dict]
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Returns a tuple of the SoC vendor and platform model from the
+    output of the :code:`show system` command.  The SoC vendor is only
+    present on hardware platforms.  Either is None if it could not be
+    found.
+
+    :param show_system_data: Output from the :code:`show system`
+        command.
+    :return:
+    """
+    if not isinstance(show_system_data, dict) \
+            or not isinstance(platform := show_system_data.get('platform'),
+                              dict):
+        return None, None
+    try:
+        soc_vendor = platform['info']['soc']['vendor']
+    except (KeyError, TypeError):
+        soc_vendor = None
+    return soc_vendor, platform.get('model')
+
+
+def parse_version(show_version_data: Optional[dict]) -> Optional[str]:
+    """
+    Returns the OS version string from the output of the
+    :code:`show version` command, or None if it could not be found.
+
+    :param show_version_data: Output from the :code:`show version`
+        command.
+    :return:
+    """
+    if not isinstance(show_version_data, dict):
+        return None
+    return show_version_data.get('os')
+
+
+def parse_bgp_evpn_data(
+        show_bgp_evpn_data: Optional[dict]
+) -> Tuple[Optional[int], Optional[str]]:
+    """
+    Returns a tuple of the BGP ASN and router ID used for the EVPN
+    address family.  If BGP is not configured :code:`None, None` is
+    returned.
+
+    :param show_bgp_evpn_data: Output from the
+        :code:`show bgp evpn summary` command.
+    :return:
+    """
+    if not isinstance(show_bgp_evpn_data, dict):
+        return None, None
+    return show_bgp_evpn_data.get('as'), show_bgp_evpn_data.get('routerId')
+
+
+def get_device_facts(show_version_data: Optional[dict],
+                     show_system_data: Optional[dict],
+                     show_int_lo_data: Optional[dict],
+                     show_bgp_evpn_data: Optional[dict],
+                     ip_bridge_data: str,
+                     token_data: Optional[str] = None) -> DeviceFacts:
+    """
+    Parses the output of several commands into a
+    :py:class:`DeviceFacts` object.  Each fact is parsed from its own
+    command output, and a fact whose output is missing or could not be
+    parsed is set to None without affecting the others.
+
+    :param show_version_data: Output from the :code:`show version`
+        command.
+    :param show_system_data: Output from the :code:`show system`
+        command.
+    :param show_int_lo_data: Output from the :code:`show interface lo`
+        command.
+    :param show_bgp_evpn_data: Output from the
+        :code:`show bgp evpn summary` command.
+    :param ip_bridge_data: Output from the
+        :code:`ip -o link show type bridge` command.
+    :param token_data: Output from the command returned by
+        :py:func:`get_facts_token_command`.
+    :return:
+    """
+    soc_vendor, platform_model = parse_platform(show_system_data)
+    bgp_asn, bgp_router_id = parse_bgp_evpn_data(show_bgp_evpn_data)
+    return DeviceFacts(
+        version=parse_version(show_version_data),
+        soc_vendor=soc_vendor,
+        platform_model=platform_model,
+        bridge=parse_bridge_name(ip_bridge_data),
+        loopback_address=parse_loopback_address(show_int_lo_data),
+        bgp_asn=bgp_asn,
+        bgp_router_id=bgp_router_id,
+        token=parse_facts_token(token_data) if token_data else None
+    )
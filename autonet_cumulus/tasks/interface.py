@@ -1,9 +1,15 @@
+import dataclasses
 import ipaddress
 import re
 
 from autonet.core.objects import interfaces as an_if
-from autonet.util.config_string import vlan_list_to_glob, glob_to_vlan_list
-from typing import Optional, Tuple, Union
+from typing import Dict, List, Optional, Tuple, Union
+
+from autonet_cumulus.vlan_set import VLANSet
+
+
+# The MTU of an interface without an explicit MTU configured.
+DEFAULT_MTU = 9216
 
 
 def parse_svi_name(name: str) -> int:
@@ -51,6 +57,80 @@ def parse_vrf_names(show_int_data: dict) -> [str]:
             if data['mode'] == 'VRF']
 
 
+def expand_interface_range(int_range: str) -> [str]:
+    """
+    Expands an interface range, using the same syntax as NCLU, into a
+    list of interface names.  For example :code:`swp1-3,swp10,12`
+    becomes :code:`swp1, swp2, swp3, swp10, swp12`.  A chunk without
+    a prefix uses the prefix of the chunk before it.  Names that are
+    not ranges are returned as they are.
+
+    :param int_range: The interface range.
+    :return:
+    """
+    regex = r'^(?P<prefix>[a-zA-Z_-]*?)(?P<start>\d+)(-(?P<stop>\d+))?$'
+    int_names = []
+    prefix = ''
+    for chunk in int_range.replace(' ', ',').split(','):
+        if not chunk:
+            continue
+        if not (match := re.match(regex, chunk)):
+            int_names.append(chunk)
+            continue
+        prefix = match.group('prefix') or prefix
+        start = int(match.group('start'))
+        stop = int(match.group('stop') or start)
+        int_names += [f'{prefix}{i}' for i in range(start, stop + 1)]
+    return int_names
+
+
+def compress_interface_names(int_names: [str]) -> str:
+    """
+    Compresses a list of interface names into the NCLU range syntax,
+    the reverse of :py:func:`expand_interface_range`.  For example
+    :code:`swp1, swp2, swp3, swp10` becomes :code:`swp1-3,swp10`.
+
+    :param int_names: A list of interface names.
+    :return:
+    """
+    regex = r'^(?P<prefix>[a-zA-Z_-]*?)(?P<number>\d+)$'
+    numbered: Dict[str, List[int]] = {}
+    chunks = []
+    for int_name in int_names:
+        if match := re.match(regex, int_name):
+            numbered.setdefault(match.group('prefix'), []).append(
+                int(match.group('number')))
+        else:
+            chunks.append(int_name)
+    for prefix, numbers in numbered.items():
+        numbers = sorted(set(numbers))
+        start = prev = numbers[0]
+        for number in numbers[1:] + [None]:
+            if number == prev + 1:
+                prev = number
+                continue
+            chunks.append(f'{prefix}{start}' if start == prev
+                          else f'{prefix}{start}-{prev}')
+            start = prev = number
+    return ','.join(chunks)
+
+
+def get_interface_type_by_name(int_name: str) -> Optional[str]:
+    """
+    Determine the type of interface from the interface name alone.
+    Only physical interfaces and SVIs can be identified this way, for
+    other interfaces None is returned.
+
+    :param int_name: The interface name.
+    :return:
+    """
+    if int_name.startswith('swp'):
+        return 'interface'
+    if int_name.startswith('vlan'):
+        return 'vlan'
+    return None
+
+
 def get_interface_type(int_name, int_data):
     """
     Determine the type of interface represented by the interface name
@@ -63,10 +143,8 @@ def get_interface_type(int_name, int_data):
     :param int_data: The interface data object.
     :return:
     """
-    if int_name.startswith('swp'):
-        return 'interface'
-    if int_name.startswith('vlan'):
-        return 'vlan'
+    if int_type := get_interface_type_by_name(int_name):
+        return int_type
     if int_data['mode'] == '802.3ad':
         return 'bond'
     if int_data['mode'] == 'VRF':
@@ -86,6 +164,19 @@ def get_interface_type(int_name, int_data):
     return 'vxlan'
 
 
+def get_interface_type_index(show_int_data: dict) -> Dict[str, Optional[str]]:
+    """
+    Builds an index of interface name to interface type, as returned
+    by :py:func:`get_interface_type`, for every interface in the
+    output of the :code:`show interface` command.
+
+    :param show_int_data: The data returned from :code:`show interface`
+    :return:
+    """
+    return {int_name: get_interface_type(int_name, int_data)
+            for int_name, int_data in show_int_data.items()}
+
+
 def get_interface_master(summary: str) -> Optional[str]:
     """
     Parses the summary string from the interface to determine master
@@ -175,10 +266,24 @@ def get_route_attributes(
         )
 
     return an_if.InterfaceRouteAttributes(
-        addresses=addresses, vrf=vrf
+        addresses=addresses, vrf=vrf,
+        evpn_anycast_mac=get_anycast_mac(subint_data)
     )
 
 
+def get_anycast_mac(subint_data: Optional[dict]) -> Optional[str]:
+    """
+    Returns the EVPN anycast MAC of an SVI, which is the MAC address of
+    its `-v0` subinterface, or None if the SVI has no anycast gateway.
+
+    :param subint_data: The interface data for the `-v0` subinterface.
+    :return:
+    """
+    if not subint_data:
+        return None
+    return subint_data['iface_obj']['mac'] or None
+
+
 def get_bridge_attributes(int_data: dict) -> an_if.InterfaceBridgeAttributes:
     """
     Parses the interface data and builds a
@@ -189,7 +294,8 @@ def get_bridge_attributes(int_data: dict) -> an_if.InterfaceBridgeAttributes:
     return an_if.InterfaceBridgeAttributes(
         dot1q_enabled=int_data['iface_obj']['vlan_filtering'],
         dot1q_pvid=int_data['iface_obj']['native_vlan'],
-        dot1q_vids=glob_to_vlan_list(int_data['iface_obj']['vlan_list'])
+        dot1q_vids=VLANSet.from_glob(
+            int_data['iface_obj']['vlan_list']).to_list()
     )
 
 
@@ -276,6 +382,38 @@ def get_interfaces(show_int_data: dict, int_name: str = None) -> [an_if.Interfac
     return interfaces
 
 
+def get_single_interface(int_name: str, int_data: dict,
+                         subint_data: dict = None) -> Optional[an_if.Interface]:
+    """
+    Parses the output of :code:`show interface <name>` for a single
+    interface and returns a populated :py:class:`Interface` object, or
+    None if the interface is not of a type returned by
+    :py:func:`get_interfaces`.  Unlike :py:func:`get_interfaces` the
+    full interface table is not needed.  A routed interface can only
+    be enslaved to a VRF, so the VRF is taken from the interface's
+    master.
+
+    :param int_name: The interface name.
+    :param int_data: Data from the :code:`show interface <name>`
+        command.
+    :param subint_data: Data from the :code:`show interface <name>-v0`
+        command for SVIs with an EVPN anycast gateway.
+    :return:
+    """
+    if int_data.get('mode') == 'NotConfigured':
+        return None
+    int_type = get_interface_type(int_name, int_data)
+    if int_type not in ['interface', 'bond', 'vlan']:
+        return None
+    if subint_data and subint_data['mode'] == 'NotConfigured':
+        subint_data = None
+    if int_type != 'vlan':
+        subint_data = None
+    master, _ = parse_summary(int_data['summary'])
+    vrf_list = [master] if master else []
+    return get_interface(int_name, int_data, subint_data, vrf_list)
+
+
 def generate_bridge_commands(attributes: an_if.InterfaceBridgeAttributes,
                              add_base: str, del_base: str) -> [str]:
     """
@@ -294,7 +432,7 @@ def generate_bridge_commands(attributes: an_if.InterfaceBridgeAttributes,
         if attributes.dot1q_pvid:
             commands.append(f'{add_base} bridge pvid {attributes.dot1q_pvid}')
         if attributes.dot1q_vids:
-            vlan_glob = vlan_list_to_glob(attributes.dot1q_vids)
+            vlan_glob = VLANSet(attributes.dot1q_vids).to_glob()
             commands.append(f'{add_base} bridge trunk vlans {vlan_glob}')
     else:
         commands.append(f'{del_base} bridge trunk')
@@ -320,17 +458,56 @@ def generate_route_commands(attributes: an_if.InterfaceRouteAttributes,
     if attributes.vrf:
         commands.append(f'{add_base} vrf {attributes.vrf}')
     for address in attributes.addresses:
-        af = 'ip' if address.family == 'ipv4' else 'ipv6'
-        if address.virtual and address.virtual_type == 'anycast':
-            address_type = 'address-virtual'
-            mac = f"{attributes.evpn_anycast_mac} ".lower().replace('-', ':')
-        else:
-            address_type = 'address'
-            mac = ''
-        commands.append(f'{add_base} {af} {address_type} {mac}{address.address}')
+        commands.append(
+            generate_address_command(address, attributes, add_base))
     return commands
 
 
+def is_anycast_address(address: an_if.InterfaceAddress) -> bool:
+    """
+    Indicates that an address is an anycast address, which is
+    configured along with the EVPN anycast MAC.
+
+    :param address: An :py:class:`InterfaceAddress` object.
+    :return:
+    """
+    return bool(address.virtual) and address.virtual_type == 'anycast'
+
+
+def format_anycast_mac(mac: Optional[str]) -> Optional[str]:
+    """
+    Formats an EVPN anycast MAC the way NCLU expects it, so that MACs
+    given in different notations can be compared.
+
+    :param mac: The MAC address, or None.
+    :return:
+    """
+    return mac.lower().replace('-', ':') if mac else mac
+
+
+def generate_address_command(address: an_if.InterfaceAddress,
+                             attributes: an_if.InterfaceRouteAttributes,
+                             base: str) -> str:
+    """
+    Generate the command to add or delete a single interface address.
+
+    :param address: An :py:class:`InterfaceAddress` object.
+    :param attributes: The :py:class:`InterfaceRouteAttributes` object
+        that provides the EVPN anycast MAC for anycast addresses.
+    :param base: The base command returned from
+        :py:func:`get_base_command`.
+    :return:
+    """
+    af = 'ip' if address.family == 'ipv4' else 'ipv6'
+    if is_anycast_address(address):
+        address_type = 'address-virtual'
+        mac = f"{format_anycast_mac(attributes.evpn_anycast_mac)} "
+    else:
+        address_type = 'address'
+        mac = ''
+    return f'{base} {af} {address_type} {mac}{address.address}'
+
+
 def generate_basic_interface_commands(interface: an_if.Interface,
                                       add_base: str, del_base: str) -> [str]:
     """
@@ -426,6 +603,239 @@ def generate_update_interface_commands(interface: an_if.Interface,
         return commands
 
 
+def generate_basic_diff_commands(interface: an_if.Interface,
+                                 current: an_if.Interface,
+                                 add_base: str, del_base: str,
+                                 update: bool = False) -> [str]:
+    """
+    Generate the commands needed to change the basic attributes of an
+    interface, such as MTU and description, from the current values
+    to the desired values.  Unless :py:attr:`update` is True, unset
+    attributes other than the link speed are reset to their defaults.
+
+    :param interface: The desired :py:class:`Interface` object.
+    :param current: The current :py:class:`Interface` object.
+    :param add_base: The base command returned from
+        :py:func:`get_base_command` for configuration adds.
+    :param del_base: The base command returned from
+        :py:func:`get_base_command` for configuration deletes.
+    :param update: Ignore unset attributes instead of resetting them.
+    :return:
+    """
+    commands = []
+    admin_enabled = interface.admin_enabled
+    if admin_enabled is None and not update:
+        admin_enabled = True
+    if admin_enabled is False and current.admin_enabled is not False:
+        commands.append(f'{add_base} link down')
+    if admin_enabled is True and current.admin_enabled is False:
+        commands.append(f'{del_base} link down')
+    if interface.mtu and interface.mtu != current.mtu:
+        commands.append(f'{add_base} mtu {interface.mtu}')
+    elif not interface.mtu and not update and current.mtu \
+            and current.mtu != DEFAULT_MTU:
+        commands.append(f'{del_base} mtu')
+    if interface.description and interface.description != current.description:
+        commands.append(f'{add_base} alias "{interface.description}"')
+    elif not interface.description and not update and current.description:
+        commands.append(f'{del_base} alias')
+    # The current speed is the operational link speed rather than a
+    # configured one, so an unset speed is never reset.
+    if 'interface' in add_base and interface.speed \
+            and interface.speed != current.speed:
+        commands.append(f'{add_base} link speed {interface.speed}')
+    return commands
+
+
+def generate_route_diff_commands(attributes: an_if.InterfaceRouteAttributes,
+                                 current: an_if.InterfaceRouteAttributes,
+                                 add_base: str, del_base: str,
+                                 update: bool = False) -> [str]:
+    """
+    Generate the commands needed to change the VRF and addresses of a
+    routed interface from the current values to the desired values.
+    Each address is added or deleted individually.  When
+    :py:attr:`update` is True addresses are only ever added, matching
+    :py:meth:`InterfaceRouteAttributes.merge`.
+
+    :param attributes: The desired
+        :py:class:`InterfaceRouteAttributes` object.
+    :param current: The current :py:class:`InterfaceRouteAttributes`
+        object.
+    :param add_base: The base command returned from
+        :py:func:`get_base_command` for configuration adds.
+    :param del_base: The base command returned from
+        :py:func:`get_base_command` for configuration deletes.
+    :param update: Ignore unset attributes instead of resetting them.
+    :return:
+    """
+    commands = []
+    if attributes.vrf and attributes.vrf != current.vrf:
+        commands.append(f'{add_base} vrf {attributes.vrf}')
+    elif not attributes.vrf and not update and current.vrf:
+        commands.append(f'{del_base} vrf {current.vrf}')
+
+    def address_key(address: an_if.InterfaceAddress):
+        return address.address, bool(address.virtual), address.virtual_type
+
+    current_addresses = current.addresses
+    desired_addresses = attributes.addresses
+    desired_keys = {address_key(address) for address in desired_addresses}
+    if attributes.evpn_anycast_mac \
+            and format_anycast_mac(attributes.evpn_anycast_mac) \
+            != format_anycast_mac(current.evpn_anycast_mac):
+        # The anycast addresses are configured along with the MAC, so
+        # they are deleted with the current MAC and added again with
+        # the new one.  Anycast addresses kept by an update move too.
+        anycast = [address for address in current_addresses
+                   if is_anycast_address(address)]
+        commands += [generate_address_command(address, current, del_base)
+                     for address in anycast]
+        current_addresses = [address for address in current_addresses
+                             if not is_anycast_address(address)]
+        if update:
+            desired_addresses = desired_addresses + [
+                address for address in anycast
+                if address_key(address) not in desired_keys]
+
+    current_keys = {address_key(address) for address in current_addresses}
+    if not update:
+        for address in current_addresses:
+            if address_key(address) not in desired_keys:
+                commands.append(
+                    generate_address_command(address, current, del_base))
+    for address in desired_addresses:
+        if address_key(address) not in current_keys:
+            commands.append(
+                generate_address_command(address, attributes, add_base))
+    return commands
+
+
+def generate_bridge_diff_commands(attributes: an_if.InterfaceBridgeAttributes,
+                                  current: an_if.InterfaceBridgeAttributes,
+                                  add_base: str, del_base: str,
+                                  update: bool = False) -> [str]:
+    """
+    Generate the commands needed to change the bridging configuration
+    of an interface from the current values to the desired values.
+    Trunk VLANs are added and removed by difference rather than
+    replacing the whole trunk.  Switching between access and trunk
+    ports reconfigures the port with :py:func:`generate_bridge_commands`.
+
+    :param attributes: The desired
+        :py:class:`InterfaceBridgeAttributes` object.
+    :param current: The current :py:class:`InterfaceBridgeAttributes`
+        object.
+    :param add_base: The base command returned from
+        :py:func:`get_base_command` for configuration adds.
+    :param del_base: The base command returned from
+        :py:func:`get_base_command` for configuration deletes.
+    :param update: Ignore unset attributes instead of resetting them.
+    :return:
+    """
+    if attributes.dot1q_enabled != current.dot1q_enabled:
+        return generate_bridge_commands(attributes, add_base, del_base)
+    commands = []
+    if not attributes.dot1q_enabled:
+        if attributes.dot1q_pvid and attributes.dot1q_pvid != current.dot1q_pvid:
+            commands.append(f'{add_base} bridge access {attributes.dot1q_pvid}')
+        elif not attributes.dot1q_pvid and not update and current.dot1q_pvid:
+            commands.append(f'{del_base} bridge access')
+        return commands
+
+    if attributes.dot1q_pvid and attributes.dot1q_pvid != current.dot1q_pvid:
+        commands.append(f'{add_base} bridge pvid {attributes.dot1q_pvid}')
+    elif not attributes.dot1q_pvid and not update and current.dot1q_pvid:
+        commands.append(f'{del_base} bridge pvid')
+    if attributes.dot1q_vids or not update:
+        commands += generate_trunk_vlan_commands(
+            VLANSet(attributes.dot1q_vids), VLANSet(current.dot1q_vids),
+            add_base, del_base)
+    return commands
+
+
+def generate_trunk_vlan_commands(vids: VLANSet, current_vids: VLANSet,
+                                 add_base: str, del_base: str) -> [str]:
+    """
+    Generate the commands that change the VLANs allowed on a trunk from
+    :py:attr:`current_vids` to :py:attr:`vids`.  Only the VLANs added
+    and removed are sent, compacted into ranges.  If describing the
+    change takes more ranges than describing the whole set, the trunk
+    VLANs are replaced instead.
+
+    :param vids: The desired trunk VLANs.
+    :param current_vids: The current trunk VLANs.
+    :param add_base: The base command returned from
+        :py:func:`get_base_command` for configuration adds.
+    :param del_base: The base command returned from
+        :py:func:`get_base_command` for configuration deletes.
+    :return:
+    """
+    added = vids - current_vids
+    removed = current_vids - vids
+    delta_ranges = len(list(added.ranges())) + len(list(removed.ranges()))
+    if removed and delta_ranges > len(list(vids.ranges())):
+        commands = [f'{del_base} bridge trunk']
+        if vids:
+            commands.append(f'{add_base} bridge trunk vlans {vids.to_glob()}')
+        return commands
+    commands = []
+    if removed:
+        commands.append(f'{del_base} bridge trunk vlans {removed.to_glob()}')
+    if added:
+        commands.append(f'{add_base} bridge trunk vlans {added.to_glob()}')
+    return commands
+
+
+def generate_diff_commands(interface: an_if.Interface,
+                           current: an_if.Interface, int_type: str,
+                           update: bool = False) -> [str]:
+    """
+    Generate the smallest set of commands that changes an interface
+    from its current configuration to the desired configuration,
+    instead of removing and recreating the interface.  The interface
+    mode must not change, since changing modes requires the interface
+    to be recreated.  An empty list is returned if the interface
+    already matches the desired configuration.
+
+    :param interface: The desired :py:class:`Interface` object.
+    :param current: The current :py:class:`Interface` object as read
+        from the device.
+    :param int_type: An interface type returned from
+        :py:func`get_interface_type`.
+    :param update: Ignore unset attributes instead of resetting them.
+    :return:
+    """
+    if interface.mode and interface.mode != current.mode:
+        raise Exception("Interface mode changes cannot be diffed.")
+    add_base = get_base_command(interface.name, int_type, 'add')
+    del_base = get_base_command(interface.name, int_type, 'del')
+
+    commands = generate_basic_diff_commands(
+        interface, current, add_base, del_base, update)
+    attributes = interface.attributes
+    if attributes is None and not update:
+        if current.mode == 'routed':
+            attributes = an_if.InterfaceRouteAttributes(addresses=[])
+        elif current.mode == 'bridged':
+            attributes = an_if.InterfaceBridgeAttributes(
+                dot1q_enabled=current.attributes.dot1q_enabled)
+    if attributes and current.mode == 'routed':
+        commands += generate_route_diff_commands(
+            attributes, current.attributes, add_base, del_base, update)
+    if commands and not update and int_type == 'vlan' \
+            and current.mode == 'routed':
+        # As when the SVI is recreated, turn IP forwarding back on in
+        # case it was disabled as part of a VXLAN binding.  The state
+        # is not reported by the device, so this is only done when the
+        # SVI is being changed anyway.
+        commands.append(f'{del_base} ip forward off')
+    if attributes and current.mode == 'bridged':
+        commands += generate_bridge_diff_commands(
+            attributes, current.attributes, add_base, del_base, update)
+    return commands
+
+
 def generate_create_commands(interface: an_if.Interface,
                              int_type: str) -> [str]:
     """
@@ -461,6 +871,70 @@ def generate_update_commands(interface: an_if.Interface, int_type: str,
         return []
 
 
+def generate_mode_change_commands(interface: an_if.Interface,
+                                  int_type: str) -> [str]:
+    """
+    Generate a list of commands that deletes an interface's
+    configuration and recreates it in a new mode.  The commands are
+    meant to be applied with a single commit, so that the interface is
+    only reloaded once.
+
+    :param interface: An :py:class:`Interface` object with the complete
+        configuration of the interface in its new mode.
+    :param int_type: The type of interface, vlan, bond, vrf, etc.
+    :return:
+    """
+    return (generate_delete_commands(interface.name, int_type)
+            + generate_update_commands(interface, int_type, update=True))
+
+
+def generate_bulk_commands(int_names: [str], template: an_if.Interface,
+                           int_type: str, update: bool = True,
+                           description_prefix: Optional[str] = None
+                           ) -> [str]:
+    """
+    Generate a list of commands that applies the same configuration
+    template to many interfaces of the same type.  Commands are
+    generated for each interface with :py:func:`generate_update_commands`
+    and then collapsed, so that a command shared by several interfaces
+    is emitted once using the NCLU range syntax, e.g.
+    :code:`add interface swp1-48 mtu 9216`.
+
+    :param int_names: A list of interface names.
+    :param template: An :py:class:`Interface` object holding the
+        configuration to apply.  Its name is ignored.
+    :param int_type: The type of the interfaces, vlan, bond, etc.
+    :param update: When True, unset interface properties will be
+        ignored instead of overwritten with default values.
+    :param description_prefix: When set, each interface is given the
+        description :code:`<prefix> <name>` in place of the template's
+        description.
+    :return:
+    """
+    # Maps the command, less its base, to the interfaces that share it,
+    # keeping the order in which the commands were first generated.
+    suffixes: Dict[Tuple[str, str], List[str]] = {}
+    for int_name in int_names:
+        interface = dataclasses.replace(template, name=int_name)
+        if description_prefix:
+            interface.description = f'{description_prefix} {int_name}'
+        bases = {action: get_base_command(int_name, int_type, action)
+                 for action in ['add', 'del']}
+        for command in generate_update_commands(interface, int_type, update):
+            action = command.split(' ', 1)[0]
+            suffix = command[len(bases[action]):]
+            suffixes.setdefault((action, suffix), []).append(int_name)
+
+    commands = []
+    for (action, suffix), names in suffixes.items():
+        if int_type == 'vlan':
+            target = VLANSet(parse_svi_name(name) for name in names).to_glob()
+        else:
+            target = compress_interface_names(names)
+        commands.append(f'{action} {int_type} {target}{suffix}')
+    return commands
+
+
 def generate_delete_commands(int_name: str, int_type: str) -> [str]:
     """
     Create a list of commands to destroy or reset and interface, as
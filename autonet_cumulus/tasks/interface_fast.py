@@ -0,0 +1,425 @@
+import dataclasses
+import ipaddress
+import macaddress
+import re
+
+from autonet.core import exceptions as exc
+from autonet.core.objects import interfaces as an_if
+from functools import lru_cache
+from typing import List, Optional, Set, Tuple, Union
+
+from autonet_cumulus.tasks import interface as if_task
+from autonet_cumulus.vlan_set import VLANSet
+
+
+# Precompiled equivalents of the patterns used by
+# :py:func:`if_task.parse_summary` and
+# :py:func:`if_task.get_interface_master`.
+SUMMARY_REGEX = re.compile(
+    r"(Master: (?P<int_name>[\d\w-]*)\((?P<state>[\w]*)\))?")
+BOND_MASTER_REGEX = re.compile(r'^Master: (?P<master>[\w]*)\(.*\)$')
+
+
+@lru_cache(maxsize=None)
+def _field_names(cls) -> Optional[frozenset]:
+    """
+    Returns the names of the fields of a dataclass whose instances keep
+    their fields in :code:`__dict__`, or None if the instances cannot
+    be built by :py:func:`_construct`, e.g. because the class uses
+    :code:`__slots__`.
+
+    :param cls: The dataclass.
+    :return:
+    """
+    if '__slots__' in vars(cls):
+        return None
+    return frozenset(f.name for f in dataclasses.fields(cls))
+
+
+def _construct(cls, **values):
+    """
+    Creates a dataclass instance from values that are already known to
+    be valid and normalized, skipping the type validation performed by
+    its :code:`__post_init__`.  If the fields of the dataclass are not
+    exactly those given, e.g. because a field has been added upstream,
+    the instance is created with its constructor instead.
+
+    :param cls: The dataclass.
+    :param values: Every field of the dataclass.
+    :return:
+    """
+    if _field_names(cls) != values.keys():
+        return cls(**values)
+    obj = cls.__new__(cls)
+    obj.__dict__.update(values)
+    return obj
+
+
+def copy_object(value):
+    """
+    Returns a copy of a dataclass instance, copying nested dataclasses,
+    lists and dicts so that the copy shares no mutable state with the
+    original.  Much cheaper than :py:func:`copy.deepcopy` for the
+    simple objects built here.
+
+    :param value: The value to copy.
+    :return:
+    """
+    if isinstance(value, list):
+        return [copy_object(item) for item in value]
+    if isinstance(value, dict):
+        return {key: copy_object(item) for key, item in value.items()}
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return _construct(value.__class__, **{
+            f.name: copy_object(getattr(value, f.name))
+            for f in dataclasses.fields(value)})
+    return value
+
+
+@lru_cache(maxsize=65536)
+def parse_address(address: str) -> Tuple[str, str]:
+    """
+    Returns a tuple of the normalized CIDR notated address and its
+    address family.  Results are memoized by address string.
+
+    :param address: A CIDR notated address.
+    :return:
+    """
+    ip_interface = ipaddress.ip_interface(address)
+    return ip_interface.with_prefixlen, f"ipv{ip_interface.version}"
+
+
+@lru_cache(maxsize=65536)
+def parse_physical_address(mac: str) -> str:
+    """
+    Returns the MAC address formatted as it would be by
+    :py:class:`Interface`.  Results are memoized by MAC string.
+
+    :param mac: The MAC address.
+    :return:
+    """
+    try:
+        return str(macaddress.parse(mac, macaddress.EUI48))
+    except Exception:
+        raise exc.RequestValueError('physical_address', mac)
+
+
+@lru_cache(maxsize=4096)
+def parse_vlan_glob(vlan_glob: str) -> VLANSet:
+    """
+    Memoized :py:meth:`VLANSet.from_glob`.
+
+    :param vlan_glob: A VLAN glob.
+    :return:
+    """
+    return VLANSet.from_glob(vlan_glob)
+
+
+def get_interface_addresses(addresses: [str], virtual: bool = False,
+                            virtual_type: Optional[str] = None
+                            ) -> [an_if.InterfaceAddress]:
+    """
+    Equivalent to :py:func:`if_task.get_interface_addresses` using
+    memoized address parsing.
+
+    :param addresses: A list of CIDR notated addresses.
+    :param virtual: Indicates the addresses are virtual.
+    :param virtual_type: The virtual address type.
+    :return:
+    """
+    interface_addresses = []
+    for address in addresses:
+        address, family = parse_address(address)
+        interface_addresses.append(_construct(
+            an_if.InterfaceAddress, address=address, family=family,
+            virtual=virtual, virtual_type=virtual_type))
+    return interface_addresses
+
+
+def _is_trusted(int_data: dict) -> bool:
+    """
+    Checks that the values copied verbatim from the interface data
+    have the types the :py:class:`Interface` object expects, so that
+    its validation can be skipped.
+
+    :param int_data: The interface data object.
+    :return:
+    """
+    iface_obj = int_data['iface_obj']
+    if not (isinstance(iface_obj['description'], (str, type(None)))
+            and isinstance(iface_obj['mtu'], (int, type(None)))
+            and isinstance(iface_obj['mac'], (str, type(None)))):
+        return False
+    if iface_obj['vlan_list']:
+        return (isinstance(iface_obj['vlan_filtering'], bool)
+                and isinstance(iface_obj['native_vlan'], (int, type(None))))
+    return True
+
+
+def get_mode(int_data: dict) -> str:
+    """
+    Returns the interface mode, as determined by
+    :py:func:`if_task.get_interface`.
+
+    :param int_data: The interface data from :code:`show interface`.
+    :return:
+    """
+    if int_data['iface_obj']['vlan_list']:
+        return 'bridged'
+    if int_data['mode'] == 'BondMember':
+        return 'aggregated'
+    return 'routed'
+
+
+def get_parent(int_data: dict) -> Optional[str]:
+    """
+    Returns the bond an aggregated interface belongs to, or None.
+
+    :param int_data: The interface data from :code:`show interface`.
+    :return:
+    """
+    if int_data['mode'] == 'BondMember' \
+            and not int_data['iface_obj']['vlan_list']:
+        if match := BOND_MASTER_REGEX.search(int_data['summary']):
+            return match.group('master')
+    return None
+
+
+def get_attributes(
+        int_data: dict, subint_data: dict = None,
+        vrf_set: Set[str] = frozenset()
+) -> Optional[Union[an_if.InterfaceBridgeAttributes,
+                    an_if.InterfaceRouteAttributes]]:
+    """
+    Builds the attributes object for the interface's mode, as
+    :py:func:`if_task.get_interface` would.  The interface data must
+    have passed :py:func:`_is_trusted`.
+
+    :param int_data: The interface data from :code:`show interface`.
+    :param subint_data: The interface data for the `-v0` subinterface.
+    :param vrf_set: A set of VRF names.
+    :return:
+    """
+    mode = get_mode(int_data)
+    iface_obj = int_data['iface_obj']
+    if mode == 'bridged':
+        return _construct(
+            an_if.InterfaceBridgeAttributes,
+            dot1q_enabled=iface_obj['vlan_filtering'],
+            dot1q_vids=parse_vlan_glob(iface_obj['vlan_list']).to_list(),
+            dot1q_pvid=iface_obj['native_vlan'])
+    if mode == 'aggregated':
+        return None
+    master = SUMMARY_REGEX.search(int_data['summary']).group('int_name')
+    addresses = get_interface_addresses(iface_obj['ip_address']['allentries'])
+    evpn_anycast_mac = None
+    if subint_data:
+        addresses += get_interface_addresses(
+            subint_data['iface_obj']['ip_address']['allentries'],
+            virtual=True, virtual_type='anycast')
+        if anycast_mac := if_task.get_anycast_mac(subint_data):
+            evpn_anycast_mac = parse_physical_address(anycast_mac)
+    return _construct(
+        an_if.InterfaceRouteAttributes, addresses=addresses,
+        vrf=master if master in vrf_set else None,
+        evpn_anycast_mac=evpn_anycast_mac)
+
+
+def get_interface(int_name: str, int_data: dict, subint_data: dict = None,
+                  vrf_set: Set[str] = frozenset()) -> an_if.Interface:
+    """
+    Equivalent to :py:func:`if_task.get_interface`.  Objects are built
+    without repeating the type validation performed by the autonet
+    object constructors, which dominates the cost of the conversion.
+    Interface data with values of an unexpected type is passed to
+    :py:func:`if_task.get_interface` instead, so that it is rejected
+    in the same way.
+
+    :param int_name: The interface name.
+    :param int_data: The interface data from :code:`show interface`.
+    :param subint_data: The interface data for the `-v0` subinterface.
+    :param vrf_set: A set of VRF names.
+    :return:
+    """
+    if not _is_trusted(int_data):
+        return if_task.get_interface(int_name, int_data, subint_data,
+                                     list(vrf_set))
+    iface_obj = int_data['iface_obj']
+    speed, duplex = if_task.parse_speed(int_data['speed'])
+    mac = iface_obj['mac']
+    return _construct(
+        an_if.Interface,
+        name=int_name,
+        mode=get_mode(int_data),
+        description=iface_obj['description'],
+        virtual=not int_name.startswith('swp'),
+        attributes=get_attributes(int_data, subint_data, vrf_set),
+        admin_enabled=int_data['linkstate'] != 'ADMDN',
+        physical_address=parse_physical_address(mac) if mac else mac,
+        child=False,
+        parent=get_parent(int_data),
+        speed=speed,
+        duplex=duplex,
+        mtu=iface_obj['mtu'])
+
+
+class InterfaceView(object):
+    """
+    A read only view of an interface backed directly by its data from
+    the :code:`show interface` command.  Scalar properties are read
+    from the data when accessed, and the attributes object is only
+    built the first time it is accessed.  This makes listing many
+    interfaces cheap when only a few properties are needed.  A full
+    :py:class:`Interface` object can be obtained with
+    :py:meth:`to_interface`.
+    """
+    __slots__ = ('name', '_int_data', '_subint_data', '_vrf_set',
+                 '_attributes')
+
+    def __init__(self, int_name: str, int_data: dict,
+                 subint_data: dict = None, vrf_set: Set[str] = frozenset()):
+        """
+        :param int_name: The interface name.
+        :param int_data: The interface data from :code:`show interface`.
+        :param subint_data: The interface data for the `-v0`
+            subinterface.
+        :param vrf_set: A set of VRF names.
+        """
+        self.name = int_name
+        self._int_data = int_data
+        self._subint_data = subint_data
+        self._vrf_set = vrf_set
+        self._attributes = None
+
+    @property
+    def mode(self) -> str:
+        return get_mode(self._int_data)
+
+    @property
+    def description(self) -> Optional[str]:
+        return self._int_data['iface_obj']['description']
+
+    @property
+    def virtual(self) -> bool:
+        return not self.name.startswith('swp')
+
+    @property
+    def admin_enabled(self) -> bool:
+        return self._int_data['linkstate'] != 'ADMDN'
+
+    @property
+    def physical_address(self) -> Optional[str]:
+        mac = self._int_data['iface_obj']['mac']
+        return parse_physical_address(mac) if mac else mac
+
+    @property
+    def child(self) -> bool:
+        return False
+
+    @property
+    def parent(self) -> Optional[str]:
+        return get_parent(self._int_data)
+
+    @property
+    def speed(self) -> Optional[int]:
+        return if_task.parse_speed(self._int_data['speed'])[0]
+
+    @property
+    def duplex(self) -> Optional[str]:
+        return if_task.parse_speed(self._int_data['speed'])[1]
+
+    @property
+    def mtu(self) -> Optional[int]:
+        return self._int_data['iface_obj']['mtu']
+
+    @property
+    def attributes(self) -> Optional[Union[an_if.InterfaceBridgeAttributes,
+                                           an_if.InterfaceRouteAttributes]]:
+        if self._attributes is None and self.mode != 'aggregated':
+            if _is_trusted(self._int_data):
+                self._attributes = get_attributes(
+                    self._int_data, self._subint_data, self._vrf_set)
+            else:
+                self._attributes = self.to_interface().attributes
+        return self._attributes
+
+    def to_interface(self) -> an_if.Interface:
+        """
+        Converts the view to an :py:class:`Interface` object.
+
+        :return:
+        """
+        return get_interface(self.name, self._int_data, self._subint_data,
+                             self._vrf_set)
+
+    def __repr__(self) -> str:
+        return f"InterfaceView('{self.name}')"
+
+
+def select_interfaces(
+        show_int_data: dict, int_name: str = None
+) -> Tuple[Set[str], List[Tuple[str, dict, str]]]:
+    """
+    Discovers interface types and VRF names in a single pass over the
+    data from the :code:`show interface` command.  Returns a tuple of
+    the set of VRF names and a list of :code:`name, data, type` tuples
+    for the interfaces that :py:func:`get_interfaces` would convert.
+
+    :param show_int_data: Data from the :code:`show interface` command.
+    :param int_name: Filter results to only include the provided
+        interface.
+    :return:
+    """
+    vrf_set = set()
+    selected = []
+    for cur_int_name, int_data in show_int_data.items():
+        int_type = if_task.get_interface_type(cur_int_name, int_data)
+        if int_type == 'vrf':
+            vrf_set.add(cur_int_name)
+        elif int_type in ('interface', 'bond', 'vlan'):
+            if not int_name or int_name == cur_int_name:
+                selected.append((cur_int_name, int_data, int_type))
+    return vrf_set, selected
+
+
+def get_interfaces(show_int_data: dict,
+                   int_name: str = None) -> [an_if.Interface]:
+    """
+    Equivalent to :py:func:`if_task.get_interfaces`, optimized for
+    devices with many thousands of interfaces.  Interface types and
+    VRF names are discovered in a single pass over the data, after
+    which only the selected interfaces are converted.
+
+    :param show_int_data: Data from the :code:`show interface` command.
+    :param int_name: Filter results to only include the provided
+        interface.
+    :return:
+    """
+    vrf_set, selected = select_interfaces(show_int_data, int_name)
+    # As with if_task.get_interfaces(), the anycast subinterface is
+    # only attached when a single interface has been requested.
+    subint_data = show_int_data.get(f"{int_name}-v0") if int_name else None
+    return [get_interface(cur_int_name, int_data,
+                          subint_data if int_type == 'vlan' else None,
+                          vrf_set)
+            for cur_int_name, int_data, int_type in selected]
+
+
+def get_interface_views(show_int_data: dict,
+                        int_name: str = None) -> [InterfaceView]:
+    """
+    Equivalent to :py:func:`get_interfaces`, but returns lazy
+    :py:class:`InterfaceView` objects instead of :py:class:`Interface`
+    objects.
+
+    :param show_int_data: Data from the :code:`show interface` command.
+    :param int_name: Filter results to only include the provided
+        interface.
+    :return:
+    """
+    vrf_set, selected = select_interfaces(show_int_data, int_name)
+    subint_data = show_int_data.get(f"{int_name}-v0") if int_name else None
+    return [InterfaceView(cur_int_name, int_data,
+                          subint_data if int_type == 'vlan' else None,
+                          vrf_set)
+            for cur_int_name, int_data, int_type in selected]
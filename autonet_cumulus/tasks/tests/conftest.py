@@ -1136,3 +1136,66 @@ def test_show_evpn_es_data():
             'flags': ['local', 'nonDF']
         }
     ]
+
+
+@pytest.fixture
+def test_show_version_data():
+    return {
+        'build': 'Cumulus Linux 4.3.0',
+        'os': '4.3.0',
+        'uptime': '6 days, 3:07:10'
+    }
+
+
+@pytest.fixture
+def test_show_system_data():
+    return {
+        'platform': {
+            'info': {
+                'soc': {
+                    'vendor': 'Mellanox',
+                    'model': 'Spectrum-2'
+                }
+            },
+            'model': 'SN3700C',
+            'vendor': 'Mellanox'
+        }
+    }
+
+
+@pytest.fixture
+def test_show_bgp_evpn_summary_data():
+    return {
+        'routerId': '192.168.0.106',
+        'as': 65002,
+        'vrfId': 0,
+        'vrfName': 'default',
+        'peerCount': 2
+    }
+
+
+@pytest.fixture
+def test_ip_bridge_data():
+    return ('9: bridge: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 9216 qdisc '
+            'noqueue state UP mode DEFAULT group default qlen 1000\\    '
+            'link/ether 0c:33:0e:25:52:05 brd ff:ff:ff:ff:ff:ff\n')
+
+
+@pytest.fixture
+def test_ip_link_stats_data():
+    # Stripped down output of `ip -s -j link show`.
+    return [
+        {'ifindex': 1, 'ifname': 'lo',
+         'stats64': {
+             'rx': {'bytes': 1000, 'packets': 10, 'errors': 0,
+                    'dropped': 0, 'over_errors': 0, 'multicast': 0},
+             'tx': {'bytes': 1000, 'packets': 10, 'errors': 0,
+                    'dropped': 0, 'carrier_errors': 0, 'collisions': 0}}},
+        {'ifindex': 3, 'ifname': 'swp1',
+         'stats': {
+             'rx': {'bytes': 123456789, 'packets': 98765, 'errors': 1,
+                    'dropped': 2, 'over_errors': 0, 'multicast': 5},
+             'tx': {'bytes': 987654321, 'packets': 56789, 'errors': 3,
+                    'dropped': 4, 'carrier_errors': 0, 'collisions': 0}}},
+        {'ifindex': 4, 'ifname': 'swp2'}
+    ]
@@ -0,0 +1,13 @@
+from autonet_cumulus.counters import COUNTER_TYPECODE_32, COUNTER_TYPECODE_64
+from autonet_cumulus.tasks import counters as counters_task
+
+
+def test_parse_link_stats(test_ip_link_stats_data):
+    counters = counters_task.parse_link_stats(test_ip_link_stats_data)
+    assert list(counters) == ['lo', 'swp1']
+    assert counters['lo'].tolist() == [1000, 10, 0, 0, 1000, 10, 0, 0]
+    assert counters['swp1'].tolist() == [
+        123456789, 98765, 1, 2, 987654321, 56789, 3, 4]
+    # Only the 32 bit statistics wrap.
+    assert counters['lo'].typecode == COUNTER_TYPECODE_64
+    assert counters['swp1'].typecode == COUNTER_TYPECODE_32
@@ -0,0 +1,108 @@
+import pytest
+
+from autonet_cumulus.facts import DeviceFacts
+from autonet_cumulus.tasks import facts as facts_task
+
+
+@pytest.mark.parametrize('test_token_data, expected', [
+    ('3b1e0d5c-1a9f-4a3c-b7a4-2d6a4c1f0e9b\n1660000000\n1660000100',
+     '3b1e0d5c-1a9f-4a3c-b7a4-2d6a4c1f0e9b,1660000000,1660000100'),
+    ('  abc  \n\n123\n', 'abc,123'),
+])
+def test_parse_facts_token(test_token_data, expected):
+    assert facts_task.parse_facts_token(test_token_data) == expected
+
+
+@pytest.mark.parametrize('test_ip_data, expected', [
+    ('9: bridge: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 9216\n', 'bridge'),
+    ('9: br_default: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 9216\n'
+     '10: br1: <BROADCAST,MULTICAST,UP,LOWER_UP> mtu 9216\n', 'br_default'),
+    ('', None),
+    (None, None)
+])
+def test_parse_bridge_name(test_ip_data, expected):
+    assert facts_task.parse_bridge_name(test_ip_data) == expected
+
+
+def test_parse_loopback_address(test_show_int_data):
+    assert facts_task.parse_loopback_address(
+        test_show_int_data['lo']) == '192.168.0.106'
+
+
+def test_parse_loopback_address_missing(test_show_int_data):
+    lo_data = test_show_int_data['lo']
+    lo_data['iface_obj']['ip_address']['allentries'] = ['127.0.0.1/8']
+    assert facts_task.parse_loopback_address(lo_data) is None
+
+
+@pytest.mark.parametrize('test_lo_data', [
+    None, {}, {'iface_obj': {}}, {'iface_obj': {'ip_address': {}}},
+    {'iface_obj': {'ip_address': {'allentries': None}}},
+])
+def test_parse_loopback_address_invalid(test_lo_data):
+    assert facts_task.parse_loopback_address(test_lo_data) is None
+
+
+@pytest.mark.parametrize('test_system_data, expected', [
+    ({'platform': {'info': {'soc': {'vendor': 'Mellanox'}},
+                   'model': 'SN3700C'}}, ('Mellanox', 'SN3700C')),
+    ({'platform': {'model': 'VX'}}, (None, 'VX')),
+    ({'platform': {'info': {}, 'model': 'VX'}}, (None, 'VX')),
+    ({}, (None, None)),
+    (None, (None, None)),
+])
+def test_parse_platform(test_system_data, expected):
+    assert facts_task.parse_platform(test_system_data) == expected
+
+
+@pytest.mark.parametrize('test_bgp_data, expected', [
+    ({'as': 65002, 'routerId': '192.168.0.106'}, (65002, '192.168.0.106')),
+    (None, (None, None)),
+])
+def test_parse_bgp_evpn_data(test_bgp_data, expected):
+    assert facts_task.parse_bgp_evpn_data(test_bgp_data) == expected
+
+
+@pytest.mark.parametrize('test_version_data, expected', [
+    ({'os': '4.3.0'}, '4.3.0'),
+    ({}, None),
+    (None, None),
+])
+def test_parse_version(test_version_data, expected):
+    assert facts_task.parse_version(test_version_data) == expected
+
+
+def test_get_device_facts_invalid(test_ip_bridge_data):
+    # The bridge is found even when every other command failed.
+    facts = facts_task.get_device_facts(None, None, None, None,
+                                        test_ip_bridge_data)
+    assert facts == DeviceFacts(version=None, bridge='bridge',
+                                gathered=facts.gathered)
+    assert facts.major_version is None
+    assert not facts.evpn_mh_supported
+
+
+def test_get_device_facts(test_show_version_data, test_show_system_data,
+                          test_show_int_data, test_show_bgp_evpn_summary_data,
+                          test_ip_bridge_data):
+    facts = facts_task.get_device_facts(
+        test_show_version_data, test_show_system_data,
+        test_show_int_data['lo'], test_show_bgp_evpn_summary_data,
+        test_ip_bridge_data, 'boot-id\n1660000000')
+    assert facts == DeviceFacts(
+        version='4.3.0', soc_vendor='Mellanox', platform_model='SN3700C',
+        bridge='bridge', loopback_address='192.168.0.106', bgp_asn=65002,
+        bgp_router_id='192.168.0.106', token='boot-id,1660000000',
+        gathered=facts.gathered)
+
+
+@pytest.mark.parametrize('test_facts, expected', [
+    (DeviceFacts(version='4.3.0', soc_vendor='Mellanox'), True),
+    (DeviceFacts(version='4.3.0', soc_vendor='Broadcom'), False),
+    (DeviceFacts(version='4.1.1', soc_vendor='Mellanox'), False),
+    (DeviceFacts(version='4.2.0', platform_model='VX'), True),
+    (DeviceFacts(version=None, soc_vendor='Mellanox'), False),
+    (DeviceFacts(version='4', soc_vendor='Mellanox'), False),
+])
+def test_evpn_mh_supported(test_facts, expected):
+    assert test_facts.evpn_mh_supported == expected
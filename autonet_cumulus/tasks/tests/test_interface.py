@@ -3,6 +3,7 @@ import pytest
 from autonet.core.objects import interfaces as an_if
 
 from autonet_cumulus.tasks import interface as if_task
+from autonet_cumulus.vlan_set import VLANSet
 
 
 @pytest.mark.parametrize('test_name, expected', [
@@ -161,13 +162,15 @@ def test_get_interface_addresses(test_addresses, test_virtual,
     ('vlan100', an_if.InterfaceRouteAttributes(
         addresses=[an_if.InterfaceAddress(family='ipv4', address='10.0.0.1/24',
                                           virtual=True, virtual_type='anycast')],
-        vrf='vrf-red')),
+        vrf='vrf-red',
+        evpn_anycast_mac='F2-69-81-6E-3A-3D')),
     ('vlan71', an_if.InterfaceRouteAttributes(
         addresses=[an_if.InterfaceAddress(family='ipv4', address='10.0.0.1/24',
                                           virtual=True, virtual_type='anycast'),
                    an_if.InterfaceAddress(family='ipv6', address='2607:f148:f:71::1/64',
                                           virtual=True, virtual_type='anycast')],
-        vrf='TestCust1-Prod'))
+        vrf='TestCust1-Prod',
+        evpn_anycast_mac='F2-69-81-6E-3A-3D'))
 ], indirect=['test_int_data'])
 def test_get_route_attributes(test_int_data, test_vrf_list, expected):
     _, int_data, subint_data = test_int_data
@@ -220,7 +223,8 @@ def test_get_bridge_attributes(test_int_data, expected):
                 an_if.InterfaceAddress(
                     family='ipv6', address='2607:f148:f:72::1/64',
                     virtual=True, virtual_type='anycast')],
-            vrf='TestCust1-Prod'),
+            vrf='TestCust1-Prod',
+            evpn_anycast_mac='F2-69-81-6E-3A-3D'),
         admin_enabled=True, physical_address='0C-33-0E-25-52-06', child=False,
         parent=None, speed=None, duplex=None, mtu=9216)
      )
@@ -684,3 +688,327 @@ def test_generate_update_commands(
 def test_generate_delete_commands(test_int_name, test_int_type, expected):
     commands = if_task.generate_delete_commands(test_int_name, test_int_type)
     assert commands == expected
+
+
+@pytest.mark.parametrize('test_int_data', [
+    'bond20', 'swp1', 'swp2', 'swp3', 'swp5', 'swp7', 'vlan100', 'vlan71',
+    'vlan72', 'vlan4001', 'lo', 'bridge', 'green', 'swp88'
+], indirect=['test_int_data'])
+def test_get_single_interface(test_show_int_data, test_int_data):
+    int_name, int_data, subint_data = test_int_data
+    interface = if_task.get_single_interface(int_name, int_data, subint_data)
+    expected = if_task.get_interfaces(test_show_int_data, int_name)
+    assert ([interface] if interface else []) == expected
+
+
+def test_get_single_interface_unconfigured_subint(test_show_int_data):
+    unconfigured = {'mode': 'NotConfigured'}
+    interface = if_task.get_single_interface(
+        'vlan100', test_show_int_data['vlan100'], unconfigured)
+    assert interface.attributes.addresses == []
+
+
+def test_get_interface_type_index(test_show_int_data):
+    type_index = if_task.get_interface_type_index(test_show_int_data)
+    assert type_index.keys() == test_show_int_data.keys()
+    for int_name, int_data in test_show_int_data.items():
+        assert type_index[int_name] == if_task.get_interface_type(
+            int_name, int_data)
+
+
+@pytest.mark.parametrize('test_interface, test_update, expected', [
+    # Nothing changed.
+    (an_if.Interface(name='swp1', mode='routed', admin_enabled=True,
+                     mtu=9216, speed=1000, description='[an]',
+                     attributes=an_if.InterfaceRouteAttributes(
+                         addresses=[an_if.InterfaceAddress(
+                             address='10.0.1.0/31')],
+                         vrf='TestCust1-Prod')),
+     False, []),
+    (an_if.Interface(name='swp1', mtu=9216), True, []),
+    # The default MTU is not reset when it is left unset.
+    (an_if.Interface(name='swp1', mode='routed', admin_enabled=True,
+                     speed=1000, description='[an]',
+                     attributes=an_if.InterfaceRouteAttributes(
+                         addresses=[an_if.InterfaceAddress(
+                             address='10.0.1.0/31')],
+                         vrf='TestCust1-Prod')),
+     False, []),
+    # Basic attributes.
+    (an_if.Interface(name='swp1', admin_enabled=False, mtu=1500,
+                     description='uplink'),
+     True,
+     [
+         'add interface swp1 link down',
+         'add interface swp1 mtu 1500',
+         'add interface swp1 alias "uplink"'
+     ]),
+    # Addresses are diffed individually and the VRF is removed when
+    # the interface is replaced.
+    (an_if.Interface(name='swp1', mode='routed', mtu=9216,
+                     attributes=an_if.InterfaceRouteAttributes(
+                         addresses=[an_if.InterfaceAddress(
+                             address='10.0.2.0/31')])),
+     False,
+     [
+         'del interface swp1 alias',
+         'del interface swp1 vrf TestCust1-Prod',
+         'del interface swp1 ip address 10.0.1.0/31',
+         'add interface swp1 ip address 10.0.2.0/31'
+     ]),
+    # The operational link speed is left alone when the interface is
+    # replaced without a speed.
+    (an_if.Interface(name='swp1', mode='routed', admin_enabled=True,
+                     mtu=9216, description='[an]',
+                     attributes=an_if.InterfaceRouteAttributes(
+                         addresses=[an_if.InterfaceAddress(
+                             address='10.0.1.0/31')],
+                         vrf='TestCust1-Prod')),
+     False, []),
+    # Addresses are only added when updating.
+    (an_if.Interface(name='swp1', mode='routed',
+                     attributes=an_if.InterfaceRouteAttributes(
+                         addresses=[an_if.InterfaceAddress(
+                             address='10.0.2.0/31')])),
+     True,
+     [
+         'add interface swp1 ip address 10.0.2.0/31'
+     ]),
+])
+def test_generate_diff_commands_routed(test_show_int_data, test_interface,
+                                       test_update, expected):
+    current = if_task.get_interface(
+        'swp1', test_show_int_data['swp1'], None, ['TestCust1-Prod'])
+    commands = if_task.generate_diff_commands(
+        test_interface, current, 'interface', test_update)
+    assert commands == expected
+
+
+@pytest.mark.parametrize('test_interface, test_update, expected', [
+    (an_if.Interface(name='vlan71', mode='routed', admin_enabled=True,
+                     description='[an]',
+                     attributes=an_if.InterfaceRouteAttributes(
+                         addresses=[
+                             an_if.InterfaceAddress(
+                                 address='10.0.0.1/24', virtual=True,
+                                 virtual_type='anycast'),
+                             an_if.InterfaceAddress(
+                                 address='2607:f148:f:71::1/64', virtual=True,
+                                 virtual_type='anycast')],
+                         vrf='TestCust1-Prod',
+                         evpn_anycast_mac='f2:69:81:6e:3a:3d')),
+     False, []),
+    # Anycast addresses are deleted with the MAC they were added with,
+    # even when the request omits the route attributes.
+    (an_if.Interface(name='vlan71', mode='routed', admin_enabled=True,
+                     description='[an]'),
+     False,
+     [
+         'del vlan 71 vrf TestCust1-Prod',
+         'del vlan 71 ip address-virtual f2:69:81:6e:3a:3d 10.0.0.1/24',
+         'del vlan 71 ipv6 address-virtual f2:69:81:6e:3a:3d '
+         '2607:f148:f:71::1/64',
+         'del vlan 71 ip forward off'
+     ]),
+    (an_if.Interface(name='vlan71', mode='routed', admin_enabled=True,
+                     description='[an]',
+                     attributes=an_if.InterfaceRouteAttributes(
+                         addresses=[an_if.InterfaceAddress(
+                             address='10.0.0.1/24', virtual=True,
+                             virtual_type='anycast')],
+                         vrf='TestCust1-Prod')),
+     False,
+     [
+         'del vlan 71 ipv6 address-virtual f2:69:81:6e:3a:3d '
+         '2607:f148:f:71::1/64',
+         'del vlan 71 ip forward off'
+     ]),
+    # Anycast addresses move to a new anycast MAC.
+    (an_if.Interface(name='vlan71', mode='routed', admin_enabled=True,
+                     description='[an]',
+                     attributes=an_if.InterfaceRouteAttributes(
+                         addresses=[
+                             an_if.InterfaceAddress(
+                                 address='10.0.0.1/24', virtual=True,
+                                 virtual_type='anycast'),
+                             an_if.InterfaceAddress(
+                                 address='2607:f148:f:71::1/64', virtual=True,
+                                 virtual_type='anycast')],
+                         vrf='TestCust1-Prod',
+                         evpn_anycast_mac='F2-69-81-6E-3A-3E')),
+     False,
+     [
+         'del vlan 71 ip address-virtual f2:69:81:6e:3a:3d 10.0.0.1/24',
+         'del vlan 71 ipv6 address-virtual f2:69:81:6e:3a:3d '
+         '2607:f148:f:71::1/64',
+         'add vlan 71 ip address-virtual f2:69:81:6e:3a:3e 10.0.0.1/24',
+         'add vlan 71 ipv6 address-virtual f2:69:81:6e:3a:3e '
+         '2607:f148:f:71::1/64',
+         'del vlan 71 ip forward off'
+     ]),
+    # Anycast addresses kept by an update also move to the new MAC.
+    (an_if.Interface(name='vlan71',
+                     attributes=an_if.InterfaceRouteAttributes(
+                         addresses=[an_if.InterfaceAddress(
+                             address='10.0.0.1/24', virtual=True,
+                             virtual_type='anycast')],
+                         evpn_anycast_mac='f2:69:81:6e:3a:3e')),
+     True,
+     [
+         'del vlan 71 ip address-virtual f2:69:81:6e:3a:3d 10.0.0.1/24',
+         'del vlan 71 ipv6 address-virtual f2:69:81:6e:3a:3d '
+         '2607:f148:f:71::1/64',
+         'add vlan 71 ip address-virtual f2:69:81:6e:3a:3e 10.0.0.1/24',
+         'add vlan 71 ipv6 address-virtual f2:69:81:6e:3a:3e '
+         '2607:f148:f:71::1/64'
+     ]),
+])
+def test_generate_diff_commands_svi(test_show_int_data, test_interface,
+                                    test_update, expected):
+    current = if_task.get_interface(
+        'vlan71', test_show_int_data['vlan71'],
+        test_show_int_data['vlan71-v0'], ['TestCust1-Prod'])
+    commands = if_task.generate_diff_commands(
+        test_interface, current, 'vlan', test_update)
+    assert commands == expected
+
+
+@pytest.mark.parametrize('test_attributes, test_update, expected', [
+    (an_if.InterfaceBridgeAttributes(
+        dot1q_enabled=True, dot1q_pvid=100, dot1q_vids=[71, 72, 100]),
+     False, []),
+    (an_if.InterfaceBridgeAttributes(
+        dot1q_enabled=True, dot1q_pvid=71, dot1q_vids=[71, 100, 200, 201]),
+     False,
+     [
+         'add interface swp2 bridge pvid 71',
+         'del interface swp2 bridge trunk vlans 72',
+         'add interface swp2 bridge trunk vlans 200-201'
+     ]),
+    # Trunk VLANs are left alone when updating without VLANs.
+    (an_if.InterfaceBridgeAttributes(dot1q_enabled=True, dot1q_pvid=72),
+     True,
+     [
+         'add interface swp2 bridge pvid 72'
+     ]),
+    (an_if.InterfaceBridgeAttributes(dot1q_enabled=False, dot1q_pvid=80),
+     True,
+     [
+         'del interface swp2 bridge trunk',
+         'del interface swp2 bridge pvid',
+         'add interface swp2 bridge access 80'
+     ]),
+])
+def test_generate_diff_commands_bridged(test_show_int_data, test_attributes,
+                                        test_update, expected):
+    current = if_task.get_interface('swp2', test_show_int_data['swp2'])
+    interface = an_if.Interface(
+        name='swp2', mode='bridged', attributes=test_attributes,
+        mtu=current.mtu, speed=current.speed, admin_enabled=True)
+    commands = if_task.generate_diff_commands(
+        interface, current, 'interface', test_update)
+    assert commands == expected
+
+
+def test_generate_diff_commands_mode_change(test_show_int_data):
+    current = if_task.get_interface('swp2', test_show_int_data['swp2'])
+    interface = an_if.Interface(name='swp2', mode='routed')
+    with pytest.raises(Exception):
+        if_task.generate_diff_commands(interface, current, 'interface')
+
+
+def test_generate_mode_change_commands(test_show_int_data):
+    current = if_task.get_interface('swp2', test_show_int_data['swp2'])
+    interface = current.merge(an_if.Interface(
+        name='swp2', mode='routed',
+        attributes=an_if.InterfaceRouteAttributes(
+            addresses=[an_if.InterfaceAddress(address='10.0.2.0/31')])))
+    commands = if_task.generate_mode_change_commands(interface, 'interface')
+    assert commands == [
+        'del interface swp2',
+        'add interface swp2',
+        'del interface swp2 link down',
+        'add interface swp2 mtu 1500',
+        'add interface swp2 link speed 1000',
+        'add interface swp2 ip address 10.0.2.0/31'
+    ]
+
+
+@pytest.mark.parametrize('test_range, expected', [
+    ('swp1-3', ['swp1', 'swp2', 'swp3']),
+    ('swp1-2,swp10,12', ['swp1', 'swp2', 'swp10', 'swp12']),
+    ('swp1s0,bond20', ['swp1s0', 'bond20']),
+    ('', [])
+])
+def test_expand_interface_range(test_range, expected):
+    assert if_task.expand_interface_range(test_range) == expected
+
+
+@pytest.mark.parametrize('test_int_names, expected', [
+    (['swp1', 'swp2', 'swp3'], 'swp1-3'),
+    (['swp10', 'swp1', 'swp2', 'swp12'], 'swp1-2,swp10,swp12'),
+    (['swp1s0', 'bond1', 'bond2'], 'swp1s0,bond1-2'),
+])
+def test_compress_interface_names(test_int_names, expected):
+    assert if_task.compress_interface_names(test_int_names) == expected
+
+
+def test_generate_bulk_commands():
+    template = an_if.Interface(
+        admin_enabled=True, mtu=9216, mode='bridged',
+        attributes=an_if.InterfaceBridgeAttributes(
+            dot1q_enabled=True, dot1q_pvid=10, dot1q_vids=[10, 20, 21]))
+    commands = if_task.generate_bulk_commands(
+        if_task.expand_interface_range('swp1-48'), template, 'interface')
+    assert commands == [
+        'add interface swp1-48',
+        'del interface swp1-48 link down',
+        'add interface swp1-48 mtu 9216',
+        'del interface swp1-48 bridge access',
+        'add interface swp1-48 bridge pvid 10',
+        'add interface swp1-48 bridge trunk vlans 10,20-21'
+    ]
+
+
+def test_generate_bulk_commands_vlan():
+    template = an_if.Interface(description='svi')
+    commands = if_task.generate_bulk_commands(
+        ['vlan10', 'vlan11', 'vlan20'], template, 'vlan')
+    assert commands == [
+        'add vlan 10-11,20',
+        'add vlan 10-11,20 alias "svi"'
+    ]
+
+
+def test_generate_bulk_commands_description_prefix():
+    template = an_if.Interface(mtu=9216, description='ignored')
+    commands = if_task.generate_bulk_commands(
+        ['swp1', 'swp2'], template, 'interface', description_prefix='leaf')
+    assert commands == [
+        'add interface swp1-2',
+        'add interface swp1-2 mtu 9216',
+        'add interface swp1 alias "leaf swp1"',
+        'add interface swp2 alias "leaf swp2"'
+    ]
+
+
+@pytest.mark.parametrize('test_vids, test_current_vids, expected', [
+    ('1-3000', '1-3000', []),
+    ('1-3001', '1-3000', ['add interface swp1 bridge trunk vlans 3001']),
+    ('1-99,101-3000', '1-3000', ['del interface swp1 bridge trunk vlans 100']),
+    ('1-10,20-40,50-60', '1-9,20-41,50-60', [
+        'del interface swp1 bridge trunk vlans 41',
+        'add interface swp1 bridge trunk vlans 10'
+    ]),
+    # The delta is larger than the set, so the trunk is replaced.
+    ('100', '1-50,60,70,80', [
+        'del interface swp1 bridge trunk',
+        'add interface swp1 bridge trunk vlans 100'
+    ]),
+    ('', '1-50', ['del interface swp1 bridge trunk']),
+])
+def test_generate_trunk_vlan_commands(test_vids, test_current_vids, expected):
+    commands = if_task.generate_trunk_vlan_commands(
+        VLANSet.from_glob(test_vids), VLANSet.from_glob(test_current_vids),
+        'add interface swp1', 'del interface swp1')
+    assert commands == expected
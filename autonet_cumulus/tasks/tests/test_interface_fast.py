@@ -0,0 +1,136 @@
+import copy
+import dataclasses
+import ipaddress
+import os
+import pytest
+import time
+
+from autonet.core import exceptions as exc
+from autonet.core.objects import interfaces as an_if
+
+from autonet_cumulus.tasks import interface as if_task
+from autonet_cumulus.tasks import interface_fast as if_fast_task
+
+
+def generate_show_int_data(show_int_data: dict, size: int) -> dict:
+    """
+    Generates a synthetic :code:`show interface` payload of at least
+    `size` interfaces by repeating the test data under new names.  The
+    addresses of each copy are offset so that they are not repeated.
+    """
+    data = {}
+    i = 0
+    while len(data) < size:
+        for int_name, int_data in show_int_data.items():
+            if int_name.startswith(('swp', 'vlan')):
+                base, _, suffix = int_name.partition('-')
+                new_name = f'{base}{i}' + (f'-{suffix}' if suffix else '')
+            else:
+                new_name = f'{int_name}-{i}'
+            int_data = copy.deepcopy(int_data)
+            addresses = int_data['iface_obj']['ip_address']['allentries']
+            for n, address in enumerate(addresses):
+                address = ipaddress.ip_interface(address)
+                addresses[n] = (f'{address.ip + i * 256}/'
+                                f'{address.network.prefixlen}')
+            data[new_name] = int_data
+        i += 1
+    return data
+
+
+@pytest.mark.parametrize('test_interface_name', [
+    None, 'bond20', 'swp1', 'swp2', 'swp3', 'swp7', 'vlan71', 'vlan72',
+    'vlan100', 'vlan4001', 'lo', 'green', 'swp88'
+])
+def test_get_interfaces(test_show_int_data, test_interface_name):
+    expected = if_task.get_interfaces(test_show_int_data, test_interface_name)
+    interfaces = if_fast_task.get_interfaces(test_show_int_data,
+                                             test_interface_name)
+    assert interfaces == expected
+
+
+@pytest.mark.parametrize('test_cls, expected', [
+    (an_if.Interface,
+     {'name', 'mode', 'description', 'virtual', 'attributes',
+      'admin_enabled', 'physical_address', 'child', 'parent', 'speed',
+      'duplex', 'mtu'}),
+    (an_if.InterfaceBridgeAttributes,
+     {'dot1q_enabled', 'dot1q_vids', 'dot1q_pvid'}),
+    (an_if.InterfaceRouteAttributes,
+     {'addresses', 'vrf', 'evpn_anycast_mac'}),
+    (an_if.InterfaceAddress,
+     {'address', 'family', 'virtual', 'virtual_type'}),
+])
+def test_field_names(test_cls, expected):
+    # The fields set by the fast conversion.  The constructor is used
+    # instead if autonet-api changes them.
+    assert if_fast_task._field_names(test_cls) == expected
+
+
+def test_construct_unknown_fields():
+    @dataclasses.dataclass
+    class Extended(object):
+        name: str
+        extra: int = dataclasses.field(default=0)
+
+        def __post_init__(self):
+            self.name = self.name.lower()
+
+    obj = if_fast_task._construct(Extended, name='SWP1')
+    assert obj == Extended(name='swp1', extra=0)
+    assert if_fast_task.copy_object(obj) == obj
+
+
+def test_get_interface_untrusted(test_show_int_data):
+    int_data = copy.deepcopy(test_show_int_data['swp1'])
+    int_data['iface_obj']['mtu'] = ''
+    with pytest.raises(exc.RequestTypeError):
+        if_fast_task.get_interface('swp1', int_data)
+
+
+def test_get_interfaces_generated(test_show_int_data):
+    show_int_data = generate_show_int_data(test_show_int_data, 1000)
+    assert (if_fast_task.get_interfaces(show_int_data)
+            == if_task.get_interfaces(show_int_data))
+
+
+@pytest.mark.skipif(not os.environ.get('AUTONET_CUMULUS_BENCHMARK'),
+                    reason="Set AUTONET_CUMULUS_BENCHMARK to run benchmarks.")
+def test_get_interfaces_speedup(test_show_int_data):
+    show_int_data = generate_show_int_data(test_show_int_data, 10000)
+
+    def best_of(func, runs=3):
+        timings = []
+        for _ in range(runs):
+            if_fast_task.parse_address.cache_clear()
+            start = time.perf_counter()
+            result = func(show_int_data)
+            timings.append(time.perf_counter() - start)
+        return min(timings), result
+
+    reference_time, expected = best_of(if_task.get_interfaces)
+    fast_time, interfaces = best_of(if_fast_task.get_interfaces)
+    assert interfaces == expected
+    assert reference_time / fast_time >= 3
+
+
+@pytest.mark.parametrize('test_interface_name', [None, 'vlan71'])
+def test_get_interface_views(test_show_int_data, test_interface_name):
+    expected = if_fast_task.get_interfaces(test_show_int_data,
+                                           test_interface_name)
+    views = if_fast_task.get_interface_views(test_show_int_data,
+                                             test_interface_name)
+    assert [view.to_interface() for view in views] == expected
+    for view, interface in zip(views, expected):
+        for attr in ['name', 'mode', 'description', 'virtual',
+                     'admin_enabled', 'physical_address', 'child',
+                     'parent', 'speed', 'duplex', 'mtu', 'attributes']:
+            assert getattr(view, attr) == getattr(interface, attr)
+
+
+def test_interface_view_lazy_attributes(test_show_int_data):
+    view = if_fast_task.InterfaceView('swp1', test_show_int_data['swp1'],
+                                      vrf_set={'TestCust1-Prod'})
+    assert view._attributes is None
+    assert view.attributes.vrf == 'TestCust1-Prod'
+    assert view.attributes is view.attributes
@@ -1,8 +1,10 @@
 import pytest
 
+from autonet.core import exceptions as exc
 from autonet.core.objects import vlan as an_vlan
 
 from autonet_cumulus.tasks import vlan as vlan_task
+from autonet_cumulus.vlan_set import VLANSet
 
 
 @pytest.mark.parametrize('test_vlan_id, test_show_dynamic, expected', [
@@ -54,3 +56,94 @@ def test_generate_delete_vlan_commands(test_vlan_id, test_bridge, expected):
     commands = vlan_task.generate_delete_vlan_commands(
         test_vlan_id, test_bridge)
     assert commands == expected
+
+
+def test_get_vlan_set(test_vlan_data):
+    assert vlan_task.get_vlan_set(test_vlan_data, 'bridge') == \
+        VLANSet([71, 72, 88, 100, 250, 4001, 4074, 4086])
+
+
+@pytest.mark.parametrize('test_offset, test_limit, test_vid_range, expected', [
+    (0, None, None, [71, 72, 88, 100, 250, 4001, 4074, 4086]),
+    (2, 3, None, [88, 100, 250]),
+    (0, 2, (80, 4095), [88, 100]),
+    (1, None, (72, 100), [88, 100]),
+    (10, None, None, []),
+    (0, None, (5000, 6000), []),
+])
+def test_iter_vlans(test_vlan_data, test_offset, test_limit, test_vid_range,
+                    expected):
+    vlans = vlan_task.iter_vlans(test_vlan_data, 'bridge', [], False,
+                                 test_offset, test_limit, test_vid_range)
+    assert [vlan.id for vlan in vlans] == expected
+
+
+def test_get_vlan_membership(test_vlan_data):
+    membership = vlan_task.get_vlan_membership(test_vlan_data, 'bridge')
+    assert membership.bridge_vlans == VLANSet.from_glob(
+        '71-72,88,100,250,4001,4074,4086')
+    assert 'bridge' not in membership.port_names
+    assert membership.vlans('swp5') == VLANSet([71])
+    assert membership.vlans('swp99') == VLANSet()
+    assert membership.ports(71) == {'swp5', 'vxlan70001'}
+    assert membership.ports(88) == frozenset()
+    assert membership.vni(72) == 70002
+    assert membership.vni(88) is None
+    assert membership.is_unused(88)
+    assert not membership.is_unused(4074)
+
+
+def test_get_vlan_membership_ranges():
+    membership = vlan_task.get_vlan_membership({
+        'bridge': [{'vlan': 10, 'vlanEnd': 20}],
+        'swp1': [{'vlan': 10, 'vlanEnd': 20}],
+        'swp2': [{'vlan': 15}, {'vlan': 18, 'vlanEnd': 19}],
+    }, 'bridge')
+    assert membership.ports(9) == frozenset()
+    assert membership.ports(10) == {'swp1'}
+    assert membership.ports(15) == {'swp1', 'swp2'}
+    assert membership.ports(16) == {'swp1'}
+    assert membership.ports(18) == {'swp1', 'swp2'}
+    assert membership.ports(20) == {'swp1'}
+    assert membership.ports(21) == frozenset()
+
+
+def test_get_vlan_membership_segments():
+    # Ports sharing the same ranges share a single segment, however
+    # many VLANs the ranges hold.
+    vlan_data = {f'swp{n}': [{'vlan': 1, 'vlanEnd': 4000}]
+                 for n in range(1, 129)}
+    vlan_data['bridge'] = [{'vlan': 1, 'vlanEnd': 4000}]
+    membership = vlan_task.get_vlan_membership(vlan_data, 'bridge')
+    assert len(membership._segment_starts) == 2
+    assert len(membership.ports(2000)) == 128
+    assert membership.ports(4001) == frozenset()
+
+
+@pytest.mark.parametrize('test_vlan_ids, expected', [
+    ('100-199,300', '100-199,300'),
+    (42, '42'),
+    ([100, '101', '200-202', 150], '100-101,150,200-202'),
+    ([], ''),
+])
+def test_parse_vlan_ids(test_vlan_ids, expected):
+    assert vlan_task.parse_vlan_ids(test_vlan_ids).to_glob() == expected
+
+
+@pytest.mark.parametrize('test_vlan_ids', [
+    '0-10', '4090-4095', [100, 0], -1, 4095, '4000-5000', 'abc',
+    [100, '200-abc'], None, [100, None], 100.0, [100.0], [True], [[100]]
+])
+def test_parse_vlan_ids_invalid(test_vlan_ids):
+    with pytest.raises(exc.RequestValueError):
+        vlan_task.parse_vlan_ids(test_vlan_ids)
+
+
+def test_generate_bulk_vlan_commands():
+    vids = VLANSet.from_glob('100-199,300')
+    assert vlan_task.generate_bulk_create_vlan_commands(vids, 'bridge') == [
+        'add bridge bridge vids 100-199,300']
+    assert vlan_task.generate_bulk_delete_vlan_commands(vids, 'bridge') == [
+        'del bridge bridge vids 100-199,300']
+    assert vlan_task.generate_bulk_create_vlan_commands(
+        VLANSet(), 'bridge') == []
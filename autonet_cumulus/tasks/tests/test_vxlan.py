@@ -12,6 +12,67 @@ def test_parse_vxlan_data(test_evpn_vni_data, test_bgp_evpn_data,
     assert vxlan_data == test_vxlan_data
 
 
+@pytest.mark.parametrize('test_evpn_vni_datum, expected', [
+    ({'vni': 70001, 'vxlanIf': 'vxlan70001'}, 'vxlan70001'),
+    ({'vni': 70001, 'vxlanInterface': 'vxlan70001'}, 'vxlan70001'),
+    ({'vni': 111001, 'vxlanIntf': 'vni111001'}, 'vni111001'),
+    ({'vni': 111001}, None)
+])
+def test_get_vxlan_interface_name(test_evpn_vni_datum, expected):
+    assert vxlan_task.get_vxlan_interface_name(test_evpn_vni_datum) == expected
+
+
+@pytest.mark.parametrize('test_bridge_vlan_data, expected', [
+    ({'vxlan70001': [{'vlan': 71, 'flags': ['PVID', 'Egress Untagged']}]},
+     71),
+    ([{'ifname': 'vxlan70001',
+       'vlans': [{'vlan': 71, 'flags': ['PVID', 'Egress Untagged']}]}],
+     71),
+    ({}, None),
+    ([], None),
+    (None, None)
+])
+def test_parse_bridge_vlan_dev(test_bridge_vlan_data, expected):
+    assert vxlan_task.parse_bridge_vlan_dev(test_bridge_vlan_data) == expected
+
+
+@pytest.mark.parametrize('test_vnid, test_evpn_vni_datum, test_bgp_vni_datum, test_vlan_id', [
+    ('70001',
+     {'vni': 70001, 'type': 'L2', 'vrf': 'TestCust1-Prod',
+      'vxlanInterface': 'vxlan70001', 'vtepIp': '192.168.0.106'},
+     {'vni': 70001, 'type': 'L2', 'inKernel': 'True',
+      'rd': '192.168.0.106:4', 'originatorIp': '192.168.0.106',
+      'importRts': ['65002:70001'], 'exportRts': ['65002:70001']},
+     71),
+    (111001,
+     {'vni': 111001, 'type': 'L3', 'vrf': 'green',
+      'vxlanIntf': 'vxlan111001', 'localVtepIp': '192.168.0.106'},
+     {'vni': 111001, 'type': 'L3', 'inKernel': 'True',
+      'rd': '192.168.0.106:6', 'originatorIp': '192.168.0.106',
+      'importRts': ['65002:111001'], 'exportRts': ['65002:111001']},
+     4074)
+])
+def test_parse_single_vxlan_data(test_vnid, test_evpn_vni_datum,
+                                 test_bgp_vni_datum, test_vlan_id,
+                                 test_vxlan_data):
+    vxlan_data = vxlan_task.parse_single_vxlan_data(
+        test_vnid, test_evpn_vni_datum, test_bgp_vni_datum, test_vlan_id)
+    assert vxlan_data == {int(test_vnid): test_vxlan_data[int(test_vnid)]}
+
+
+@pytest.mark.parametrize('test_evpn_vni_datum, test_bgp_vni_datum', [
+    (None, {'vni': 70001}),
+    ({'vni': 70001}, {}),
+    ({'vni': 70001, 'vxlanIf': 'vxlan70001'},
+     {'vni': 70001, 'rd': '192.168.0.106:4', 'originatorIp': '192.168.0.106',
+      'importRTs': [], 'exportRTs': []})
+])
+def test_parse_single_vxlan_data_missing(test_evpn_vni_datum,
+                                         test_bgp_vni_datum):
+    assert vxlan_task.parse_single_vxlan_data(
+        70001, test_evpn_vni_datum, test_bgp_vni_datum, 71) == {}
+
+
 @pytest.mark.parametrize('test_vnid, expected', [
     ('70001', [
         an_vxlan.VXLAN(
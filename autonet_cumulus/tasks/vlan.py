@@ -1,8 +1,96 @@
+from autonet.core import exceptions as exc
 from autonet.core.objects import vlan as an_vlan
-from typing import Union
+from typing import Iterable, Iterator, Optional, Tuple, Union
 
+from autonet_cumulus.vlan_membership import VLANMembership
+from autonet_cumulus.vlan_set import VLANSet
 
-def get_vlans(vlan_data: dict, bridge: str, dynamic_vlans: [int],
+
+def parse_vlan_entries(vlan_entries: [dict]) -> VLANSet:
+    """
+    Returns a :py:class:`VLANSet` of the VLAN IDs in the entries of a
+    single port from the :code:`show bridge vlan` command.
+
+    :param vlan_entries: The entries of a single port.
+    :return:
+    """
+    vids = VLANSet()
+    for vlan_obj in vlan_entries:
+        start = vlan_obj['vlan']
+        stop = int(vlan_obj.get('vlanEnd', start))
+        vids |= VLANSet.from_range(start, stop)
+    return vids
+
+
+def get_vlan_set(vlan_data: dict, bridge: str) -> VLANSet:
+    """
+    Returns a :py:class:`VLANSet` of the VLAN IDs present on the
+    bridge.
+
+    :param vlan_data: Output from the :code:`show bridge vlan` command.
+    :param bridge: The primary bridge name.
+    :return:
+    """
+    return parse_vlan_entries(vlan_data[bridge])
+
+
+def get_vlan_membership(vlan_data: dict, bridge: str) -> VLANMembership:
+    """
+    Parses the output of the :code:`show bridge vlan` command into a
+    :py:class:`VLANMembership` index of the VLANs carried by each port
+    of the bridge.
+
+    :param vlan_data: Output from the :code:`show bridge vlan` command.
+    :param bridge: The primary bridge name.
+    :return:
+    """
+    port_vlans = {}
+    vlan_vnis = {}
+    for port, vlan_entries in vlan_data.items():
+        if port == bridge:
+            continue
+        port_vlans[port] = parse_vlan_entries(vlan_entries)
+        for vlan_obj in vlan_entries:
+            if 'vni' in vlan_obj:
+                vlan_vnis[vlan_obj['vlan']] = int(vlan_obj['vni'])
+    return VLANMembership(get_vlan_set(vlan_data, bridge), port_vlans,
+                          vlan_vnis)
+
+
+def iter_vlans(vlan_data: dict, bridge: str, dynamic_vlans: Iterable[int],
+               show_dynamic: bool = False, offset: int = 0,
+               limit: Optional[int] = None,
+               vid_range: Optional[Tuple[int, int]] = None
+               ) -> Iterator[an_vlan.VLAN]:
+    """
+    Lazily yields :py:class:`VLAN` objects for the VLANs on the bridge,
+    in ascending order.  The VLAN IDs are kept as compressed ranges
+    while the ID range filter, offset and limit are applied, so a
+    :py:class:`VLAN` object is only built for each VLAN actually
+    yielded.  VLAN IDs that fall in the range of reserved VLANs will
+    be omitted by default.
+
+    :param vlan_data: Output from the :code:`show bridge vlan` command.
+    :param bridge: The primary bridge name.
+    :param dynamic_vlans: A :py:class:`VLANSet`, or list, of VLAN IDs
+        reserved for dynamic allocation.
+    :param show_dynamic: Include dynamic VLANs in the response.
+    :param offset: The number of VLANs to skip.
+    :param limit: The maximum number of VLANs to yield.
+    :param vid_range: A tuple of the first and last VLAN ID to include.
+    :return:
+    """
+    vids = get_vlan_set(vlan_data, bridge)
+    if not show_dynamic:
+        vids -= dynamic_vlans
+    if vid_range:
+        start, stop = max(vid_range[0], 0), min(vid_range[1], VLANSet.MAX_VID)
+        vids &= VLANSet.from_range(start, stop) if start <= stop else []
+    for vid in vids.page(offset, limit):
+        yield an_vlan.VLAN(id=vid, admin_enabled=True)
+
+
+def get_vlans(vlan_data: dict, bridge: str, dynamic_vlans: Iterable[int],
               vlan_id: Union[str, int] = None, show_dynamic: bool = False,
               ) -> [an_vlan.VLAN]:
     """
@@ -12,25 +100,16 @@ def get_vlans(vlan_data: dict, bridge: str, dynamic_vlans: [int],
 
     :param vlan_data: Output from the :code:`show bridge vlan` command.
     :param bridge: The primary bridge name.
-    :param dynamic_vlans: A list of VLAN IDs reserved for dynamic
-        allocation.
+    :param dynamic_vlans: A :py:class:`VLANSet`, or list, of VLAN IDs
+        reserved for dynamic allocation.
     :param vlan_id: Filter results for the given VLAN ID.
     :param show_dynamic: Include dynamic VLANs in the response.
     :return:
     """
     vlan_id = int(vlan_id) if vlan_id else None
-    vlans = []
-    for vlan_obj in vlan_data[bridge]:
-        start = vlan_obj['vlan']
-        stop = int(vlan_obj.get('vlanEnd', start)) + 1
-        for vid in range(start, stop):
-            if vid in dynamic_vlans and not show_dynamic:
-                continue
-            if vlan_id and vid != vlan_id:
-                continue
-            vlans.append(an_vlan.VLAN(id=vid, admin_enabled=True))
-
-    return vlans
+    vid_range = (vlan_id, vlan_id) if vlan_id else None
+    return list(iter_vlans(vlan_data, bridge, dynamic_vlans, show_dynamic,
+                           vid_range=vid_range))
 
 
 def generate_create_vlan_commands(vlan: an_vlan.VLAN, bridge: str) -> [str]:
@@ -56,4 +135,62 @@ def generate_delete_vlan_commands(vlan_id: Union[str, int],
     :param bridge: The primary bridge name.
     :return:
     """
-    return [f"del bridge {bridge} vids {vlan_id}"]
\ No newline at end of file
+    return [f"del bridge {bridge} vids {vlan_id}"]
+
+
+def parse_vlan_ids(vlan_ids: Union[str, Iterable[Union[str, int]]]) -> VLANSet:
+    """
+    Parses VLAN IDs given as integers, strings or VLAN globs such as
+    :code:`100-199,300`, or any mix of these, into a
+    :py:class:`VLANSet`.  A :py:exc:`RequestValueError` is raised if
+    a glob is malformed, any VLAN ID is outside of the valid range of
+    1-4094, or a value is neither an integer nor a string.
+
+    :param vlan_ids: A VLAN glob or an iterable of VLAN IDs and globs.
+    :return:
+    """
+    if vlan_ids is None or isinstance(vlan_ids, (str, int)):
+        vlan_ids = [vlan_ids]
+    elif not isinstance(vlan_ids, Iterable):
+        raise exc.RequestValueError('vlan_ids', vlan_ids)
+    vids = VLANSet()
+    for vlan_id in vlan_ids:
+        # A bool is an int, but True is not VLAN 1.
+        if isinstance(vlan_id, bool) or not isinstance(vlan_id, (str, int)):
+            raise exc.RequestValueError('vlan_ids', vlan_id)
+        if isinstance(vlan_id, str):
+            try:
+                vids |= VLANSet.from_glob(vlan_id)
+            except ValueError:
+                raise exc.RequestValueError('vlan_ids', vlan_id)
+        elif not 1 <= vlan_id <= 4094:
+            raise exc.RequestValueError('vlan_ids', vlan_id)
+        else:
+            vids |= [vlan_id]
+    if invalid := vids - VLANSet.from_range(1, 4094):
+        raise exc.RequestValueError('vlan_ids', invalid.to_glob())
+    return vids
+
+
+def generate_bulk_create_vlan_commands(vids: VLANSet, bridge: str) -> [str]:
+    """
+    Generate a list of commands to create many VLANs on the bridge with
+    a single range command.
+
+    :param vids: A :py:class:`VLANSet` of the VLAN IDs to create.
+    :param bridge: The primary bridge name.
+    :return:
+    """
+    return [f"add bridge {bridge} vids {vids.to_glob()}"] if vids else []
+
+
+def generate_bulk_delete_vlan_commands(vids: VLANSet, bridge: str) -> [str]:
+    """
+    Generate a list of commands to delete many VLANs from the bridge
+    with a single range command.
+
+    :param vids: A :py:class:`VLANSet` of the VLAN IDs to delete.
+    :param bridge: The primary bridge name.
+    :return:
+    """
+    return [f"del bridge {bridge} vids {vids.to_glob()}"] if vids else []
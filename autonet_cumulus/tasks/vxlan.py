@@ -2,6 +2,66 @@ from autonet.core.objects import vxlan as an_vxlan
 from typing import Optional, Union
 
 
+def get_vxlan_interface_name(evpn_vni_datum: dict) -> Optional[str]:
+    """
+    Returns the name of the VXLAN interface bound to a VNI.  The key
+    holding the name differs between the summary output of
+    :code:`show evpn vni` and the detailed output for a single VNI.
+
+    :param evpn_vni_datum: The data for a single VNI from the
+        :code:`show evpn vni` command.
+    :return:
+    """
+    for key in ['vxlanIf', 'vxlanInterface', 'vxlanIntf']:
+        if vxlan_if := evpn_vni_datum.get(key):
+            return vxlan_if
+    return None
+
+
+def _get_vxlan_datum(vni: int, evpn_vni_datum: dict, bgp_vni_datum: dict,
+                     vlan_id: Optional[int]) -> Optional[dict]:
+    """
+    Builds the vxlan_data entry for a single VNI.  None is returned if
+    the VNI is not fully configured.
+
+    :param vni: The VNI.
+    :param evpn_vni_datum: The data for the VNI from the
+        :code:`show evpn vni` command.
+    :param bgp_vni_datum: The data for the VNI from the
+        :code:`show bgp evpn vni` command.
+    :param vlan_id: The VLAN ID bound to the VNI's VXLAN interface.
+    :return:
+    """
+    if evpn_vni_datum.get('type') == 'L2':
+        layer = 2
+        bound_object_id = vlan_id
+        l3_vxlan_vlan = None
+    elif evpn_vni_datum.get('type') == 'L3':
+        layer = 3
+        bound_object_id = evpn_vni_datum.get('tenantVrf',
+                                             evpn_vni_datum.get('vrf'))
+        l3_vxlan_vlan = vlan_id
+    else:
+        # Maybe not fully configured?
+        return None
+    return {
+        "layer": layer,
+        "vxlan_if": get_vxlan_interface_name(evpn_vni_datum),
+        "l3_vxlan_vlan": l3_vxlan_vlan,
+        "vxlan": an_vxlan.VXLAN(
+            id=vni,
+            layer=layer,
+            source_address=bgp_vni_datum['originatorIp'],
+            bound_object_id=bound_object_id,
+            route_distinguisher=bgp_vni_datum['rd'],
+            import_targets=bgp_vni_datum.get(
+                'importRTs', bgp_vni_datum.get('importRts')),
+            export_targets=bgp_vni_datum.get(
+                'exportRTs', bgp_vni_datum.get('exportRts'))
+        )
+    }
+
+
 def parse_vxlan_data(evpn_vni_data: dict, bgp_vni_data: dict,
                      vlan_data: dict) -> dict:
     """
@@ -22,34 +82,77 @@ def parse_vxlan_data(evpn_vni_data: dict, bgp_vni_data: dict,
     """
     vxlan_data = {}
     for evpn_vni, evpn_vni_datum in evpn_vni_data.items():
-        if evpn_vni_datum['type'] == 'L2':
-            layer = 2
-            bound_object_id = vlan_data[evpn_vni_datum['vxlanIf']][0]['vlan']
-            l3_vxlan_vlan = None
-        elif evpn_vni_datum['type'] == 'L3':
-            layer = 3
-            bound_object_id = evpn_vni_datum['tenantVrf']
-            l3_vxlan_vlan = vlan_data[evpn_vni_datum['vxlanIf']][0]['vlan']
-        else:
+        if evpn_vni_datum['type'] not in ['L2', 'L3']:
             # Maybe not fully configured?
             continue
-        vxlan_data[int(evpn_vni)] = {
-            "layer": layer,
-            "vxlan_if": evpn_vni_datum['vxlanIf'],
-            "l3_vxlan_vlan": l3_vxlan_vlan,
-            "vxlan": an_vxlan.VXLAN(
-                id=int(evpn_vni),
-                layer=layer,
-                source_address=bgp_vni_data[evpn_vni]['originatorIp'],
-                bound_object_id=bound_object_id,
-                route_distinguisher=bgp_vni_data[evpn_vni]['rd'],
-                import_targets=bgp_vni_data[evpn_vni]['importRTs'],
-                export_targets=bgp_vni_data[evpn_vni]['exportRTs']
-            )
-        }
+        vlan_id = vlan_data[evpn_vni_datum['vxlanIf']][0]['vlan']
+        vxlan_data[int(evpn_vni)] = _get_vxlan_datum(
+            int(evpn_vni), evpn_vni_datum, bgp_vni_data[evpn_vni], vlan_id)
     return vxlan_data
 
 
+def get_vxlan_bridge_command(vxlan_if: str) -> str:
+    """
+    Returns the shell command used to show the VLANs of a single
+    VXLAN interface, which is far cheaper than
+    :code:`show bridge vlan` on a device with many VNIs.
+
+    :param vxlan_if: The VXLAN interface name.
+    :return:
+    """
+    return f'bridge -j vlan show dev {vxlan_if}'
+
+
+def parse_bridge_vlan_dev(bridge_vlan_data: Union[dict, list]) -> Optional[int]:
+    """
+    Returns the first VLAN ID found in the output of the
+    :code:`bridge -j vlan show dev` command, or None if there is none.
+    Both the map of interface name to VLANs emitted by older versions
+    of iproute2 and the list of interfaces emitted by newer versions
+    are understood.
+
+    :param bridge_vlan_data: The parsed JSON output of
+        :code:`bridge -j vlan show dev`.
+    :return:
+    """
+    if isinstance(bridge_vlan_data, dict):
+        vlan_lists = list(bridge_vlan_data.values())
+    elif isinstance(bridge_vlan_data, list):
+        vlan_lists = [dev.get('vlans', []) for dev in bridge_vlan_data]
+    else:
+        return None
+    for vlans in vlan_lists:
+        if vlans:
+            return vlans[0]['vlan']
+    return None
+
+
+def parse_single_vxlan_data(vni: Union[str, int], evpn_vni_datum: dict,
+                            bgp_vni_datum: dict,
+                            vlan_id: Optional[int]) -> dict:
+    """
+    Parses the VNI scoped output of the :code:`show evpn vni <vni>`
+    and :code:`show bgp evpn vni <vni>` commands along with the VLAN
+    bound to the VNI's VXLAN interface.  The result has the same form
+    as :py:func:`parse_vxlan_data`, but holds at most the one VNI.
+
+    :param vni: The VNI.
+    :param evpn_vni_datum: Output from the :code:`show evpn vni <vni>`
+        command.
+    :param bgp_vni_datum: Output from the
+        :code:`show bgp evpn vni <vni>` command.
+    :param vlan_id: The VLAN ID bound to the VNI's VXLAN interface.
+    :return:
+    """
+    if not isinstance(evpn_vni_datum, dict) \
+            or not isinstance(bgp_vni_datum, dict) or not bgp_vni_datum:
+        return {}
+    if vxlan_datum := _get_vxlan_datum(int(vni), evpn_vni_datum,
+                                       bgp_vni_datum, vlan_id):
+        return {int(vni): vxlan_datum}
+    return {}
+
+
 def get_vxlans(vxlan_data: dict,
                vnid: Optional[Union[str, int]]) -> [an_vxlan.VXLAN]:
     """
@@ -0,0 +1,69 @@
+import pytest
+
+from autonet_cumulus import allocator
+from autonet_cumulus.vlan_set import VLANSet
+
+
+@pytest.fixture
+def test_allocator():
+    vlan_allocator = allocator.DynamicVLANAllocator(
+        VLANSet.from_glob('4000-4004'), strategy=allocator.lowest_free)
+    vlan_allocator.sync(VLANSet([100, 4000, 4002]))
+    return vlan_allocator
+
+
+@pytest.mark.parametrize('test_strategy, expected', [
+    (allocator.lowest_free, 4001),
+    (allocator.highest_free, 4004),
+])
+def test_allocate_strategy(test_allocator, test_strategy, expected):
+    test_allocator.strategy = test_strategy
+    assert test_allocator.allocate() == expected
+
+
+def test_random_free():
+    assert allocator.random_free(VLANSet([10, 20])) in [10, 20]
+
+
+def test_sync(test_allocator):
+    assert not test_allocator.needs_sync()
+    assert test_allocator.free == VLANSet([4001, 4003, 4004])
+    test_allocator.invalidate()
+    assert test_allocator.needs_sync()
+
+
+def test_allocate_reserves(test_allocator):
+    vids = [test_allocator.allocate() for _ in range(3)]
+    assert vids == [4001, 4003, 4004]
+    with pytest.raises(Exception):
+        test_allocator.allocate()
+    # Reservations survive a resync with the device.
+    test_allocator.sync(VLANSet([4000]))
+    assert test_allocator.allocate() == 4002
+
+
+def test_commit_release(test_allocator):
+    vid = test_allocator.allocate()
+    test_allocator.commit(vid)
+    assert vid not in test_allocator.free
+    test_allocator.release(vid)
+    assert vid in test_allocator.free
+
+
+def test_reservation_expiry(test_allocator):
+    test_allocator.reservation_ttl = -1
+    vid = test_allocator.allocate()
+    assert vid in test_allocator.free
+
+
+def test_get_allocator():
+    pool = VLANSet.from_glob('4000-4094')
+    vlan_allocator = allocator.get_allocator('test-get-allocator', pool)
+    vlan_allocator.sync(VLANSet())
+    assert allocator.get_allocator('test-get-allocator', pool) \
+        is vlan_allocator
+    assert not vlan_allocator.needs_sync()
+    new_pool = VLANSet.from_glob('3000-3099')
+    assert allocator.get_allocator(
+        'test-get-allocator', new_pool).pool == new_pool
+    assert vlan_allocator.needs_sync()
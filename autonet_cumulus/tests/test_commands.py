@@ -0,0 +1,216 @@
+import json
+import pytest
+
+from autonet_cumulus import commands
+
+
+def test_generate_batch_command():
+    command = commands.generate_batch_command(
+        ['net show version json', 'net show system json'], 'DELIM')
+    assert command == (
+        "net show version json; printf 'DELIM:0:%s\\n' \"$?\"; "
+        "net show system json; printf 'DELIM:1:%s\\n' \"$?\""
+    )
+
+
+@pytest.mark.parametrize('test_stdout, test_count, expected', [
+    ('{"os": "4.2.1"}\nDELIM:0:0\n{\n  "a": 1\n}\nDELIM:1:0',
+     2, [('{"os": "4.2.1"}', 0), ('{\n  "a": 1\n}', 0)]),
+    # Output without a trailing new line is prepended to the marker.
+    ('{}DELIM:0:0\nERROR: bad command\nDELIM:1:1',
+     2, [('{}', 0), ('ERROR: bad command', 1)]),
+    ('\nDELIM:0:0\nline1\n\nDELIM:1:0',
+     2, [('', 0), ('line1\n', 0)]),
+    # Missing markers result in empty output and no exit status.
+    ('{}\nDELIM:0:0\n{"partial": ',
+     2, [('{}', 0), ('', None)]),
+])
+def test_parse_batch_output(test_stdout, test_count, expected):
+    assert commands.parse_batch_output(
+        test_stdout, 'DELIM', test_count) == expected
+
+
+def test_generate_batch_delimiter():
+    assert commands.generate_batch_delimiter() != \
+        commands.generate_batch_delimiter()
+
+
+def _make_result(original_command: str, stdout: str) -> commands.CommandResult:
+    return commands.CommandResult(f'net {original_command} json',
+                                  original_command, stdout=stdout)
+
+
+def test_result_cache_get():
+    cache = commands.CommandResultCache()
+    result = _make_result('show version', '{}')
+    cache.add(result)
+    assert cache.get('show version') is result
+    assert cache.get('net show version json') is result
+    assert cache.get('show system') is None
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_result_cache_replace():
+    cache = commands.CommandResultCache()
+    cache.add(_make_result('show version', '{}'))
+    result = _make_result('show version', '{"os": "4.2.1"}')
+    cache.add(result)
+    assert len(cache) == 1
+    assert cache.size == len(result.stdout)
+    assert cache.get('show version') is result
+
+
+def test_result_cache_eviction():
+    cache = commands.CommandResultCache(max_bytes=10)
+    cache.add(_make_result('show version', '1234'))
+    cache.add(_make_result('show system', '1234'))
+    # Mark `show version` as recently used so `show system` is evicted.
+    cache.get('show version')
+    cache.add(_make_result('show interface', '1234'))
+    assert 'show version' in cache
+    assert 'show system' not in cache
+    assert 'net show system json' not in cache
+    assert 'show interface' in cache
+    assert cache.evictions == 1
+    assert cache.size == 8
+
+
+def test_result_cache_oversized():
+    cache = commands.CommandResultCache(max_bytes=2)
+    cache.add(_make_result('show version', '1234'))
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_result_cache_invalidate():
+    cache = commands.CommandResultCache()
+    cache.add(_make_result('show version', '1234'))
+    cache.add(_make_result('show system', '1234'))
+    cache.invalidate('show version')
+    assert 'show version' not in cache
+    assert cache.size == 4
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+@pytest.mark.parametrize('test_commands, expected', [
+    (['add vlan 10 ip address 10.0.0.1/24', 'del vlan 10 ip forward off'],
+     {'show interface', 'show bridge vlan', 'show evpn vni'}),
+    (['net add bgp l2vpn evpn vni 70001 rd 192.168.0.106:71'],
+     {'show bgp', 'show evpn vni'}),
+    (['add bond bond10 bond mode 802.3ad', 'commit'],
+     {'show interface', 'show bridge vlan', 'show evpn es'}),
+    (['commit'], set()),
+    (['add routing route 0.0.0.0/0 192.0.2.1'], None),
+])
+def test_get_stale_commands(test_commands, expected):
+    assert commands.get_stale_commands(test_commands) == expected
+
+
+@pytest.mark.parametrize('test_stdout, test_stderr, expected', [
+    ('', '', False),
+    ('ERROR: bad command', '', True),
+    # Without a PTY the error is written to stderr.
+    ('', 'ERROR: bad command', True),
+    ('', '\nERROR: bad command', True),
+    # Warnings on stderr are not errors with either transport.
+    ('', 'WARNING: deprecated syntax', False),
+    ('committed', 'WARNING: deprecated syntax', False),
+])
+def test_is_config_error(test_stdout, test_stderr, expected):
+    result = commands.CommandResult('net commit', 'commit',
+                                    test_stdout, test_stderr)
+    assert commands.is_config_error(result) == expected
+
+
+@pytest.mark.parametrize('test_commands, expected', [
+    (['add bgp autonomous-system 65003', 'commit'], True),
+    (['add bgp router-id 192.168.0.107'], True),
+    (['del bgp'], True),
+    (['del loopback lo ip address 192.168.0.107/32'], True),
+    (['del loopback lo'], True),
+    (['add bridge bridge ports swp1'], True),
+    (['del bridge bridge'], True),
+    (['add routing route 0.0.0.0/0 192.0.2.1'], True),
+    (['add vlan 100', 'add vxlan vxlan100 vxlan id 100'], False),
+    (['add bridge bridge vids 100-199'], False),
+    (['del bridge bridge vids 100'], False),
+    (['add bgp vrf green autonomous-system 65002',
+      'add bgp vrf green l2vpn evpn advertise ipv4 unicast',
+      'add bgp l2vpn evpn vni 70001 rd 192.168.0.106:71'], False),
+    (['add loopback lo clag vxlan-anycast-ip 192.168.0.200'], False),
+    (['commit'], False),
+])
+def test_facts_are_stale(test_commands, expected):
+    assert commands.facts_are_stale(test_commands) == expected
+
+
+def test_result_cache_invalidate_prefixes():
+    cache = commands.CommandResultCache()
+    for command in ['show interface', 'show interface swp1',
+                    'show interface bonds', 'show version']:
+        cache.add(_make_result(command, '{}'))
+    cache.invalidate_prefixes({'show interface', 'show bridge vlan'})
+    assert len(cache) == 1
+    assert 'show version' in cache
+
+
+def test_get_json_decoder():
+    assert commands.get_json_decoder('json') is json.loads
+    with pytest.raises(ValueError):
+        commands.get_json_decoder('pickle')
+
+
+def test_get_json_decoder_fallback(monkeypatch):
+    def import_module(name):
+        raise ImportError(name)
+    commands.get_json_decoder.cache_clear()
+    monkeypatch.setattr(commands.importlib, 'import_module', import_module)
+    try:
+        assert commands.get_json_decoder('orjson') is json.loads
+    finally:
+        commands.get_json_decoder.cache_clear()
+
+
+def test_output_sizes():
+    sizes = commands.OutputSizes(default=100)
+    result = _make_result('show interface', 'x' * 5000)
+    assert sizes.estimate(result) == 100
+    sizes.record(result)
+    assert sizes.estimate(_make_result('show interface', '')) == 5000
+
+
+def test_output_sizes_max_size():
+    sizes = commands.OutputSizes(default=100, max_size=2)
+    for command in ['show interface swp1', 'show interface swp2']:
+        sizes.record(_make_result(command, 'x' * 5000))
+    # Estimating marks the command as recently used.
+    sizes.estimate(_make_result('show interface swp1', ''))
+    sizes.record(_make_result('show interface swp3', 'x' * 5000))
+    assert len(sizes) == 2
+    assert sizes.estimate(_make_result('show interface swp1', '')) == 5000
+    assert sizes.estimate(_make_result('show interface swp2', '')) == 100
+
+
+@pytest.mark.parametrize('test_max_bytes, expected', [
+    (0, [['show interface', 'show version', 'show system',
+          'show bridge vlan']]),
+    # Large outputs are given batches of their own, and small ones are
+    # grouped together.
+    (1000, [['show interface'], ['show version', 'show system'],
+            ['show bridge vlan']]),
+    (1000000, [['show interface', 'show version', 'show system',
+                'show bridge vlan']]),
+])
+def test_split_batches(test_max_bytes, expected):
+    sizes = commands.OutputSizes(default=100)
+    for command, size in [('show interface', 5000),
+                          ('show bridge vlan', 950)]:
+        sizes.record(_make_result(command, 'x' * size))
+    results = [_make_result(command, '') for command in
+               ['show interface', 'show version', 'show system',
+                'show bridge vlan']]
+    batches = commands.split_batches(results, test_max_bytes, sizes)
+    assert [[result.original_command for result in batch]
+            for batch in batches] == expected
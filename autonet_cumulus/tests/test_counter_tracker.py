@@ -0,0 +1,69 @@
+import pytest
+
+from array import array
+
+from autonet_cumulus.counters import (CounterTracker, get_counter_tracker,
+                                      get_delta)
+
+
+def sample(*values, typecode='Q'):
+    return array(typecode, values + (0,) * (8 - len(values)))
+
+
+def test_counter_tracker():
+    tracker = CounterTracker()
+    first = tracker.update(100.0, {'swp1': sample(1000, 10)})
+    assert first['swp1'].counter('rx_bytes') == 1000
+    assert first['swp1'].delta('rx_bytes') is None
+    assert first['swp1'].rate('rx_bytes') is None
+
+    second = tracker.update(105.0, {'swp1': sample(6000, 60),
+                                    'swp2': sample(50)})
+    assert second['swp1'].interval == 5.0
+    assert second['swp1'].delta('rx_bytes') == 5000
+    assert second['swp1'].rate('rx_bytes') == 1000.0
+    assert second['swp1'].rate('rx_packets') == 10.0
+    # New interfaces have no previous sample.
+    assert second['swp2'].deltas is None
+
+
+def test_counter_tracker_reset():
+    tracker = CounterTracker()
+    tracker.update(100.0, {'swp1': sample(6000)})
+    counters = tracker.update(102.0, {'swp1': sample(1000)})
+    assert counters['swp1'].delta('rx_bytes') == 1000
+    assert counters['swp1'].rate('rx_bytes') == 500.0
+
+
+@pytest.mark.parametrize('test_value, test_previous, test_wraps, expected', [
+    (6000, 1000, True, 5000),
+    (1000, 1000, True, 0),
+    # A 32 bit counter that wrapped.
+    (1000, 2 ** 32 - 4000, True, 5000),
+    # Counters that restarted.
+    (1000, 6000, True, 1000),
+    (1000, 2 ** 31 - 1, True, 1000),
+    (1000, 2 ** 32 - 4000, False, 1000),
+    (1000, 2 ** 40, False, 1000),
+])
+def test_get_delta(test_value, test_previous, test_wraps, expected):
+    assert get_delta(test_value, test_previous, test_wraps) == expected
+
+
+@pytest.mark.parametrize('test_typecode, expected', [
+    ('I', 5000),
+    # A 64 bit counter is never taken to have wrapped.
+    ('Q', 1000),
+])
+def test_counter_tracker_wrap(test_typecode, expected):
+    tracker = CounterTracker()
+    tracker.update(100.0, {'swp1': sample(2 ** 32 - 4000,
+                                          typecode=test_typecode)})
+    counters = tracker.update(105.0, {'swp1': sample(
+        1000, typecode=test_typecode)})
+    assert counters['swp1'].delta('rx_bytes') == expected
+
+
+def test_get_counter_tracker():
+    assert get_counter_tracker('leaf01') is get_counter_tracker('leaf01')
+    assert get_counter_tracker('leaf01') is not get_counter_tracker('leaf02')
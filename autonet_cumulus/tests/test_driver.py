@@ -0,0 +1,610 @@
+import json
+import pytest
+import time
+
+from autonet.core import exceptions as exc
+from autonet.core.device import AutonetDevice, AutonetDeviceCredentials
+from autonet.core.objects import interfaces as an_if
+from autonet.core.objects import vxlan as an_vxlan
+from conf_engine.core.exceptions import ConfigError
+from types import SimpleNamespace
+
+from autonet_cumulus import allocator, counters
+from autonet_cumulus.commands import CommandResult
+from autonet_cumulus.driver import (FACTS_NET_COMMANDS, FACTS_RAW_COMMANDS,
+                                    CumulusDriver, config)
+from autonet_cumulus.facts import DeviceFacts, facts_cache
+from autonet_cumulus.interface_types import interface_type_cache
+from autonet_cumulus.tasks import interface as if_task
+from autonet_cumulus.tasks import vlan as vlan_task
+from autonet_cumulus.vlan_set import VLANSet
+
+
+@pytest.fixture(autouse=True)
+def flush_config():
+    """
+    Used to flush any cached config changes at the end of the test.
+    """
+    yield
+    config.flush_cache()
+
+
+class FakeConnection(object):
+    """
+    Stands in for a connected :py:class:`SSHClient` and records the
+    commands run on it.  Every command outputs :py:attr:`output`.
+    """
+    output = '{}'
+
+    def __init__(self):
+        self.commands = []
+
+    def run_command(self, command, use_pty=False):
+        self.commands.append(command)
+        return SimpleNamespace(stdout=iter([self.output]), stderr=iter([]),
+                               exit_code=0)
+
+
+@pytest.fixture
+def test_driver(monkeypatch):
+    driver = CumulusDriver(AutonetDevice(
+        device_id='test-driver', address='192.0.2.1',
+        credentials=AutonetDeviceCredentials(username='cumulus',
+                                             password='CumulusLinux!'),
+        driver='cumulus_linux'))
+    driver.connect_count = 0
+
+    def connect():
+        driver.connect_count += 1
+        driver._connection = FakeConnection()
+
+    monkeypatch.setattr(driver, '_connect', connect)
+    monkeypatch.setattr(driver, '_disconnect',
+                        lambda: setattr(driver, '_connection', None))
+    yield driver
+    interface_type_cache.invalidate(driver.device.device_id)
+
+
+def test_connect_deferred_for_cached_reads(test_driver):
+    test_driver._result_cache.add(CommandResult(
+        'net show version json', 'show version', '{}', json={}))
+    results = test_driver._exec_net_commands(['show version'])
+    assert results.get('show version').json == {}
+    assert test_driver.connect_count == 0
+    assert test_driver._connection is None
+
+
+def test_connect_once_on_first_command(test_driver):
+    test_driver._exec_net_commands(['show version'])
+    assert test_driver.connect_count == 1
+    test_driver._exec_net_commands(['show system', 'show interface lo'])
+    assert test_driver.connect_count == 1
+    assert test_driver._connection.commands[0] == 'net show version json'
+
+
+def test_refresh_facts_unbatched(test_driver, monkeypatch):
+    monkeypatch.setenv('CUMULUS_LINUX_BATCH_COMMANDS', 'false')
+
+    def exec_batch_commands(results):
+        raise AssertionError("Commands must not be batched.")
+
+    monkeypatch.setattr(test_driver, '_exec_batch_commands',
+                        exec_batch_commands)
+    monkeypatch.setattr(test_driver, '_set_facts', lambda results: results)
+    connections = []
+    monkeypatch.setattr(test_driver, '_disconnect', lambda: connections.append(
+        test_driver._connection))
+    results = test_driver.refresh_facts()
+    assert [result.original_command for result in results] == \
+        FACTS_NET_COMMANDS + FACTS_RAW_COMMANDS
+    assert connections[0].commands == [result.command for result in results]
+
+
+@pytest.mark.parametrize('test_commands, expected', [
+    (['add bgp autonomous-system 65003'], True),
+    (['add loopback lo ip address 192.168.0.107/32'], True),
+    (['add routing route 0.0.0.0/0 192.0.2.1'], True),
+    (['add vlan 100', 'add interface swp1 bridge access 100'], False),
+    (['add bridge bridge vids 100'], False),
+])
+def test_invalidate_cache_facts(test_driver, test_commands, expected):
+    facts_cache.set(test_driver.device.device_id,
+                    SimpleNamespace(gathered=time.time()))
+    try:
+        test_driver._invalidate_cache(test_commands)
+        assert (facts_cache.get(test_driver.device.device_id) is None) \
+            == expected
+    finally:
+        facts_cache.invalidate(test_driver.device.device_id)
+
+
+@pytest.mark.parametrize('test_commands, expected', [
+    (['add bond bond1 bond slaves swp1'], True),
+    (['add loopback lo ip address 192.168.0.107/32'], True),
+    (['add vlan 100', 'add interface swp1 bridge access 100'], True),
+    (['add bgp autonomous-system 65003'], False),
+])
+def test_invalidate_cache_interface_types(test_driver, test_commands,
+                                          expected):
+    interface_type_cache.set(test_driver.device.device_id, {})
+    test_driver._invalidate_cache(test_commands)
+    assert (interface_type_cache.get(test_driver.device.device_id)
+            is None) == expected
+
+
+def test_get_single_vxlan_data_unbatched(test_driver, monkeypatch):
+    monkeypatch.setenv('CUMULUS_LINUX_BATCH_COMMANDS', 'false')
+
+    def exec_batch_commands(results):
+        raise AssertionError("Commands must not be batched.")
+
+    monkeypatch.setattr(test_driver, '_exec_batch_commands',
+                        exec_batch_commands)
+    assert test_driver._get_single_vxlan_data(70001) == {}
+    assert test_driver._connection.commands == [
+        'net show evpn vni 70001 json',
+        'net show bgp evpn vni 70001 json',
+        'bridge -j vlan show dev vxlan70001'
+    ]
+
+
+@pytest.fixture
+def test_batches(test_driver, monkeypatch):
+    """
+    Records the commands of each batch executed by the test driver.
+    """
+    batches = []
+
+    def exec_batch_commands(results):
+        batches.append([result.original_command for result in results])
+        for result in results:
+            result.stdout = '{}'
+
+    monkeypatch.setattr(test_driver, '_exec_batch_commands',
+                        exec_batch_commands)
+    monkeypatch.setattr(test_driver, '_set_facts', lambda results: None)
+    return batches
+
+
+@pytest.mark.parametrize('test_facts, test_cached, expected', [
+    (True, [], [['show bridge vlan', 'show evpn vni']
+                + FACTS_NET_COMMANDS + FACTS_RAW_COMMANDS]),
+    (False, [], [['show bridge vlan', 'show evpn vni']]),
+    (True, ['show bridge vlan'], [['show evpn vni'] + FACTS_NET_COMMANDS
+                                  + FACTS_RAW_COMMANDS]),
+    (False, ['show bridge vlan', 'show evpn vni'], []),
+])
+def test_prefetch(test_driver, test_batches, test_facts, test_cached,
+                  expected):
+    for command in test_cached:
+        test_driver._result_cache.add(CommandResult(
+            test_driver._format_net_command(command, True), command, '{}',
+            json={}))
+    test_driver._prefetch(['show bridge vlan', 'show evpn vni'], test_facts)
+    assert test_batches == expected
+    assert 'show bridge vlan' in test_driver._result_cache
+    assert test_driver._result_cache.get('show evpn vni').json == {}
+
+
+def test_prefetch_cached_facts(test_driver, test_batches):
+    facts_cache.set(test_driver.device.device_id,
+                    SimpleNamespace(gathered=time.time()))
+    try:
+        test_driver._prefetch(['show bridge vlan', 'show evpn vni'],
+                              facts=True)
+    finally:
+        facts_cache.invalidate(test_driver.device.device_id)
+    assert test_batches == [['show bridge vlan', 'show evpn vni']]
+
+
+def test_prefetch_unbatched(test_driver, test_batches, monkeypatch):
+    monkeypatch.setenv('CUMULUS_LINUX_BATCH_COMMANDS', 'false')
+    test_driver._prefetch(['show bridge vlan', 'show evpn vni'])
+    assert test_batches == []
+    assert test_driver._connection.commands == [
+        'net show bridge vlan json', 'net show evpn vni json']
+    assert test_driver._result_cache.get('show evpn vni').json == {}
+
+
+def test_vxlan_create_failure_skips_sync(test_driver, monkeypatch):
+    def fail(*args):
+        raise AssertionError("The allocator must not be synchronized.")
+
+    def get_bgp_evpn_data():
+        raise ValueError("Original error.")
+
+    monkeypatch.setattr(test_driver, '_prefetch', lambda *args, **kwargs: None)
+    monkeypatch.setattr(test_driver, '_get_dynamic_vlan', lambda: 4001)
+    monkeypatch.setattr(test_driver, '_get_bgp_evpn_data', get_bgp_evpn_data)
+    monkeypatch.setattr(test_driver, '_get_bridge_vlan_set', fail)
+    try:
+        with pytest.raises(ValueError, match="Original error."):
+            test_driver._tunnels_vxlan_create(an_vxlan.VXLAN(
+                id=70000, source_address='192.168.0.106', layer=3,
+                import_targets=['65002:70000'],
+                export_targets=['65002:70000'],
+                route_distinguisher='192.168.0.106:5',
+                bound_object_id='green'))
+        assert test_driver._get_dynamic_vlan_allocator(sync=False).needs_sync()
+    finally:
+        allocator._allocators.pop(test_driver.device.device_id, None)
+
+
+@pytest.mark.parametrize('test_int_names, expected', [
+    (['swp1'], []),
+    (['swp1', 'bond1'], ['net show interface json']),
+    # Interfaces missing from the index may have been created since.
+    (['swp1', 'bond1', 'bond2'], ['net show interface json',
+                                  'net show interface bond2 json']),
+])
+def test_get_interface_types(test_driver, monkeypatch, test_int_names,
+                             expected):
+    def run_command(command, use_pty=False):
+        test_driver._connection.commands.append(command)
+        output = {'net show interface json': {'bond1': {'mode': '802.3ad'}},
+                  'net show interface bond2 json': {'mode': '802.3ad'}}
+        return SimpleNamespace(stdout=iter([json.dumps(output[command])]),
+                               stderr=iter([]), exit_code=0)
+
+    monkeypatch.setenv('CUMULUS_LINUX_BATCH_COMMANDS', 'false')
+    test_driver._connect()
+    monkeypatch.setattr(test_driver._connection, 'run_command', run_command)
+    int_types = test_driver._get_interface_types(test_int_names)
+    assert int_types == {int_name: if_task.get_interface_type_by_name(
+        int_name) or 'bond' for int_name in test_int_names}
+    assert test_driver._connection.commands == expected
+
+
+def test_get_interface_types_cached(test_driver):
+    interface_type_cache.set(test_driver.device.device_id, {'bond1': 'bond'})
+    # A new driver, as for a new request, uses the same index.
+    driver = CumulusDriver(test_driver.device)
+    assert driver._get_interface_types(['bond1']) == {'bond1': 'bond'}
+    assert driver._connection is None
+
+
+@pytest.mark.parametrize('test_synced, expected', [
+    # The local map is used while it is up to date.
+    (True, 4000),
+    # Otherwise it is synchronized with the device first.
+    (False, 4001),
+])
+def test_get_dynamic_vlan_sync(test_driver, monkeypatch, test_synced,
+                               expected):
+    monkeypatch.setenv('CUMULUS_LINUX_DYNAMIC_VLAN_STRATEGY', 'lowest')
+    monkeypatch.setattr(test_driver, '_get_bridge_vlan_set',
+                        lambda: VLANSet([4000]))
+    vlan_allocator = allocator.get_allocator(test_driver.device.device_id,
+                                             test_driver.dynamic_vlans)
+    vlan_allocator.sync(VLANSet())
+    if not test_synced:
+        vlan_allocator.invalidate()
+    try:
+        assert test_driver._get_dynamic_vlan() == expected
+    finally:
+        allocator._allocators.pop(test_driver.device.device_id, None)
+
+
+@pytest.mark.parametrize('test_layer, test_synced, expected', [
+    (3, True, []),
+    (3, False, ['show bridge vlan']),
+    (2, True, ['show bridge vlan']),
+])
+def test_get_vxlan_create_dependencies(test_driver, test_layer, test_synced,
+                                       expected):
+    vlan_allocator = allocator.get_allocator(test_driver.device.device_id,
+                                             test_driver.dynamic_vlans)
+    if test_synced:
+        vlan_allocator.sync(VLANSet())
+    try:
+        assert test_driver._get_vxlan_create_dependencies(an_vxlan.VXLAN(
+            id=70000, source_address='192.168.0.106', layer=test_layer,
+            import_targets=['65002:70000'], export_targets=['65002:70000'],
+            route_distinguisher='192.168.0.106:5',
+            bound_object_id='green' if test_layer == 3 else '100')
+        ) == expected
+    finally:
+        allocator._allocators.pop(test_driver.device.device_id, None)
+
+
+def test_vxlan_create_commit_skips_sync(test_driver, monkeypatch):
+    def fail(*args):
+        raise AssertionError("The allocator must not be synchronized.")
+
+    facts_cache.set(test_driver.device.device_id, DeviceFacts(
+        version='4.3.0', loopback_address='192.168.0.106', bgp_asn=65002,
+        bgp_router_id='192.168.0.106'))
+    vlan_allocator = allocator.get_allocator(test_driver.device.device_id,
+                                             test_driver.dynamic_vlans)
+    vlan_allocator.sync(VLANSet())
+    monkeypatch.setattr(test_driver, '_prefetch', lambda *args, **kwargs: None)
+    monkeypatch.setattr(test_driver, '_exec_config_commands',
+                        lambda commands: None)
+    monkeypatch.setattr(test_driver, '_tunnels_vxlan_read', lambda vni: None)
+    monkeypatch.setattr(test_driver, '_get_bridge_vlan_set', fail)
+    try:
+        test_driver._tunnels_vxlan_create(an_vxlan.VXLAN(
+            id=70000, source_address='192.168.0.106', layer=3,
+            import_targets=['65002:70000'], export_targets=['65002:70000'],
+            route_distinguisher='192.168.0.106:5', bound_object_id='green'))
+        assert len(vlan_allocator.free) == len(test_driver.dynamic_vlans) - 1
+    finally:
+        allocator._allocators.pop(test_driver.device.device_id, None)
+        facts_cache.invalidate(test_driver.device.device_id)
+
+
+@pytest.fixture
+def test_interface_generators(monkeypatch):
+    """
+    Records which of the interface update command generators is used.
+    """
+    calls = []
+    for generator in ['generate_mode_change_commands',
+                      'generate_diff_commands', 'generate_update_commands']:
+        monkeypatch.setattr(
+            if_task, generator,
+            lambda *args, generator=generator: calls.append(generator)
+            or [f'{generator} command'])
+    return calls
+
+
+@pytest.mark.parametrize('test_interface, test_current, test_update, expected', [
+    # The mode is changed.
+    (an_if.Interface(name='swp1', mode='routed'),
+     an_if.Interface(name='swp1', mode='bridged',
+                     attributes=an_if.InterfaceBridgeAttributes(
+                         dot1q_enabled=False, dot1q_pvid=100)),
+     True, 'generate_mode_change_commands'),
+    # The mode is unchanged, so only the differences are applied.
+    (an_if.Interface(name='swp1', mode='routed', mtu=9216),
+     an_if.Interface(name='swp1', mode='routed', mtu=1500),
+     True, 'generate_diff_commands'),
+    (an_if.Interface(name='swp1', mtu=9216),
+     an_if.Interface(name='swp1', mode='routed', mtu=1500),
+     True, 'generate_diff_commands'),
+    (an_if.Interface(name='swp1', mode='routed', mtu=9216),
+     an_if.Interface(name='swp1', mode='routed', mtu=1500),
+     False, 'generate_diff_commands'),
+    # A replace without a mode cannot be diffed.
+    (an_if.Interface(name='swp1', mtu=9216),
+     an_if.Interface(name='swp1', mode='routed', mtu=1500),
+     False, 'generate_update_commands'),
+    # Nor can an interface that was not found.
+    (an_if.Interface(name='swp1', mode='routed', mtu=9216),
+     [], False, 'generate_update_commands'),
+])
+def test_interface_update_dispatch(test_driver, monkeypatch,
+                                   test_interface_generators, test_interface,
+                                   test_current, test_update, expected):
+    config_commands = []
+    monkeypatch.setattr(test_driver, '_interface_read',
+                        lambda *args, **kwargs: test_current)
+    monkeypatch.setattr(test_driver, '_exec_config_commands',
+                        config_commands.append)
+    test_driver._interface_update(test_interface, test_update)
+    assert test_interface_generators == [expected]
+    assert config_commands == [[f'{expected} command']]
+
+
+def test_interface_update_unchanged(test_driver, monkeypatch):
+    current = an_if.Interface(
+        name='swp1', mode='routed', admin_enabled=True, mtu=9216,
+        speed=1000, attributes=an_if.InterfaceRouteAttributes(addresses=[]))
+    monkeypatch.setattr(test_driver, '_interface_read',
+                        lambda *args, **kwargs: current)
+
+    def exec_config_commands(commands):
+        raise AssertionError("Nothing must be committed.")
+
+    monkeypatch.setattr(test_driver, '_exec_config_commands',
+                        exec_config_commands)
+    test_driver._interface_update(an_if.Interface(
+        name='swp1', mode='routed', admin_enabled=True, mtu=9216,
+        attributes=an_if.InterfaceRouteAttributes(addresses=[])), False)
+
+
+@pytest.fixture
+def test_disconnects(test_driver, monkeypatch):
+    """
+    Counts the times the test driver releases its connection.
+    """
+    disconnects = []
+
+    def disconnect():
+        disconnects.append(test_driver._connection)
+        test_driver._connection = None
+
+    monkeypatch.setattr(test_driver, '_disconnect', disconnect)
+    return disconnects
+
+
+def test_interface_bulk_update(test_driver, test_disconnects, monkeypatch):
+    config_commands = []
+    monkeypatch.setattr(test_driver, '_exec_config_commands',
+                        config_commands.append)
+    monkeypatch.setattr(test_driver, '_interface_read', lambda: [
+        an_if.Interface(name=f'swp{n}', mode='routed') for n in range(1, 6)])
+    interfaces = test_driver.interface_bulk_update(
+        'swp1-3', an_if.Interface(mtu=9216), description_prefix='uplink')
+    assert config_commands == [['add interface swp1-3',
+                                'add interface swp1-3 mtu 9216',
+                                'add interface swp1 alias "uplink swp1"',
+                                'add interface swp2 alias "uplink swp2"',
+                                'add interface swp3 alias "uplink swp3"']]
+    assert [interface.name for interface in interfaces] == \
+        ['swp1', 'swp2', 'swp3']
+    assert len(test_disconnects) == 1
+
+
+def test_interface_bulk_update_failure(test_driver, test_disconnects,
+                                       monkeypatch):
+    def exec_config_commands(commands):
+        raise ValueError("Commit failed.")
+
+    monkeypatch.setattr(test_driver, '_exec_config_commands',
+                        exec_config_commands)
+    with pytest.raises(ValueError):
+        test_driver.interface_bulk_update(['swp1', 'vlan10'],
+                                          an_if.Interface(mtu=9216))
+    assert len(test_disconnects) == 1
+
+
+@pytest.mark.parametrize('test_vlan_ids, expected', [
+    ('100-199,300', ['add bridge bridge vids 100-199,300']),
+    ([100, '101', 102], ['add bridge bridge vids 100-102']),
+    ([], []),
+])
+def test_bridge_vlan_bulk_create(test_driver, test_disconnects, monkeypatch,
+                                 test_vlan_ids, expected):
+    monkeypatch.setenv('CUMULUS_LINUX_BRIDGE_NAME', 'bridge')
+    config_commands = []
+    monkeypatch.setattr(test_driver, '_exec_config_commands',
+                        config_commands.append)
+    vlans = test_driver.bridge_vlan_bulk_create(test_vlan_ids)
+    assert config_commands == ([expected] if expected else [])
+    assert [vlan.id for vlan in vlans] == \
+        vlan_task.parse_vlan_ids(test_vlan_ids).to_list()
+    assert len(test_disconnects) == 1
+
+
+def test_bridge_vlan_bulk_delete(test_driver, test_disconnects, monkeypatch):
+    monkeypatch.setenv('CUMULUS_LINUX_BRIDGE_NAME', 'bridge')
+    config_commands = []
+    monkeypatch.setattr(test_driver, '_exec_config_commands',
+                        config_commands.append)
+    test_driver.bridge_vlan_bulk_delete('100-199,300')
+    assert config_commands == [['del bridge bridge vids 100-199,300']]
+    assert len(test_disconnects) == 1
+
+
+@pytest.mark.parametrize('test_vlan_ids, expected', [
+    ('100,4000-4001', exc.DriverOperationUnsupported),
+    (None, exc.RequestValueError),
+    ([100, None], exc.RequestValueError),
+    ('100-5000', exc.RequestValueError),
+])
+@pytest.mark.parametrize('test_method', [
+    'bridge_vlan_bulk_create', 'bridge_vlan_bulk_delete'
+])
+def test_bridge_vlan_bulk_invalid(test_driver, test_disconnects, monkeypatch,
+                                  test_method, test_vlan_ids, expected):
+    def exec_config_commands(commands):
+        raise AssertionError("Nothing must be committed.")
+
+    monkeypatch.setattr(test_driver, '_exec_config_commands',
+                        exec_config_commands)
+    with pytest.raises(expected):
+        getattr(test_driver, test_method)(test_vlan_ids)
+    assert len(test_disconnects) == 1
+
+
+def test_poll_counters(test_driver, test_disconnects, monkeypatch):
+    commands = []
+    rx_bytes = iter([1000, 6000])
+
+    def exec_raw_command(command):
+        commands.append(command)
+        return json.dumps([
+            {'ifname': 'swp1',
+             'stats64': {'rx': {'bytes': next(rx_bytes), 'packets': 10},
+                         'tx': {'bytes': 0, 'packets': 0}}},
+            {'ifname': 'lo'}
+        ]), ''
+
+    monkeypatch.setattr(test_driver, '_exec_raw_command', exec_raw_command)
+    try:
+        first = test_driver.poll_counters()
+        second = test_driver.poll_counters()
+    finally:
+        counters._trackers.pop(test_driver.device.device_id, None)
+    assert commands == ['ip -s -j link show'] * 2
+    assert list(first) == ['swp1']
+    assert first['swp1'].deltas is None
+    assert second['swp1'].delta('rx_bytes') == 5000
+    assert second['swp1'].delta('rx_packets') == 0
+    assert second['swp1'].interval > 0
+    assert len(test_disconnects) == 2
+
+
+def test_interface_views(test_driver, test_disconnects, monkeypatch):
+    monkeypatch.setattr(FakeConnection, 'output', json.dumps({
+        'swp1': {'mode': 'Access/L2', 'iface_obj': {'vlan_list': '100'}},
+        'lo': {'mode': 'Loopback', 'iface_obj': {'vlan_list': ''}}}))
+    views = test_driver.interface_views()
+    assert test_disconnects[0].commands == ['net show interface json']
+    assert len(test_disconnects) == 1
+    assert test_driver._connection is None
+    assert [view.name for view in views] == ['swp1']
+    assert views[0].mode == 'bridged'
+
+
+@pytest.mark.parametrize('test_close', [False, True])
+def test_bridge_vlan_iter(test_driver, test_disconnects, monkeypatch,
+                          test_close):
+    monkeypatch.setenv('CUMULUS_LINUX_BRIDGE_NAME', 'bridge')
+    monkeypatch.setattr(FakeConnection, 'output', json.dumps({
+        'bridge': [{'vlan': 100, 'vlanEnd': 102}, {'vlan': 4000}]}))
+    vlans = test_driver.bridge_vlan_iter(limit=2)
+    assert test_disconnects[0].commands == ['net show bridge vlan json']
+    assert len(test_disconnects) == 1
+    if test_close:
+        assert next(vlans).id == 100
+        vlans.close()
+    else:
+        assert [vlan.id for vlan in vlans] == [100, 101]
+    # The VLANs are built without going back to the device.
+    assert test_driver.connect_count == 1
+    assert test_driver._connection is None
+
+
+@pytest.mark.parametrize('test_token, expected', [
+    ('boot-id\n1660000000\n1660000000', False),
+    ('boot-id\n1660000300\n1660000000', True),
+])
+def test_facts_validation(test_driver, monkeypatch, test_token, expected):
+    monkeypatch.setenv('CUMULUS_LINUX_FACTS_VALIDATE_INTERVAL', '0')
+    cached = DeviceFacts(version='4.3.0',
+                         token='boot-id,1660000000,1660000000')
+    refreshed = DeviceFacts(version='4.4.0')
+    monkeypatch.setattr(test_driver, '_exec_raw_command',
+                        lambda command: (test_token, ''))
+    monkeypatch.setattr(test_driver, '_refresh_facts', lambda: refreshed)
+    facts_cache.set(test_driver.device.device_id, cached)
+    try:
+        assert test_driver.facts is (refreshed if expected else cached)
+    finally:
+        facts_cache.invalidate(test_driver.device.device_id)
+
+
+@pytest.mark.parametrize('test_bridge, expected', [
+    ('br0', 'br0'),
+    (None, 'bridge'),
+])
+def test_bridge_fallback(test_driver, test_bridge, expected):
+    facts_cache.set(test_driver.device.device_id,
+                    DeviceFacts(version='4.3.0', bridge=test_bridge))
+    try:
+        assert test_driver.bridge == expected
+    finally:
+        facts_cache.invalidate(test_driver.device.device_id)
+
+
+@pytest.mark.parametrize('test_glob, expected', [
+    ('4000-4094', VLANSet.from_range(4000, 4094)),
+    ('100,200-201', VLANSet([100, 200, 201])),
+    ('4000-4096', None),
+    ('40a0', None),
+])
+def test_dynamic_vlans_option(test_driver, monkeypatch, test_glob, expected):
+    monkeypatch.setenv('CUMULUS_LINUX_DYNAMIC_VLANS', test_glob)
+    if expected is None:
+        with pytest.raises(ConfigError, match="Invalid VLAN glob"):
+            config.cumulus_linux.dynamic_vlans
+    else:
+        assert test_driver.dynamic_vlans == expected
+
+
+def test_dynamic_vlans_metadata(test_driver):
+    test_driver.device.metadata['dynamic_vlans'] = '4000-4096'
+    with pytest.raises(ConfigError, match="'4000-4096'"):
+        test_driver.dynamic_vlans
@@ -0,0 +1,50 @@
+from autonet_cumulus import facts
+
+
+def test_facts_cache():
+    cache = facts.FactsCache(ttl=60)
+    device_facts = facts.DeviceFacts(version='4.3.0')
+    cache.set('leaf01', device_facts)
+    assert cache.get('leaf01') is device_facts
+    assert cache.get('leaf02') is None
+    cache.invalidate('leaf01')
+    assert cache.get('leaf01') is None
+
+
+def test_facts_cache_expired():
+    cache = facts.FactsCache(ttl=60)
+    cache.set('leaf01', facts.DeviceFacts(version='4.3.0', gathered=0))
+    assert cache.get('leaf01') is None
+
+
+def test_facts_store(tmp_path):
+    store = facts.FactsStore(str(tmp_path / 'facts'))
+    device_facts = facts.DeviceFacts(
+        version='4.3.0', soc_vendor='Mellanox', bridge='bridge',
+        bgp_asn=65002, token='boot-id,1660000000')
+    assert store.load('leaf/01') is None
+    store.save('leaf/01', device_facts)
+    assert store.load('leaf/01') == device_facts
+    store.delete('leaf/01')
+    assert store.load('leaf/01') is None
+
+
+def test_facts_store_invalid(tmp_path):
+    store = facts.FactsStore(str(tmp_path))
+    (tmp_path / 'leaf01.json').write_text('{"version": ')
+    assert store.load('leaf01') is None
+    (tmp_path / 'leaf01.json').write_text('{"bridge": "bridge"}')
+    assert store.load('leaf01') is None
+
+
+def test_facts_cache_validation():
+    cache = facts.FactsCache(ttl=60)
+    assert cache.needs_validation('leaf01', 60)
+    cache.set('leaf01', facts.DeviceFacts(version='4.3.0'))
+    assert not cache.needs_validation('leaf01', 60)
+    assert cache.needs_validation('leaf01', 0)
+    cache.invalidate('leaf01')
+    assert cache.needs_validation('leaf01', 60)
+    # Facts that are not cached cannot be validated.
+    cache.set_validated('leaf01')
+    assert cache.needs_validation('leaf01', 60)
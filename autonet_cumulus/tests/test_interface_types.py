@@ -0,0 +1,17 @@
+from autonet_cumulus import interface_types
+
+
+def test_interface_type_cache():
+    cache = interface_types.InterfaceTypeCache(ttl=60)
+    type_index = {'bond1': 'bond'}
+    cache.set('leaf01', type_index)
+    assert cache.get('leaf01') is type_index
+    assert cache.get('leaf02') is None
+    cache.invalidate('leaf01')
+    assert cache.get('leaf01') is None
+
+
+def test_interface_type_cache_expired():
+    cache = interface_types.InterfaceTypeCache(ttl=-1)
+    cache.set('leaf01', {'bond1': 'bond'})
+    assert cache.get('leaf01') is None
@@ -0,0 +1,85 @@
+from autonet_cumulus.inventory import InterfaceInventory, get_inventory
+from autonet_cumulus.tasks import interface_fast as if_fast_task
+
+
+def make_int_data(mode='Interface/L3', summary='', addresses=(),
+                  vlan_list=''):
+    return {
+        'mode': mode,
+        'summary': summary,
+        'speed': '1G',
+        'linkstate': 'UP',
+        'iface_obj': {
+            'description': '',
+            'mtu': 9216,
+            'mac': '0c:33:0e:25:52:01',
+            'vlan_filtering': bool(vlan_list),
+            'native_vlan': None,
+            'vlan_list': vlan_list,
+            'ip_address': {'allentries': list(addresses)}
+        }
+    }
+
+
+def make_show_int_data():
+    return {
+        'swp1': make_int_data(summary='Master: red(UP)',
+                              addresses=['10.0.0.1/31']),
+        'swp2': make_int_data(mode='Access/L2', vlan_list='10-12'),
+        'swp3': make_int_data(addresses=['10.0.0.3/31']),
+        'red': make_int_data(mode='VRF'),
+    }
+
+
+def test_inventory_refresh():
+    inventory = InterfaceInventory()
+    show_int_data = make_show_int_data()
+    changes = inventory.refresh(show_int_data)
+    assert changes.added == {'swp1', 'swp2', 'swp3'}
+    assert inventory.interfaces == if_fast_task.get_interfaces(show_int_data)
+    # The same data is not processed again.
+    assert not inventory.refresh(show_int_data)
+
+
+def test_inventory_refresh_changes():
+    inventory = InterfaceInventory()
+    inventory.refresh(make_show_int_data())
+    swp2 = inventory._interfaces['swp2']
+    show_int_data = make_show_int_data()
+    show_int_data['swp1']['iface_obj']['mtu'] = 1500
+    del show_int_data['swp3']
+    show_int_data['swp4'] = make_int_data()
+    changes = inventory.refresh(show_int_data)
+    assert changes.added == {'swp4'}
+    assert changes.removed == {'swp3'}
+    assert changes.changed == {'swp1'}
+    # Unchanged interfaces are not converted again.
+    assert inventory._interfaces['swp2'] is swp2
+    assert inventory.interfaces == if_fast_task.get_interfaces(show_int_data)
+
+
+def test_inventory_refresh_vrf_changes():
+    inventory = InterfaceInventory()
+    inventory.refresh(make_show_int_data())
+    show_int_data = make_show_int_data()
+    del show_int_data['red']
+    changes = inventory.refresh(show_int_data)
+    assert changes.changed == {'swp1'}
+    assert inventory.interfaces[0].attributes.vrf is None
+
+
+def test_inventory_interfaces_copied():
+    inventory = InterfaceInventory()
+    show_int_data = make_show_int_data()
+    inventory.refresh(show_int_data)
+    swp1 = inventory.interfaces[0]
+    swp1.mtu = 1500
+    swp1.attributes.addresses[0].address = '10.0.0.9/31'
+    swp1.attributes.addresses.append(swp1.attributes.addresses[0])
+    # Modifying a returned interface must not change the inventory.
+    assert inventory.interfaces == if_fast_task.get_interfaces(show_int_data)
+
+
+def test_get_inventory():
+    assert get_inventory('leaf01') is get_inventory('leaf01')
+    assert get_inventory('leaf01') is not get_inventory('leaf02')
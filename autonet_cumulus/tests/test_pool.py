@@ -0,0 +1,189 @@
+import gevent
+import pytest
+import threading
+
+from autonet_cumulus import pool
+
+
+class FakeSocket(object):
+    closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class FakeOutput(object):
+    exit_code = None
+
+
+class FakeClient(object):
+    def __init__(self, host, user=None, password=None, keepalive_seconds=60):
+        self.host = host
+        self.user = user
+        self.keepalive_seconds = keepalive_seconds
+        self.session = object()
+        self.sock = FakeSocket()
+        self.exit_code = 0
+        self.hang = False
+        self.commands = []
+        self.disconnected_by = None
+
+    def run_command(self, command):
+        self.commands.append(command)
+        return FakeOutput()
+
+    def wait_finished(self, output):
+        if self.hang:
+            gevent.sleep(10)
+        output.exit_code = self.exit_code
+
+    def _disconnect(self):
+        self.disconnected_by = threading.current_thread()
+
+
+@pytest.fixture
+def test_pool():
+    return pool.ConnectionPool(max_size=2, idle_timeout=300,
+                               keepalive_seconds=30,
+                               client_factory=FakeClient)
+
+
+def test_get_pool_key():
+    key = pool.get_pool_key('192.0.2.1', 'cumulus', 'secret')
+    assert key[:2] == ('192.0.2.1', 'cumulus')
+    assert 'secret' not in key[2]
+    assert key != pool.get_pool_key('192.0.2.1', 'cumulus', 'other')
+
+
+def test_acquire_reuses_released(test_pool):
+    client = test_pool.acquire('192.0.2.1', 'cumulus', 'secret')
+    assert client.keepalive_seconds == 30
+    test_pool.release(client)
+    assert test_pool.acquire('192.0.2.1', 'cumulus', 'secret') is client
+    assert len(test_pool) == 0
+
+
+@pytest.mark.parametrize('test_address, test_user, test_password', [
+    ('192.0.2.2', 'cumulus', 'secret'),
+    ('192.0.2.1', 'admin', 'secret'),
+    ('192.0.2.1', 'cumulus', 'other'),
+])
+def test_acquire_key_mismatch(test_pool, test_address, test_user,
+                              test_password):
+    client = test_pool.acquire('192.0.2.1', 'cumulus', 'secret')
+    test_pool.release(client)
+    assert test_pool.acquire(
+        test_address, test_user, test_password) is not client
+
+
+def test_acquire_healthy(test_pool):
+    client = test_pool.acquire('192.0.2.1', 'cumulus', 'secret')
+    assert client.commands == []
+    test_pool.release(client)
+    assert test_pool.acquire('192.0.2.1', 'cumulus', 'secret') is client
+    assert client.commands == ['true']
+
+
+@pytest.mark.parametrize('test_exit_code, test_hang', [
+    (1, False),
+    # A half-open connection never completes the command.
+    (0, True),
+])
+def test_acquire_unhealthy(test_pool, test_exit_code, test_hang):
+    test_pool.health_timeout = 0.01
+    client = test_pool.acquire('192.0.2.1', 'cumulus', 'secret')
+    test_pool.release(client)
+    client.exit_code = test_exit_code
+    client.hang = test_hang
+    assert test_pool.acquire('192.0.2.1', 'cumulus', 'secret') is not client
+    assert len(test_pool) == 0
+    assert client.disconnected_by is threading.current_thread()
+
+
+def test_idle_timeout(test_pool):
+    client = test_pool.acquire('192.0.2.1', 'cumulus', 'secret')
+    test_pool.release(client)
+    test_pool.idle_timeout = -1
+    assert test_pool.acquire('192.0.2.1', 'cumulus', 'secret') is not client
+
+
+def test_max_size(test_pool):
+    clients = [test_pool.acquire('192.0.2.1', 'cumulus', 'secret')
+               for _ in range(3)]
+    for client in clients:
+        test_pool.release(client)
+    assert len(test_pool) == 2
+    assert clients[0].disconnected_by is threading.current_thread()
+    # The oldest released connection is the one evicted.
+    assert test_pool.acquire('192.0.2.1', 'cumulus', 'secret') is clients[2]
+    assert test_pool.acquire('192.0.2.1', 'cumulus', 'secret') is clients[1]
+
+
+def test_release_foreign_client(test_pool):
+    test_pool.release(FakeClient('192.0.2.1'))
+    assert len(test_pool) == 0
+
+
+def test_reset_after_fork(test_pool):
+    client = test_pool.acquire('192.0.2.1', 'cumulus', 'secret')
+    test_pool.release(client)
+    test_pool._reset_after_fork()
+    assert len(test_pool) == 0
+    assert client.sock.closed
+
+
+def test_acquire_other_thread(test_pool):
+    client = test_pool.acquire('192.0.2.1', 'cumulus', 'secret')
+    test_pool.release(client)
+    acquired = []
+    thread = threading.Thread(target=lambda: acquired.append(
+        test_pool.acquire('192.0.2.1', 'cumulus', 'secret')))
+    thread.start()
+    thread.join()
+    assert acquired[0] is not client
+    assert test_pool.acquire('192.0.2.1', 'cumulus', 'secret') is client
+
+
+def test_expire_dead_thread(test_pool):
+    clients = []
+
+    def acquire_release():
+        clients.append(test_pool.acquire('192.0.2.1', 'cumulus', 'secret'))
+        test_pool.release(clients[0])
+
+    thread = threading.Thread(target=acquire_release)
+    thread.start()
+    thread.join()
+    assert len(test_pool) == 1
+    test_pool._expire()
+    assert len(test_pool) == 0
+    # The connection is abandoned rather than disconnected on a thread
+    # other than its own.
+    assert clients[0].sock.closed
+    assert clients[0].disconnected_by is None
+
+
+def test_expire_other_thread(test_pool):
+    clients = []
+    expired = threading.Event()
+    released = threading.Event()
+
+    def acquire_release():
+        clients.append(test_pool.acquire('192.0.2.1', 'cumulus', 'secret'))
+        test_pool.release(clients[0])
+        released.set()
+        expired.wait()
+        test_pool.release(test_pool.acquire('192.0.2.2', 'cumulus', 'secret'))
+
+    thread = threading.Thread(target=acquire_release)
+    thread.start()
+    released.wait()
+    test_pool.idle_timeout = -1
+    test_pool._expire()
+    assert len(test_pool) == 0
+    assert clients[0].disconnected_by is None
+    test_pool.idle_timeout = 300
+    expired.set()
+    thread.join()
+    assert clients[0].disconnected_by is thread
+    assert not clients[0].sock.closed
@@ -0,0 +1,101 @@
+import gevent
+import pytest
+
+from pssh.exceptions import SessionError, Timeout
+from ssh2.error_codes import LIBSSH2_ERROR_EAGAIN
+
+from autonet_cumulus import shell
+
+
+def test_generate_shell_input():
+    assert shell.generate_shell_input('net show version json', 'MARK') == (
+        "net show version json\n"
+        "printf '\\nMARK:%s\\n' \"$?\"; printf '\\nMARK\\n' 1>&2\n"
+    )
+
+
+@pytest.mark.parametrize('test_buffer, expected', [
+    (b'{"os": "4.2.1"}\n\nMARK:0\n', (b'{"os": "4.2.1"}', 0, b'')),
+    (b'ERROR: bad\n\nMARK:1\nnext', (b'ERROR: bad', 1, b'next')),
+    (b'no newline\nMARK:0\n', (b'no newline', 0, b'')),
+    (b'\nMARK:0\n', (b'', 0, b'')),
+    (b'partial output\n\nMAR', None),
+    (b'\nMARK:0', None),
+])
+def test_parse_stdout_marker(test_buffer, expected):
+    assert shell.parse_stdout_marker(test_buffer, 'MARK') == expected
+
+
+@pytest.mark.parametrize('test_buffer, expected', [
+    (b'\nMARK\n', (b'', b'')),
+    (b'warning\n\nMARK\nrest', (b'warning', b'rest')),
+    (b'warning\n', None),
+])
+def test_parse_stderr_marker(test_buffer, expected):
+    assert shell.parse_stderr_marker(test_buffer, 'MARK') == expected
+
+
+class FakeChannel(object):
+    """
+    A channel that answers every command except `hang` immediately.
+    """
+
+    def __init__(self):
+        self.stdout = b''
+        self.stderr = b''
+        self.closed = False
+
+    def shell(self):
+        pass
+
+    def eof(self):
+        return self.closed
+
+    def write(self, data):
+        command, marker_line = data.decode().splitlines()[:2]
+        marker = marker_line.split("'\\n")[1].split(':')[0]
+        if command != 'hang':
+            self.stdout += f'\n{marker}:0\n'.encode()
+            self.stderr += f'\n{marker}\n'.encode()
+
+    def read(self):
+        data, self.stdout = self.stdout, b''
+        return len(data) or LIBSSH2_ERROR_EAGAIN, data
+
+    def read_stderr(self):
+        data, self.stderr = self.stderr, b''
+        return len(data) or LIBSSH2_ERROR_EAGAIN, data
+
+
+class FakeClient(object):
+
+    def __init__(self):
+        self.channel = FakeChannel()
+
+    def open_session(self):
+        return self.channel
+
+    def eagain(self, func, *args):
+        return func(*args)
+
+    def eagain_write(self, func, data):
+        return func(data)
+
+    def poll(self):
+        gevent.sleep(0.01)
+
+    def close_channel(self, channel):
+        channel.closed = True
+
+
+def test_shell_session_read_timeout():
+    client = FakeClient()
+    session = shell.ShellSession(client, read_timeout=0.1)
+    assert session.run('true') == ('', '', 0)
+    with pytest.raises(Timeout):
+        session.run('hang')
+    # Output of the timed out command must not be read as that of the
+    # next command.
+    assert session.closed
+    with pytest.raises(SessionError):
+        session.run('true')
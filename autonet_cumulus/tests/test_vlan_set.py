@@ -0,0 +1,84 @@
+import pytest
+
+from autonet_cumulus.vlan_set import VLANSet
+
+
+@pytest.mark.parametrize('test_glob, expected', [
+    ('1-10,20', [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 20]),
+    ('4000-4094', list(range(4000, 4095))),
+    ('71-72,100,250,4001,4074,4086', [71, 72, 100, 250, 4001, 4074, 4086]),
+    ('5', [5]),
+    ('', []),
+    (None, []),
+])
+def test_from_glob(test_glob, expected):
+    assert VLANSet.from_glob(test_glob).to_list() == expected
+
+
+@pytest.mark.parametrize('test_vids, expected', [
+    ([20, 1, 2, 3], '1-3,20'),
+    ([4094, 4095, 0, 1], '0-1,4094-4095'),
+    (range(1, 4095), '1-4094'),
+    ([7], '7'),
+    ([], ''),
+])
+def test_to_glob(test_vids, expected):
+    assert VLANSet(test_vids).to_glob() == expected
+
+
+def test_glob_round_trip():
+    glob = '1,3-5,7,100-199,4000-4094'
+    assert VLANSet.from_glob(glob).to_glob() == glob
+
+
+def test_from_range():
+    assert VLANSet.from_range(10, 12) == VLANSet([10, 11, 12])
+    assert VLANSet.from_range(12, 10) == VLANSet()
+
+
+@pytest.mark.parametrize('test_vid', [-1, 4096])
+def test_out_of_range(test_vid):
+    with pytest.raises(ValueError):
+        VLANSet([test_vid])
+
+
+def test_contains():
+    vlan_set = VLANSet.from_glob('100-200')
+    assert 100 in vlan_set
+    assert '150' in vlan_set
+    assert 201 not in vlan_set
+    assert 5000 not in vlan_set
+    assert 'vlan10' not in vlan_set
+
+
+def test_set_algebra():
+    a = VLANSet.from_glob('1-10')
+    b = VLANSet.from_glob('5-15')
+    assert a | b == VLANSet.from_glob('1-15')
+    assert a & b == VLANSet.from_glob('5-10')
+    assert a - b == VLANSet.from_glob('1-4')
+    assert a ^ b == VLANSet.from_glob('1-4,11-15')
+    assert a - [1, 2] == VLANSet.from_glob('3-10')
+    assert VLANSet([5, 6]) <= a
+    assert not b.issubset(a)
+    assert a.isdisjoint([20, 30])
+
+
+def test_len_bool_lowest():
+    assert len(VLANSet.from_glob('1-10,20')) == 11
+    assert not VLANSet()
+    assert VLANSet.from_glob('4000-4094').lowest() == 4000
+    assert VLANSet().lowest() is None
+
+
+@pytest.mark.parametrize('test_offset, test_limit, expected', [
+    (0, None, '1-10,20-30'),
+    (0, 5, '1-5'),
+    (8, 5, '9-10,20-22'),
+    (10, 100, '20-30'),
+    (21, 5, ''),
+    (3, 0, ''),
+])
+def test_vlan_set_page(test_offset, test_limit, expected):
+    vids = VLANSet.from_glob('1-10,20-30')
+    assert vids.page(test_offset, test_limit).to_glob() == expected
@@ -0,0 +1,105 @@
+from bisect import bisect_right
+from typing import Dict, FrozenSet, List, Optional
+
+from autonet_cumulus.vlan_set import VLANSet
+
+
+class VLANMembership(object):
+    """
+    A two way index of the VLAN membership of the ports on a bridge,
+    built from the output of :code:`show bridge vlan`.  Each port's
+    VLANs are held as a :py:class:`VLANSet`, so VLAN ranges are never
+    expanded.  The reverse index is built from the VLAN ranges of the
+    ports as a sorted list of segments of VLAN IDs carried by the same
+    ports, so the ports carrying a VLAN are found with a binary search.
+    VXLAN interfaces are ports like any other, and the VNI each VLAN
+    is bound to is recorded along with them.
+    """
+
+    def __init__(self, bridge_vlans: VLANSet, port_vlans: Dict[str, VLANSet],
+                 vlan_vnis: Dict[int, int]):
+        """
+        :param bridge_vlans: The VLAN IDs present on the bridge itself.
+        :param port_vlans: A map of port name to the VLAN IDs it
+            carries.
+        :param vlan_vnis: A map of VLAN ID to the VNI it is bound to.
+        """
+        self.bridge_vlans = bridge_vlans
+        self._port_vlans = port_vlans
+        self._vlan_vnis = vlan_vnis
+        # The first VLAN ID of each segment, and the ports carrying the
+        # VLANs of the segment.  A segment ends where the next begins.
+        self._segment_starts: List[int] = []
+        self._segment_ports: List[FrozenSet[str]] = []
+        self._index_segments()
+
+    def _index_segments(self) -> None:
+        """
+        Builds the reverse index by sweeping over the start and end of
+        every VLAN range carried by a port.
+
+        :return:
+        """
+        boundaries: Dict[int, List[tuple]] = {}
+        for port, vids in self._port_vlans.items():
+            for start, stop in vids.ranges():
+                boundaries.setdefault(start, []).append((port, True))
+                boundaries.setdefault(stop + 1, []).append((port, False))
+        ports = set()
+        for vid in sorted(boundaries):
+            for port, added in boundaries[vid]:
+                if added:
+                    ports.add(port)
+                else:
+                    ports.discard(port)
+            self._segment_starts.append(vid)
+            self._segment_ports.append(frozenset(ports))
+
+    @property
+    def port_names(self) -> [str]:
+        """
+        The names of the ports that are members of the bridge.
+
+        :return:
+        """
+        return list(self._port_vlans)
+
+    def vlans(self, port: str) -> VLANSet:
+        """
+        Returns the VLAN IDs carried by a port.
+
+        :param port: The port name.
+        :return:
+        """
+        return self._port_vlans.get(port, VLANSet())
+
+    def ports(self, vlan_id: int) -> FrozenSet[str]:
+        """
+        Returns the names of the ports that carry a VLAN.
+
+        :param vlan_id: The VLAN ID.
+        :return:
+        """
+        if (segment := bisect_right(self._segment_starts, vlan_id)) == 0:
+            return frozenset()
+        return self._segment_ports[segment - 1]
+
+    def vni(self, vlan_id: int) -> Optional[int]:
+        """
+        Returns the VNI a VLAN is bound to, or None if it is not bound
+        to a VNI.
+
+        :param vlan_id: The VLAN ID.
+        :return:
+        """
+        return self._vlan_vnis.get(vlan_id)
+
+    def is_unused(self, vlan_id: int) -> bool:
+        """
+        Indicates that no port carries the VLAN and that it is not
+        bound to a VNI.
+
+        :param vlan_id: The VLAN ID.
+        :return:
+        """
+        return self.vni(vlan_id) is None and not self.ports(vlan_id)
@@ -0,0 +1,199 @@
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+class VLANSet(object):
+    """
+    An immutable set of VLAN IDs stored as a 4096 bit bitmap.
+    Membership tests are constant time and set algebra is performed
+    on the whole bitmap at once, so large VLAN ranges never need to be
+    expanded into lists of integers.  VLAN sets can be created from,
+    and converted to, the VLAN glob strings used by NCLU,
+    e.g. :code:`1-10,20`.
+    """
+    MAX_VID = 4095
+
+    __slots__ = ('_bits',)
+
+    def __init__(self, vids: Iterable[int] = ()):
+        """
+        :param vids: An iterable of VLAN IDs.
+        """
+        if isinstance(vids, VLANSet):
+            self._bits = vids._bits
+            return
+        bits = 0
+        for vid in vids:
+            bits |= 1 << self._check_vid(int(vid))
+        self._bits = bits
+
+    @classmethod
+    def _check_vid(cls, vid: int) -> int:
+        if not 0 <= vid <= cls.MAX_VID:
+            raise ValueError(f"VLAN ID {vid} is out of range.")
+        return vid
+
+    @classmethod
+    def _from_bits(cls, bits: int) -> 'VLANSet':
+        vlan_set = cls.__new__(cls)
+        vlan_set._bits = bits
+        return vlan_set
+
+    @classmethod
+    def from_range(cls, start: int, stop: int) -> 'VLANSet':
+        """
+        Creates a set containing every VLAN ID from :py:attr:`start`
+        to :py:attr:`stop`, inclusive.
+
+        :param start: The first VLAN ID.
+        :param stop: The last VLAN ID.
+        :return:
+        """
+        cls._check_vid(start)
+        cls._check_vid(stop)
+        if stop < start:
+            return cls()
+        return cls._from_bits(((1 << (stop - start + 1)) - 1) << start)
+
+    @classmethod
+    def from_glob(cls, glob: Optional[str]) -> 'VLANSet':
+        """
+        Creates a set from a VLAN glob such as :code:`1-10,20`.  An
+        empty or missing glob results in an empty set.
+
+        :param glob: The VLAN glob.
+        :return:
+        """
+        bits = 0
+        for chunk in (glob or '').replace(' ', ',').split(','):
+            if not chunk:
+                continue
+            start, _, stop = chunk.partition('-')
+            bits |= cls.from_range(int(start), int(stop or start))._bits
+        return cls._from_bits(bits)
+
+    def ranges(self) -> Iterator[Tuple[int, int]]:
+        """
+        Yields a tuple of the first and last VLAN ID of each contiguous
+        range of VLAN IDs in the set, in ascending order.
+
+        :return:
+        """
+        bits = self._bits
+        offset = 0
+        while bits:
+            # Skip to the first set bit, then measure the run of set
+            # bits that starts there.
+            low = (bits & -bits).bit_length() - 1
+            bits >>= low
+            offset += low
+            length = (~bits & (bits + 1)).bit_length() - 1
+            yield offset, offset + length - 1
+            bits >>= length
+            offset += length
+
+    def to_glob(self) -> str:
+        """
+        Returns the set as a VLAN glob such as :code:`1-10,20`.
+
+        :return:
+        """
+        return ','.join(str(start) if start == stop else f'{start}-{stop}'
+                        for start, stop in self.ranges())
+
+    def to_list(self) -> List[int]:
+        """
+        Returns the VLAN IDs in the set as a sorted list.
+
+        :return:
+        """
+        return list(self)
+
+    def lowest(self) -> Optional[int]:
+        """
+        Returns the lowest VLAN ID in the set, or None if it is empty.
+
+        :return:
+        """
+        if not self._bits:
+            return None
+        return (self._bits & -self._bits).bit_length() - 1
+
+    def page(self, offset: int = 0, limit: Optional[int] = None) -> 'VLANSet':
+        """
+        Returns the subset of VLAN IDs that a slice of the sorted VLAN
+        IDs from :py:attr:`offset` of length :py:attr:`limit` would
+        contain.  Whole ranges are skipped at once, so the VLAN IDs are
+        never expanded.
+
+        :param offset: The number of VLAN IDs to skip.
+        :param limit: The maximum number of VLAN IDs to include, or
+            None for no limit.
+        :return:
+        """
+        bits = 0
+        for start, stop in self.ranges():
+            if limit is not None and limit <= 0:
+                break
+            length = stop - start + 1
+            if offset >= length:
+                offset -= length
+                continue
+            start += offset
+            offset = 0
+            if limit is not None:
+                stop = min(stop, start + limit - 1)
+                limit -= stop - start + 1
+            bits |= self.from_range(start, stop)._bits
+        return self._from_bits(bits)
+
+    def union(self, other: Iterable[int]) -> 'VLANSet':
+        return self._from_bits(self._bits | VLANSet(other)._bits)
+
+    def intersection(self, other: Iterable[int]) -> 'VLANSet':
+        return self._from_bits(self._bits & VLANSet(other)._bits)
+
+    def difference(self, other: Iterable[int]) -> 'VLANSet':
+        return self._from_bits(self._bits & ~VLANSet(other)._bits)
+
+    def symmetric_difference(self, other: Iterable[int]) -> 'VLANSet':
+        return self._from_bits(self._bits ^ VLANSet(other)._bits)
+
+    def issubset(self, other: Iterable[int]) -> bool:
+        return not self._bits & ~VLANSet(other)._bits
+
+    def isdisjoint(self, other: Iterable[int]) -> bool:
+        return not self._bits & VLANSet(other)._bits
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+    __xor__ = symmetric_difference
+    __le__ = issubset
+
+    def __contains__(self, vid) -> bool:
+        try:
+            vid = int(vid)
+        except (TypeError, ValueError):
+            return False
+        return 0 <= vid <= self.MAX_VID and bool(self._bits >> vid & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        for start, stop in self.ranges():
+            yield from range(start, stop + 1)
+
+    def __len__(self) -> int:
+        return bin(self._bits).count('1')
+
+    def __bool__(self) -> bool:
+        return bool(self._bits)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, VLANSet):
+            return self._bits == other._bits
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(self._bits)
+
+    def __repr__(self) -> str:
+        return f"VLANSet('{self.to_glob()}')"
@@ -11,7 +11,10 @@ with open(here + '/autonet_cumulus/__version__.py', 'r') as f:
 
 install_requires = [
     'autonet-api',
-    'parallel-ssh'
+    'gevent',
+    'macaddress',
+    'parallel-ssh',
+    'ssh2-python'
 ]
 
 test_requires = install_requires + [